@@ -92,6 +92,36 @@ def get_buses_bounds_on_injections(
     return min_inj, max_inj, min_inj_per_period, max_inj_per_period
 
 
+def get_buses_bounds_on_injections_arrays(
+        params:Params,
+        network:"Network",
+        thermals:Thermals
+    ) -> tuple[np.ndarray, np.ndarray]:
+    """
+        the per-period bounds of get_buses_bounds_on_injections as two arrays of shape
+        (len(network.BUS_ID), params.T), with the rows in the order of network.BUS_ID
+    """
+
+    bus_idx = {bus: b for b, bus in enumerate(network.BUS_ID)}
+
+    # the generation capacities are added up in the same order as in
+    # get_buses_bounds_on_injections, so both give exactly the same bounds
+    capacity = np.zeros(len(network.BUS_ID), dtype='d')
+    np.add.at(capacity,
+              np.array([bus_idx[bus] for g in thermals.UNIT_NAME.keys()
+                                                    for bus in thermals.BUS[g]], dtype='int64'),
+              np.array([thermals.BUS_COEFF[g][bus]*thermals.MAX_P[g]
+                            for g in thermals.UNIT_NAME.keys() for bus in thermals.BUS[g]],
+                       dtype='d'))
+
+    net_load = network.NET_LOAD[[network.BUS_HEADER[bus] for bus in network.BUS_ID], :params.T]
+
+    min_inj_per_period = np.zeros((len(network.BUS_ID), params.T), dtype='d') - net_load
+    max_inj_per_period = capacity[:, None] - net_load
+
+    return min_inj_per_period, max_inj_per_period
+
+
 def add_new_parallel_line(
                         resistance_line_1, reactance_line_1,
                         shunt_conductance_line_1, shunt_susceptance_line_1,
@@ -183,6 +213,8 @@ class Network:
 
         self.BUS_NAME : dict[int, str] = {}     #: String name of each bus.
 
+        self.BUS_AREA : dict[int, str] = {}     #: Area of each bus.
+
         #: Reference buses. Buses in this list will have their respective voltage angles set to 0.
         self.REF_BUS_ID : list[int] = []
 
@@ -196,6 +228,28 @@ class Network:
 
         self.LINE_F_T : dict[int, tuple[int, int]] = {} #: Endpoints of the transmission line.
 
+        #: Index of the transmission lines by their endpoints, that is, the inverse of `LINE_F_T`.
+        self.LINE_OF_F_T : dict[tuple[int, int], int] = {}
+
+        #: Buses connected to the bus given as key by at least one transmission line.
+        self.BUS_NEIGHBOURS : dict[int, set[int]] = {}
+
+        #: Buses whose transmission lines were added, deleted or changed since this set was last
+        #: cleared. The network reduction uses it as the worklist of buses to be revisited.
+        self.TOUCHED_BUSES : set[int] = set()
+
+        #: Buses that the network reduction must not delete, for instance, the buses of a region
+        #: of the network connected to other regions while the regions are reduced separately.
+        self.LOCKED_BUSES : set[int] = set()
+
+        #: Record of the network reduction (an instance of `ReductionPlan`), which is kept up to
+        #: date by the reduction while it is not None. It can be saved and replayed for other cases.
+        self.REDUCTION_PLAN = None
+
+        #: Operator that maps the injections of the reduced network to the angles and flows of the
+        #: original network (an instance of `FlowReconstruction`), or None if it was not reduced.
+        self.FLOW_RECONSTRUCTION = None
+
         #: Upper bound on the transmission line flow in pu. If a network reduction is used, then the
         #: upper bound might not be the same in all periods. Thus, the upper bound is represented as
         #: an numpy array whose length is the number of periods in the scheduling horizon
@@ -217,9 +271,19 @@ class Network:
         self.THETA_BOUND : Real = 50*24*pi      #: Maximum voltage angle in rad.
 
         #: The Power Transfer Distribution Factors (PTDF) matrix, also called
-        #: Injection Shift Factor (ISF)
+        #: Injection Shift Factor (ISF). Either a numpy array or, if `PTDFEngine.LAZY` is used,
+        #: an instance of `LazyPTDF` that is indexed in the same way.
         self.PTDF : np.ndarray = []
 
+        #: Snapshot of the network for which `PTDF` was last built (an instance of `PTDFBasis`).
+        #: If the network is reduced afterwards, the PTDF is updated from it instead of recomputed.
+        self.PTDF_BASIS = None
+
+        #: Lines whose PTDF rows are scalar multiples of the PTDF row of another line, their
+        #: representative. Maps the line to a tuple (representative, alpha), where alpha is the
+        #: ratio of the line's flow to the representative's flow.
+        self.COLLINEAR_LINES : dict[int, tuple[int, float]] = {}
+
         #: A flag that indicates whether at least one of the bounds of the transmission line in at
         #: least of the periods is possibly binding (active).
         self.ACTIVE_BOUNDS : dict[int, bool] = {}
@@ -244,6 +308,18 @@ class Network:
         #: Data of constraints resulting from the network reduction.
         self.SEC_CONSTRS : dict[int, dict] = {}
 
+        #: Endpoints and reactance of each transmission line as read from the input. The outages
+        #: of these lines are the N-1 contingencies. Lines that result from merging parallel lines
+        #: are not included, because their outage is not that of a single circuit.
+        self.CONTINGENCIES : dict[int, tuple[tuple[int, int], Real]] = {}
+
+        #: Post-contingency flow constraints that are possibly binding. The keys are the pairs
+        #: (outaged line, monitored line), and the values hold the line outage distribution
+        #: factor ('LODF') and numpy arrays of flags indicating, for each period, whether the upper
+        #: ('UB') and lower ('LB') bounds of the monitored line are possibly binding after the
+        #: outage.
+        self.N_1_CONSTRS : dict[tuple[int, int], dict] = {}
+
         self.RESERVES : dict[str, dict[int, Real]] = {}     #: Reserve requirements in pu.
 
     def add_new_bus(self:"Network", row:list[str], header:dict[str, int]) -> None:
@@ -266,12 +342,38 @@ class Network:
 
         self.BUS_ID.append(bus)
         self.BUS_NAME[self.BUS_ID[-1]] = row[header['Name']].strip()
+        self.BUS_AREA[bus] = row[header['area']].strip()
 
         (self.LINES_FROM_BUS[bus], self.LINES_TO_BUS[bus]) = ([], [])
+        self.BUS_NEIGHBOURS[bus] = set()
 
         if row[header['Reference bus']].strip() == 'Ref':
             self.REF_BUS_ID.append(bus)
 
+    def index_line(self:"Network", l:int) -> None:
+        """Add line `l`, whose endpoints are already in `LINE_F_T`, to `LINE_OF_F_T` and
+        `BUS_NEIGHBOURS`. Must be called whenever a line is added or its endpoints change."""
+
+        (f, t) = self.LINE_F_T[l]
+        self.TOUCHED_BUSES.update((f, t))
+        self.LINE_OF_F_T[f, t] = l
+        self.BUS_NEIGHBOURS[f].add(t)
+        self.BUS_NEIGHBOURS[t].add(f)
+
+    def unindex_line(self:"Network", l:int) -> None:
+        """Remove line `l` from `LINE_OF_F_T` and `BUS_NEIGHBOURS`. Must be called before the line
+        is deleted from `LINE_F_T` or its endpoints change."""
+
+        (f, t) = self.LINE_F_T[l]
+        self.TOUCHED_BUSES.update((f, t))
+        if self.LINE_OF_F_T.get((f, t)) == l:
+            del self.LINE_OF_F_T[f, t]
+            if (t, f) not in self.LINE_OF_F_T:
+                if f in self.BUS_NEIGHBOURS:
+                    self.BUS_NEIGHBOURS[f].discard(t)
+                if t in self.BUS_NEIGHBOURS:
+                    self.BUS_NEIGHBOURS[t].discard(f)
+
     def _add_new_line(self:"Network", params: Params, line_id: int,
                       from_id: int, to_id:int,
                       reactance: float, resistance: float, shunt_conduc: float,
@@ -289,8 +391,14 @@ class Network:
 
         cap = line_rating
 
-        if (f, t) in self.LINE_F_T.values():
-            l = [l for l in self.LINE_ID if self.LINE_F_T[l] == (f, t)][0]
+        if (f, t) in self.LINE_OF_F_T:
+            l = self.LINE_OF_F_T[f, t]
+
+            if self.REDUCTION_PLAN is not None:
+                self.REDUCTION_PLAN.parallel_line(
+                                l, self.LINE_X[l],
+                                self.REDUCTION_PLAN.constant_terms(cap/params.POWER_BASE),
+                                set(), reactance)
 
             (_, self.LINE_X[l],
              _1, _2, _3, _4,
@@ -318,6 +426,10 @@ class Network:
             l = line_id
             self.LINE_ID.append(l)
             self.LINE_F_T[l] = (f, t)
+            self.index_line(l)
+            if self.REDUCTION_PLAN is not None:
+                self.REDUCTION_PLAN.new_line(
+                                l, self.REDUCTION_PLAN.constant_terms(cap/params.POWER_BASE), set())
             self.LINE_FLOW_UB[l] = np.array(params.T*[cap/params.POWER_BASE])
             self.LINE_FLOW_LB[l] = -1*np.array(params.T*[cap/params.POWER_BASE])
             self.LINE_X[l] = reactance
@@ -356,8 +468,8 @@ class Network:
         cap = float(row[header['Cap']].strip())/params.POWER_BASE
         x = float(row[header['Reac']].strip())*(100/params.POWER_BASE)
 
-        if (f, t) in self.LINE_F_T.values():
-            l = [l for l in self.LINE_ID if self.LINE_F_T[l] == (f, t)][0]
+        if (f, t) in self.LINE_OF_F_T:
+            l = self.LINE_OF_F_T[f, t]
 
             (_, self.LINE_X[l],
              _1, _2, _3, _4,
@@ -377,6 +489,8 @@ class Network:
                                     self.LINE_FLOW_LB[l]
             )
 
+            self.CONTINGENCIES.pop(l, None)
+
             self.ACTIVE_BOUNDS[l] = (self.ACTIVE_BOUNDS[l] or
                                      cap * params.POWER_BASE < MAX_FLOW
             )
@@ -393,10 +507,13 @@ class Network:
             l = max(self.LINE_ID,default=0) + 1
             self.LINE_ID.append(l)
             self.LINE_F_T[l] = (f, t)
+            self.index_line(l)
             self.LINE_FLOW_UB[l] = np.array(params.T*[cap])
             self.LINE_FLOW_LB[l] = -1*np.array(params.T*[cap])
             self.LINE_X[l] = x
 
+            self.CONTINGENCIES[l] = ((f, t), x)
+
             self.LINES_FROM_BUS[f].append(l)
             self.LINES_TO_BUS[t].append(l)
 
@@ -60,3 +60,60 @@ class NetworkSlacks(Enum):
     @classmethod
     def _missing_(cls, value):
         raise ValueError(f"Valid types: {(', '.join([repr(member.name) for member in cls]),)}")
+
+
+class PTDFEngine(Enum):
+    """Method used to compute the PTDF matrix of each isolated subsystem"""
+
+    DENSE = 1
+    """Build dense incidence and susceptance matrices and explicitly invert the reduced
+    susceptance matrix. Only practical for small systems, but it does not depend on scipy."""
+
+    SPARSE = 2
+    """Keep the incidence and susceptance matrices in compressed sparse form, factorize the
+    reduced susceptance matrix once and get the PTDF rows through triangular solves."""
+
+    LAZY = 3
+    """Factorize the sparse susceptance matrices as in `SPARSE`, but only compute a PTDF row
+    (and cache it) when it is first requested. Useful when only the rows of the possibly binding
+    lines are needed."""
+
+    @classmethod
+    def _missing_(cls, value):
+        raise ValueError(f"Valid types: {(', '.join([repr(member.name) for member in cls]),)}")
+
+
+class EliminationOrdering(Enum):
+    """Order in which buses with many connections are eliminated when reducing the network"""
+
+    CONNECTIONS = 1
+    """Candidate buses are taken in increasing order of their number of connections at the start
+    of the reduction. A bus with more than five connections is only eliminated if at most one of
+    the equivalent lines between its neighbours is new."""
+
+    MIN_FILL = 2
+    """Candidate buses are taken from a priority queue, which is updated after each elimination,
+    in increasing order of the predicted change in the number of nonzeros of the network model,
+    then of the number of new equivalent lines (fill), and then of their number of connections.
+    Eliminations that would increase the number of nonzeros are rejected."""
+
+    @classmethod
+    def _missing_(cls, value):
+        raise ValueError(f"Valid types: {(', '.join([repr(member.name) for member in cls]),)}")
+
+
+class ScreeningBackend(Enum):
+    """How the processes that identify redundant flow bounds with optimization models are run"""
+
+    MPI = 1
+    """Child processes are spawned with `MPI.COMM_SELF.Spawn`, which requires an MPI runtime with
+    dynamic process management. Each child gets a copy of the whole network and a fixed share of
+    the lines."""
+
+    PROCESS_POOL = 2
+    """The processes of a local process pool read the data of the network from shared memory,
+    build their models once and then take the lines from a queue. MPI is not used."""
+
+    @classmethod
+    def _missing_(cls, value):
+        raise ValueError(f"Valid types: {(', '.join([repr(member.name) for member in cls]),)}")
@@ -1,6 +1,7 @@
 import mpi4py
 mpi4py.rc.thread_level = 'single'
 from mpi4py import MPI
+import os
 from copy import deepcopy
 
 import networkx as nx
@@ -13,10 +14,17 @@ from constants import NetworkModel
 from components.network import Network
 
 from pre_processing.build_ptdf import build_ptdf
+from pre_processing.compress_ptdf import compress_ptdf_rows
 from pre_processing.reduce_network import reduce_network
+from pre_processing.reduce_regions import reduce_network_by_regions
+from pre_processing.flow_reconstruction import FlowReconstruction
+from pre_processing.reduction_plan import (ReductionPlan, get_plan_arrays, save_reduction_plan,
+                                           load_reduction_plan, replay_reduction_plan)
 from pre_processing.identify_redundant_line_bounds import (
                                     remove_redundant_flow_limits_without_opt,
-                                    redundant_line_bounds
+                                    remove_redundant_flow_limits_with_balance,
+                                    redundant_line_bounds,
+                                    screen_contingencies
 )
 
 W_COMM = MPI.COMM_WORLD
@@ -34,6 +42,33 @@ def _check_number_of_buses(network: Network):
                          "or disable network reduction"
         )
 
+def _reduce_network(params, thermals, network: Network, plan: list[dict], stages: list[dict]):
+    """
+        Reduce network, replaying the next stage of the reduction plan if it is valid. Otherwise,
+        the reduction is recorded as the next stage of the plan if params.REDUCTION_PLAN_FILE is
+        given, and the later stages of the plan are discarded
+    """
+
+    k = len(stages)
+
+    if k < len(plan) and replay_reduction_plan(params, plan[k], thermals, network):
+        stages.append(plan[k])
+        return
+
+    del plan[k:]
+
+    if params.REDUCTION_PLAN_FILE != '':
+        network.REDUCTION_PLAN = ReductionPlan(params, thermals, network)
+
+    if network.REDUCTION_PLAN is None and params.REDUCTION_REGIONS > 1:
+        reduce_network_by_regions(params, thermals, network)
+    else:
+        reduce_network(params, thermals, network)
+
+    if network.REDUCTION_PLAN is not None:
+        stages.append(get_plan_arrays(network.REDUCTION_PLAN, network))
+        network.REDUCTION_PLAN = None
+
 def main(args):
     """main function"""
 
@@ -46,33 +81,55 @@ def main(args):
                                                           NetworkModel.FLUXES,
                                                           NetworkModel.PTDF)):
 
-        build_ptdf(original_network)
+        build_ptdf(params, original_network)
 
-        reduce_network(params, thermals, network)
+        # the PTDF of the reduced network is updated from that of the original network
+        network.PTDF_BASIS = original_network.PTDF_BASIS
+
+        # stages of the reduction plan to be replayed, and those replayed or recorded
+        plan = (load_reduction_plan(params.REDUCTION_PLAN_FILE)
+                    if os.path.isfile(params.REDUCTION_PLAN_FILE) else [])
+        stages = []
+
+        _reduce_network(params, thermals, network, plan, stages)
 
         _check_number_of_buses(network)
 
-        build_ptdf(network)
+        build_ptdf(params, network)
 
         remove_redundant_flow_limits_without_opt(params, thermals, network)
+        remove_redundant_flow_limits_with_balance(params, thermals, network)
 
-        reduce_network(params, thermals, network)
+        _reduce_network(params, thermals, network, plan, stages)
 
         _check_number_of_buses(network)
 
-        build_ptdf(network)
+        build_ptdf(params, network)
+        remove_redundant_flow_limits_with_balance(params, thermals, network)
         redundant_line_bounds(params, thermals, network,
                               time_limit=360,
                               run_single_period_models=False
         )
 
-        reduce_network(params, thermals, network)
+        _reduce_network(params, thermals, network, plan, stages)
 
         _check_number_of_buses(network)
 
+        if len(plan) < len(stages):
+            save_reduction_plan(params.REDUCTION_PLAN_FILE, stages)
+
+        # maps the injections of the reduced network to the flows of the original network
+        network.FLOW_RECONSTRUCTION = FlowReconstruction(original_network, network)
+
     if params.NETWORK_MODEL not in (NetworkModel.SINGLE_BUS,
                                     NetworkModel.FLUXES):
-        build_ptdf(network)
+        build_ptdf(params, network)
+
+    if params.NETWORK_MODEL == NetworkModel.PTDF and params.PTDF_COMPRESSION:
+        compress_ptdf_rows(params, thermals, network)
+
+    if params.N_1_SECURITY:
+        screen_contingencies(params, thermals, network)
 
     print(f"{'':#<70}")
     print(f"{' Overview of the system ':#^70}")
@@ -95,6 +152,9 @@ def main(args):
         n_p_act = len([l for l in network.LINE_ID if network.ACTIVE_BOUNDS[l]])
         print(f"The total number of possibly active lines is {n_p_act}",
               flush=True)
+        if params.N_1_SECURITY:
+            print("The total number of possibly active post-contingency constraints is " +
+                  f"{len(network.N_1_CONSTRS)}", flush=True)
     print(f"{'':#<70}")
     print(flush=True)
 
@@ -132,16 +192,21 @@ def main(args):
                                      t_g,
                                      s_load_curtailment,
                                      s_gen_surplus,
-                                     s_renew_curtailment
+                                     s_renew_curtailment,
+                                     reduced_thermals=thermals,
+                                     reduced_network=network
             )
 
 
-        if (params.REDUCE_SYSTEM and
+        if (params.REDUCE_SYSTEM and params.RESOLVE_FULL_NETWORK and
             (params.NETWORK_MODEL in (NetworkModel.B_THETA,
                                       NetworkModel.FLUXES,
                                       NetworkModel.PTDF))
         ):
 
+            if params.NETWORK_MODEL == NetworkModel.PTDF and params.PTDF_COMPRESSION:
+                compress_ptdf_rows(params, original_thermals, original_network)
+
             fixed_st_up_tg = {k: v.x if not isinstance(v, int | float)
                               else v
                               for k, v in st_up_tg.items()}
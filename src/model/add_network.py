@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 from timeit import default_timer as dt
 import numpy as np
+from scipy import sparse
 
 from params import Params
 from components.thermal import Thermals
 from components.network import Network, _get_isolated_subsystems
+from pre_processing.build_ptdf import get_ptdf_rows
 
 from constants import (NetworkModel, NetworkSlacks, Model, quicksum, Var)
 
@@ -45,9 +47,6 @@ def PTDF_formulation(
                                                    abs(exp[bus, t].getConstant()) != 0
                                                    for t in periods))], dtype='int64')
 
-    _PTDF = network.PTDF[:]
-    _PTDF[np.where(abs(_PTDF) < params.PTDF_COEFF_TOL)] = 0
-
     possibly_active_bounds = [l for l in network.LINE_ID if network.ACTIVE_BOUNDS[l]]
     possibly_active_bounds_idxs = [l_idx for l_idx, l in enumerate(network.LINE_ID)
                                    if network.ACTIVE_BOUNDS[l]]
@@ -57,47 +56,78 @@ def PTDF_formulation(
 
     count_constrs_added = 0
 
-    sub_PTDF_only_act_lines = _PTDF[possibly_active_bounds_idxs, :]
-
-    non_zeros = np.intersect1d(np.where(abs(sub_PTDF_only_act_lines) > 0)[1],
-                               buses_with_injections_idxs)
-    buses_of_interest = [network.BUS_ID[b] for b in non_zeros]
-
-    all_flows = (sub_PTDF_only_act_lines[:, non_zeros]
-                 @ [[exp[bus, t] for t in periods] for bus in buses_of_interest])
+    # only the rows of the possibly binding lines, and the columns of buses with injections,
+    # are needed
+    sub_PTDF_only_act_lines = get_ptdf_rows(network, possibly_active_bounds_idxs,
+                                            params.PTDF_COEFF_TOL)
+    has_injection = np.zeros(len(network.BUS_ID), dtype=bool)
+    has_injection[buses_with_injections_idxs] = True
 
+    # lines whose PTDF rows are scalar multiples of each other are grouped, and only the
+    # tightest of their scaled bounds is enforced in each period
+    groups = {}
     for l in possibly_active_bounds:
-        l_idx = map_idx[l]
+        (representative, alpha) = network.COLLINEAR_LINES.get(l, (l, 1.0))
+        if representative not in map_idx:
+            (representative, alpha) = (l, 1.0)
+        groups.setdefault(representative, []).append((l, alpha))
 
-        ts = [t for t in periods if network.ACTIVE_UB_PER_PERIOD[l][t]
-              or network.ACTIVE_LB_PER_PERIOD[l][t]]
+    for (representative, members) in groups.items():
+        l_idx = map_idx[representative]
 
-        flows = all_flows[l_idx, :]
+        ts = [t for t in periods if any(network.ACTIVE_UB_PER_PERIOD[l][t]
+                                        or network.ACTIVE_LB_PER_PERIOD[l][t]
+                                                                    for (l, _) in members)]
 
-        for t in ts:
+        first, last = (sub_PTDF_only_act_lines.indptr[l_idx],
+                       sub_PTDF_only_act_lines.indptr[l_idx + 1])
+        cols = sub_PTDF_only_act_lines.indices[first:last]
+        coeffs = sub_PTDF_only_act_lines.data[first:last]
+        (cols, coeffs) = (cols[has_injection[cols]], coeffs[has_injection[cols]])
 
-            l_key = network.LINE_F_T[l][0], network.LINE_F_T[l][1], l, t
+        for t in ts:
 
-            flow_exp = flows[ts.index(t)]
+            flow_exp = quicksum(float(coeff) * exp[network.BUS_ID[b], t]
+                                                        for (b, coeff) in zip(cols, coeffs))
 
             if flow_exp.size() >= 1:
-                if network.ACTIVE_UB_PER_PERIOD[l][t]:
-                    constrs.append(m.addConstr(
-                        flow_exp - s_line_violation[l_key] <= network.LINE_FLOW_UB[l][t],
-                        name=f"ptdf_UB_{network.LINE_F_T[l][0]}_" +
-                             f"{network.LINE_F_T[l][1]}_{l}_{t}"
-                    )
-                    )
+                # the bounds of the members of the group on the representative's flow. the
+                # upper bound of a member with negative alpha is a lower bound, and vice versa
+                (upper, lower) = ([], [])
+                for (l, alpha) in members:
+                    if network.ACTIVE_UB_PER_PERIOD[l][t]:
+                        (upper if alpha > 0 else lower).append(
+                                            (network.LINE_FLOW_UB[l][t]/alpha, l, alpha, 'UB'))
+                    if network.ACTIVE_LB_PER_PERIOD[l][t]:
+                        (lower if alpha > 0 else upper).append(
+                                            (network.LINE_FLOW_LB[l][t]/alpha, l, alpha, 'LB'))
+
+                tightest = ([min(upper, key=lambda bound: bound[0])] if len(upper) > 0 else []) +\
+                           ([max(lower, key=lambda bound: bound[0])] if len(lower) > 0 else [])
+
+                for (_, l, alpha, bound) in tightest:
+                    l_key = network.LINE_F_T[l][0], network.LINE_F_T[l][1], l, t
+                    l_flow_exp = flow_exp if alpha == 1.0 else alpha * flow_exp
+
+                    if bound == 'UB':
+                        constrs.append(m.addConstr(
+                            l_flow_exp - s_line_violation[l_key] <= network.LINE_FLOW_UB[l][t],
+                            name=f"ptdf_UB_{network.LINE_F_T[l][0]}_" +
+                                 f"{network.LINE_F_T[l][1]}_{l}_{t}"
+                        )
+                        )
+                    else:
+                        constrs.append(m.addConstr(
+                            l_flow_exp + s_line_violation[l_key] >= network.LINE_FLOW_LB[l][t],
+                            name=f"ptdf_LB_{network.LINE_F_T[l][0]}_" +
+                                 f"{network.LINE_F_T[l][1]}_{l}_{t}"
+                        )
+                        )
                     count_constrs_added += 1
 
-                if network.ACTIVE_LB_PER_PERIOD[l][t]:
-                    constrs.append(m.addConstr(
-                        flow_exp + s_line_violation[l_key] >= network.LINE_FLOW_LB[l][t],
-                        name=f"ptdf_LB_{network.LINE_F_T[l][0]}_" +
-                             f"{network.LINE_F_T[l][1]}_{l}_{t}"
-                    )
-                    )
-                    count_constrs_added += 1
+    if len(network.N_1_CONSTRS) > 0:
+        count_constrs_added += _post_contingency_constraints(m, params, network, exp,
+                                                             has_injection, constrs, periods)
 
     for constr in constrs:
         constr.Lazy = 3
@@ -122,6 +152,83 @@ def PTDF_formulation(
     print(f"\nIt took {time_end - time_0:,.4f} sec to add the PTDF constraints", flush=True)
 
 
+def _post_contingency_constraints(
+        m: Model,
+        params: Params,
+        network: Network,
+        exp: dict,
+        has_injection: np.ndarray,
+        constrs: list,
+        periods: list[int]
+) -> int:
+    """
+    Add the possibly binding post-contingency flow constraints in `network.N_1_CONSTRS`.
+    The post-contingency flow of the monitored line m after the outage of line k is
+    PTDF_m * p + LODF[m, k] * PTDF_k * p. The constraints added are appended to `constrs`
+    and their number is returned
+    """
+
+    pairs = list(network.N_1_CONSTRS.keys())
+
+    inverse_map_lines = {line: l for l, line in enumerate(network.LINE_ID)}
+    lines_idxs = sorted(set(inverse_map_lines[l] for pair in pairs for l in pair))
+    row_of = {network.LINE_ID[l_idx]: r for r, l_idx in enumerate(lines_idxs)}
+
+    # one row of coefficients for each pair
+    combination = sparse.csr_matrix(
+                    (np.concatenate((np.ones(len(pairs), dtype='d'),
+                                     np.array([network.N_1_CONSTRS[pair]['LODF']
+                                                            for pair in pairs], dtype='d'))),
+                     (np.tile(np.arange(len(pairs), dtype='int64'), 2),
+                      np.array([row_of[monitored] for (_, monitored) in pairs] +
+                               [row_of[outage] for (outage, _) in pairs], dtype='int64'))),
+                    shape=(len(pairs), len(lines_idxs)))
+    post_PTDF = (combination @ get_ptdf_rows(network, lines_idxs, 0.0)).tocsr()
+    post_PTDF.data[np.abs(post_PTDF.data) < params.PTDF_COEFF_TOL] = 0
+    post_PTDF.eliminate_zeros()
+
+    count_constrs_added = 0
+
+    for (p_idx, (outage, monitored)) in enumerate(pairs):
+        constr_data = network.N_1_CONSTRS[outage, monitored]
+
+        first, last = post_PTDF.indptr[p_idx], post_PTDF.indptr[p_idx + 1]
+        cols = post_PTDF.indices[first:last]
+        coeffs = post_PTDF.data[first:last]
+        (cols, coeffs) = (cols[has_injection[cols]], coeffs[has_injection[cols]])
+
+        for t in [t for t in periods if constr_data['UB'][t] or constr_data['LB'][t]]:
+
+            flow_exp = quicksum(float(coeff) * exp[network.BUS_ID[b], t]
+                                                        for (b, coeff) in zip(cols, coeffs))
+
+            if flow_exp.size() >= 1:
+                if params.NETWORK_SLACKS in (NetworkSlacks.LINE_SLACKS,
+                                             NetworkSlacks.BUS_AND_LINE_SLACKS):
+                    slack = m.addVar(lb=0, obj=params.DEFICIT_COST,
+                                     name=f"slack_n_1_{outage}_{monitored}_{t}")
+                else:
+                    slack = 0
+
+                if constr_data['UB'][t]:
+                    constrs.append(m.addConstr(
+                        flow_exp - slack <= network.LINE_FLOW_UB[monitored][t],
+                        name=f"n_1_UB_{outage}_{monitored}_{t}"
+                    )
+                    )
+                    count_constrs_added += 1
+
+                if constr_data['LB'][t]:
+                    constrs.append(m.addConstr(
+                        flow_exp + slack >= network.LINE_FLOW_LB[monitored][t],
+                        name=f"n_1_LB_{outage}_{monitored}_{t}"
+                    )
+                    )
+                    count_constrs_added += 1
+
+    return count_constrs_added
+
+
 def single_bus(
         m: Model,
         params: Params,
@@ -6,7 +6,8 @@ from numbers import Real
 from csv import reader
 from timeit import default_timer as dt
 
-from constants import NetworkModel, NetworkSlacks
+from constants import (NetworkModel, NetworkSlacks, PTDFEngine, EliminationOrdering,
+                       ScreeningBackend)
 
 
 def _str2bool(v: Union[bool, str]):
@@ -41,7 +42,8 @@ def _str2real(v: str):
 
 def _str2enum(v: str):
     """Get the right member of an enumeration from string v"""
-    _enums = (NetworkModel, NetworkSlacks)
+    _enums = (NetworkModel, NetworkSlacks, PTDFEngine, EliminationOrdering,
+              ScreeningBackend)
 
     for (_en, _name) in [(_en, _opt.name) for _en in _enums for _opt in _en]:
         if _name == v.upper():
@@ -62,7 +64,8 @@ def _check_choices(params: "Params"):
     )
 
     for attr in ['DISCRETIZATION', 'MILP_GAP',
-                 'DEFICIT_COST', 'SCAL_OBJ_F', 'TIME_LIMIT', 'POWER_BASE']:
+                 'DEFICIT_COST', 'SCAL_OBJ_F', 'TIME_LIMIT', 'POWER_BASE',
+                 'PTDF_CACHE_MAX_SIZE_MB']:
         value = getattr(params, attr)
         if not isinstance(value, Real):
             raise TypeError(f"{attr} must be a real number, not {type(value)}")
@@ -74,9 +77,24 @@ def _check_choices(params: "Params"):
                   str(value) + ' MVA). If this is correct, then proceed, ' +
                   ' otherwise choose a different value for it.')
 
+    if params.N_1_SECURITY and params.NETWORK_MODEL != NetworkModel.PTDF:
+        raise ValueError("N_1_SECURITY can only be used with NETWORK_MODEL=PTDF")
+
+    if params.N_1_SECURITY and params.REDUCE_SYSTEM:
+        # the lines removed by the reduction would be neither monitored nor outaged
+        raise ValueError("N_1_SECURITY cannot be used with REDUCE_SYSTEM")
+
+    if params.SCREENING_MODEL not in (NetworkModel.B_THETA, NetworkModel.PTDF):
+        raise ValueError("SCREENING_MODEL must be either B_THETA or PTDF")
+
     _enums_types = {"NETWORK_MODEL": NetworkModel,
-                    "NETWORK_SLACKS": NetworkSlacks}
-    for attr in ['NETWORK_MODEL', "NETWORK_SLACKS"]:
+                    "NETWORK_SLACKS": NetworkSlacks,
+                    "PTDF_ENGINE": PTDFEngine,
+                    "ELIMINATION_ORDERING": EliminationOrdering,
+                    "SCREENING_BACKEND": ScreeningBackend,
+                    "SCREENING_MODEL": NetworkModel}
+    for attr in ['NETWORK_MODEL', "NETWORK_SLACKS", "PTDF_ENGINE", "ELIMINATION_ORDERING",
+                 "SCREENING_BACKEND", "SCREENING_MODEL"]:
         if not isinstance(getattr(params, attr), _enums_types[attr]):
             raise AttributeError(
                 f"Parameter {attr} must be a member of {_enums_types[attr]}." +
@@ -94,7 +112,8 @@ def _set_attr_from_console(parameter_class: "Params",
     The corresponding values keys of args that match attributes
     """
 
-    _enums = (NetworkModel, NetworkSlacks)
+    _enums = (NetworkModel, NetworkSlacks, PTDFEngine, EliminationOrdering,
+              ScreeningBackend)
 
     for k, v in args.items():
         k = k.upper()
@@ -302,16 +321,120 @@ class Params:
         #: defaults to 20.
         self.MAX_NUMBER_OF_CONNECTIONS: int = 20
 
-        #: Maximum number of processes launched to identify inactive transmission line bounds,
-        #: defaults to 1.
+        #: Maximum number of processes launched to identify inactive transmission line bounds
+        #: and to reduce the regions of the network, defaults to 1.
         self.MAX_PROCESS_REDUCE_NETWORK: int = 1
 
+        #: How the processes that identify inactive transmission line bounds are run if
+        #: `MAX_PROCESS_REDUCE_NETWORK` > 1. `ScreeningBackend.PROCESS_POOL` uses a local process
+        #: pool and shared memory instead of spawning MPI processes, defaults to
+        #: `ScreeningBackend.MPI`.
+        self.SCREENING_BACKEND: ScreeningBackend = ScreeningBackend.MPI
+
+        #: Flag to indicate whether the LPs used to identify inactive transmission line bounds
+        #: should be solved with the primal simplex method, each starting from the optimal basis of
+        #: the previous one, with the lines taken in breadth-first order over the network so that
+        #: consecutive objectives are of lines close to each other, defaults to False.
+        self.SCREENING_WARM_START: bool = False
+
+        #: Maximum number of objectives of the LPs used to identify inactive transmission line
+        #: bounds that are solved together, as the scenarios of a single multi-scenario model. The
+        #: LPs of a batch share the bounds on the injections, i.e., they are either over the whole
+        #: horizon or of the same period, and only differ in their objectives, defaults to 1,
+        #: i.e., each LP is solved on its own.
+        self.SCREENING_BATCH_SIZE: int = 1
+
+        #: Formulation of the LPs used to identify inactive transmission line bounds, which is
+        #: either `NetworkModel.B_THETA`, with the voltage angles of the buses and a power balance
+        #: for each bus, or `NetworkModel.PTDF`, with the injections of the buses, a power balance
+        #: for each island and the flows written with the PTDF, defaults to
+        #: `NetworkModel.B_THETA`.
+        self.SCREENING_MODEL: NetworkModel = NetworkModel.B_THETA
+
+        #: Number of regions into which the network is partitioned to be reduced. The regions are
+        #: reduced separately, in parallel if `MAX_PROCESS_REDUCE_NETWORK` > 1, with the buses
+        #: connected to other regions kept, and the merged network is then reduced once more.
+        #: If the buses belong to more than one area, the areas are the regions. Otherwise, the
+        #: network's graph is partitioned. Only used with `REDUCE_SYSTEM` and if the reduction
+        #: is not recorded to `REDUCTION_PLAN_FILE`, defaults to 1, i.e., no partition.
+        self.REDUCTION_REGIONS: int = 1
+
+        #: Flag to indicate whether the buses with many connections should be removed from the
+        #: network all at once, with a single Schur complement (Kron reduction) of the susceptance
+        #: matrix, instead of one at a time. The same buses are removed in both cases, and the
+        #: equivalent networks only differ by rounding errors. Defaults to True.
+        self.BATCH_KRON_REDUCTION: bool = True
+
+        #: Order in which buses with many connections are eliminated when reducing the network,
+        #: defaults to `EliminationOrdering.CONNECTIONS`.
+        self.ELIMINATION_ORDERING: EliminationOrdering = EliminationOrdering.CONNECTIONS
+
         #: Network model used, default to `NetworkModel.B_THETA`.
         self.NETWORK_MODEL: NetworkModel = NetworkModel.B_THETA
 
         #: Network slacks to be included (default = `NetworkSlacks.BUS_SLACKS`).
         self.NETWORK_SLACKS: NetworkSlacks = NetworkSlacks.BUS_SLACKS
 
+        #: Method used to compute the PTDF matrix, defaults to `PTDFEngine.SPARSE`.
+        #: `PTDFEngine.DENSE` is kept as a fallback.
+        self.PTDF_ENGINE: PTDFEngine = PTDFEngine.SPARSE
+
+        #: Flag to indicate whether the PTDF matrix of a reduced network should be updated from the
+        #: PTDF matrix of the network before the reduction, instead of being computed from scratch.
+        #: Not used with `PTDFEngine.LAZY`, defaults to True.
+        self.PTDF_INCREMENTAL: bool = True
+
+        #: Flag to indicate whether the PTDF matrix should be stored as a compressed sparse row
+        #: (CSR) matrix, from which the coefficients whose magnitudes are less than PTDF_COEFF_TOL
+        #: are removed when it is built. Not used with `PTDFEngine.LAZY`, defaults to False.
+        self.PTDF_SPARSE_STORAGE: bool = False
+
+        #: Number of processes used to compute, in parallel, the PTDF matrices of the isolated
+        #: subsystems. If 0, THREADS processes are used, or one per CPU if THREADS is also 0.
+        #: Not used with `PTDFEngine.LAZY`, defaults to 1.
+        self.PTDF_PROCESSES: int = 1
+
+        #: Flag to indicate whether the PTDF rows of the possibly binding lines that are scalar
+        #: multiples of each other, within PTDF_COEFF_TOL, should be grouped, so that only the
+        #: tightest of the scaled flow bounds of each group is added to the model.
+        #: Only used with `NetworkModel.PTDF`, defaults to False.
+        self.PTDF_COMPRESSION: bool = False
+
+        #: Flag to indicate whether PTDF matrices should be saved to, and reused from, the
+        #: directory PTDF_CACHE_DIR. Matrices are identified by the topology of the network,
+        #: so that runs of different cases of the same system reuse them. Not used with
+        #: `PTDFEngine.LAZY`, defaults to False.
+        self.PTDF_CACHE: bool = False
+
+        #: dir of the PTDF cache, defaults to ''.
+        #: If not given, a directory ptdf_cache will be created in the parent directory
+        self.PTDF_CACHE_DIR: str = ''
+
+        #: Maximum size in MB of the PTDF cache directory. The least recently used matrices are
+        #: deleted when it is exceeded, defaults to 4096.
+        self.PTDF_CACHE_MAX_SIZE_MB: Real = 4096
+
+        #: npz file of the reduction plan of the system. If the file exists, the network reduction
+        #: recorded in it is replayed, as long as it is valid for the case, instead of reducing the
+        #: network again. Otherwise, or if it is not valid, the network is reduced and its
+        #: reduction is recorded and saved to the file. Only used with `REDUCE_SYSTEM`,
+        #: defaults to '', in which case no plan is used.
+        self.REDUCTION_PLAN_FILE: str = ''
+
+        #: Flag to indicate whether, after the model of the reduced network is solved, the model of
+        #: the original network should be solved again with the commitment decisions fixed.
+        #: Otherwise, the flows of the original network are only obtained from the injections of
+        #: the reduced network. Only used with `REDUCE_SYSTEM`, defaults to False.
+        self.RESOLVE_FULL_NETWORK: bool = False
+
+        #: Flag to indicate whether N-1 security should be enforced, that is, whether the flow
+        #: limits of the monitored lines should also hold after the outage of any single line.
+        #: The post-contingency flows are obtained with line outage distribution factors (LODF)
+        #: computed from the PTDF, and only the (outage, monitored line) pairs whose limits can
+        #: be reached are added to the model. Only used with `NetworkModel.PTDF` and cannot be
+        #: used with `REDUCE_SYSTEM`, defaults to False.
+        self.N_1_SECURITY: bool = False
+
         if args is not None:
             _set_attr_from_console(self, W_RANK=0, args=args)
 
@@ -346,6 +469,16 @@ class Params:
         if not os.path.isdir(self.OUT_DIR):
             os.makedirs(self.OUT_DIR)
 
+        if self.PTDF_CACHE_DIR == '' or self.PTDF_CACHE_DIR is None:
+            self.PTDF_CACHE_DIR = (
+                            os.path.abspath(
+                                os.path.join(__file__, "../../..")
+                            ).replace("\\", "/")
+                            + '/ptdf_cache/'
+            )
+        elif self.PTDF_CACHE_DIR[-1] not in ('/', '\\'):
+            self.PTDF_CACHE_DIR += '/'
+
         _check_choices(self)
 
         self._START: Real = dt()
@@ -0,0 +1,51 @@
+import numpy as np
+from scipy import sparse
+
+from components.network import Network
+
+# if 1 - (PTDF_k[from_k] - PTDF_k[to_k]) is less than this value, then the outage of line k splits
+# its subsystem (the line is a bridge) and no LODF is defined for it
+_BRIDGE_TOL = 1e-6
+
+
+def get_contingencies(network:Network) -> list[int]:
+    """
+        get the lines whose outages are the contingencies of the network. these are the lines
+        read from the input whose endpoints and reactances were not changed by the reduction of
+        the network. lines created by the reduction are equivalents, whose outage is not a
+        physical event
+    """
+    return [l for l in network.LINE_ID
+                    if network.CONTINGENCIES.get(l) == (network.LINE_F_T[l], network.LINE_X[l])]
+
+
+def get_lodf(ptdf_cols:sparse.csc_matrix,
+             monitored_rows:np.ndarray, outage_rows:np.ndarray,
+             outage_from:np.ndarray, outage_to:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+        LODFs from the PTDF rows in `ptdf_cols`, a CSC matrix so that its columns are readily
+        accessible. `monitored_rows` and `outage_rows` are the rows of the monitored lines and of
+        the outaged lines in `ptdf_cols`, and `outage_from` and `outage_to` are the columns of
+        the endpoints of the outaged lines. LODF[m, k] is the change in the flow of monitored
+        line m per unit of pre-outage flow in outaged line k when the latter is taken out of
+        service, that is,
+        LODF[m, k] = (PTDF_m[from_k] - PTDF_m[to_k]) / (1 - (PTDF_k[from_k] - PTDF_k[to_k])).
+        the entries of a line with respect to its own outage are not meaningful and are left to
+        the caller. also returns a flag for each outage that indicates whether the outaged line
+        is a bridge, in which case its column is zero
+    """
+
+    # sensitivity of the flows to a transfer of one unit from the 'from' to the 'to' bus of
+    # each outaged line
+    transfer = (ptdf_cols[:, outage_from] - ptdf_cols[:, outage_to]).toarray()
+
+    denominator = 1 - transfer[outage_rows, np.arange(len(outage_rows))]
+
+    bridges = np.abs(denominator) < _BRIDGE_TOL
+    denominator[bridges] = 1
+
+    lodf = transfer[monitored_rows, :] / denominator
+    lodf[:, bridges] = 0
+
+    return lodf, bridges
+
@@ -1,6 +1,23 @@
+import os
 from time import time
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu, SuperLU
+
+from params import Params
+from constants import PTDFEngine
 from components.network import Network, _get_isolated_subsystems
+from pre_processing.ptdf_cache import topology_fingerprint, load_cached_ptdf, cache_ptdf
+
+# number of PTDF rows obtained at once from the triangular solves of the sparse engine.
+# larger values use more memory but make fewer calls to the solver
+_ROWS_PER_SOLVE = 512
+
+# relative tolerance on the residuals of the PTDF rows obtained from a previous PTDF matrix
+_BASIS_TOL = 1e-8
 
 def _get_unordered_Y_B(network:Network,
                        buses:list,
@@ -25,78 +42,633 @@ def _get_unordered_Y_B(network:Network,
     return Y, B, A
 
 
-def build_ptdf(network:Network):
+def _get_unordered_sparse_Y_B(network:Network,
+                              buses:list,
+                              lines:list) -> tuple[sparse.dia_matrix,
+                                                   sparse.csc_matrix,
+                                                   sparse.csr_matrix]:
     """
-        computes the power-transfer distribution factors matrix
-        network:            an instance of Network
+    same as _get_unordered_Y_B, but the matrices are kept in compressed sparse form
     """
 
-    time_0 = time()
+    inverse_map_buses = {bus: b for b, bus in enumerate(buses)}
 
-    if len(set(network.LINE_F_T.values())) != len(network.LINE_ID):
-        raise ValueError('there are parallel lines')
+    rows = np.repeat(np.arange(len(lines), dtype='int64'), 2)
+    cols = np.array([inverse_map_buses[bus] for l in lines for bus in network.LINE_F_T[l]],
+                    dtype='int64')
+    coeffs = np.tile(np.array([1, -1], dtype='d'), len(lines))
 
-    network.PTDF = np.zeros((len(network.LINE_ID), len(network.BUS_ID)),
-                            dtype='d')
+    A = sparse.csr_matrix((coeffs, (rows, cols)), shape=(len(lines), len(buses)))
 
-    # create a map of from-to-buses (endpoints) to line id
-    map_f_t_buses = {f_t: l for l, f_t in network.LINE_F_T.items()}
+    Y = sparse.diags(np.array([1/network.LINE_X[l] for l in lines], dtype='d'))
 
-    inverse_map_buses = {bus: b for b, bus in enumerate(network.BUS_ID)}
-    inverse_map_lines = {line: l for l, line in enumerate(network.LINE_ID)}
+    B = (A.T @ Y @ A).tocsc()
+
+    return Y, B, A
+
+
+def _ptdf_sub_sys_dense(network:Network, buses:list, lines:list) -> np.ndarray:
+    """
+        PTDF of an isolated subsystem by explicitly inverting the reduced susceptance matrix.
+        The first bus in `buses` is the reference
+    """
+
+    (Y, B, A) = _get_unordered_Y_B(network, buses=buses, lines=lines)
+
+    B_minus_ref = np.concatenate((B[:, 0:0], B[:, 1:]), axis=1)
+
+    B_minus_ref = np.concatenate((B_minus_ref[0:0,:], B_minus_ref[1:,:]),
+                                 axis=0)
+
+    B_minus_ref_inv = np.linalg.inv(B_minus_ref)
+
+    #### now include the reference buses again with zero coefficients
+    # include a column with zeros
+    B_with_ref_inv = np.concatenate(
+                    (np.concatenate((B_minus_ref_inv[:, 0:0],
+                                np.zeros((len(buses) - 1, 1))), axis=1),
+                                B_minus_ref_inv[:, 0:]), axis=1
+    )
+
+    # include a row with zeros
+    B_with_ref_inv = np.concatenate(
+                    (np.concatenate((B_with_ref_inv[0:0, :],
+                                    np.zeros((1, len(buses)))), axis=0),
+                                    B_with_ref_inv[0:, :]), axis=0
+    )
+
+    return np.matmul(np.matmul(Y, A), B_with_ref_inv)
+
+
+def _ptdf_sub_sys_sparse(network:Network, buses:list, lines:list) -> tuple[np.ndarray,
+                                                                             SuperLU | None]:
+    """
+        PTDF of an isolated subsystem from a sparse LU factorization of the reduced
+        susceptance matrix. The first bus in `buses` is the reference.
+        Because B is symmetric, the transpose of the PTDF rows, B^-1 (Y A)^T, are obtained
+        with triangular solves, a few hundred rows at a time.
+        The factorization is also returned so that it can be reused after the network is reduced
+    """
+
+    ptdf_sub_sys = np.zeros((len(lines), len(buses)), dtype='d')
+
+    if len(buses) <= 1:
+        return ptdf_sub_sys, None
+
+    (Y, B, A) = _get_unordered_sparse_Y_B(network, buses=buses, lines=lines)
+
+    lu = _factorize(B[1:, 1:].tocsc())
+
+    Y_A_minus_ref = (Y @ A).tocsr()[:, 1:]
+
+    for first_row in range(0, len(lines), _ROWS_PER_SOLVE):
+        last_row = min(first_row + _ROWS_PER_SOLVE, len(lines))
+        ptdf_sub_sys[first_row:last_row, 1:] = np.transpose(
+                        lu.solve(Y_A_minus_ref[first_row:last_row, :].T.toarray())
+        )
+
+    return ptdf_sub_sys, lu
+
+
+def _factorize(B_minus_ref:sparse.csc_matrix):
+    """sparse LU factorization of the (symmetric) reduced susceptance matrix"""
+    return splu(B_minus_ref, permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.0,
+                options={'SymmetricMode': True})
+
+
+class LazyPTDF:
+    """
+    A PTDF matrix whose rows are only computed when they are first requested, and then cached.
+    The reduced susceptance matrix of each isolated subsystem is factorized once, the first
+    time one of its rows is needed, and each row is then obtained through triangular solves.
+
+    Rows and columns are indexed just as the dense PTDF, e.g., `ptdf[l_idx, :]` or
+    `ptdf[[l_idx_1, l_idx_2], :]`, where `l_idx` is the index of the line in `network.LINE_ID`
+    and the columns follow `network.BUS_ID`.
+    """
 
-    disjoint_subsys = _get_isolated_subsystems(network)
+    def __init__(self:"LazyPTDF", network:Network, sub_systems:list[tuple[list, list]]):
 
-    for sub_sys in disjoint_subsys.values():
+        self.shape = (len(network.LINE_ID), len(network.BUS_ID))
+        self.ndim = 2
+        self.dtype = np.dtype('d')
+
+        inverse_map_buses = {bus: b for b, bus in enumerate(network.BUS_ID)}
+        inverse_map_lines = {line: l for l, line in enumerate(network.LINE_ID)}
+
+        # for each line, the subsystem it belongs to, the local indices of its endpoints
+        # in the subsystem, and its admittance
+        self._line_sub_sys = np.zeros(self.shape[0], dtype='int64')
+        self._line_ends = np.zeros((self.shape[0], 2), dtype='int64')
+        self._line_admt = np.zeros(self.shape[0], dtype='d')
+
+        # column indices (in network.BUS_ID) and reduced susceptance matrix of each subsystem
+        self._buses_idxs, self._B_minus_ref = [], []
+
+        for s, (buses, lines) in enumerate(sub_systems):
+            local_buses = {bus: b for b, bus in enumerate(buses)}
+            lines_idxs = [inverse_map_lines[line] for line in lines]
+
+            self._line_sub_sys[lines_idxs] = s
+            self._line_ends[lines_idxs, :] = [[local_buses[network.LINE_F_T[l][0]],
+                                               local_buses[network.LINE_F_T[l][1]]]
+                                              for l in lines]
+            self._line_admt[lines_idxs] = [1/network.LINE_X[l] for l in lines]
+
+            (_, B, _) = _get_unordered_sparse_Y_B(network, buses=buses, lines=lines)
+
+            self._buses_idxs.append(np.array([inverse_map_buses[bus] for bus in buses],
+                                             dtype='int64'))
+            self._B_minus_ref.append(B[1:, 1:].tocsc())
+
+        # factorizations of the subsystems' reduced susceptance matrices. they are not pickled
+        self._lu = {}
+
+        self._rows = {}     # cached rows
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # SuperLU objects cannot be pickled. they are recomputed if needed
+        state['_lu'] = {}
+        return state
+
+    def __getitem__(self, key):
+        (rows, cols) = key if isinstance(key, tuple) else (key, slice(None))
+
+        idxs = np.arange(self.shape[0])[rows]
+
+        block = self.get_rows(np.atleast_1d(idxs))
+
+        if np.ndim(idxs) == 0:
+            return block[0, cols]
+        return block[:, cols]
+
+    def __array__(self, dtype=None, copy=None):
+        full = self.get_rows(np.arange(self.shape[0]))
+        return full if dtype is None else full.astype(dtype)
+
+    def get_rows(self:"LazyPTDF", lines_idxs) -> np.ndarray:
+        """Get the rows in `lines_idxs` as a dense array. Rows not yet computed are computed
+        and cached"""
+
+        missing = np.array([l_idx for l_idx in dict.fromkeys(int(l) for l in lines_idxs)
+                            if l_idx not in self._rows], dtype='int64')
+
+        for s in np.unique(self._line_sub_sys[missing]):
+            self._compute_rows(s, missing[self._line_sub_sys[missing] == s])
+
+        block = np.zeros((len(lines_idxs), self.shape[1]), dtype='d')
+        for r, l_idx in enumerate(lines_idxs):
+            block[r, :] = self._rows[int(l_idx)]
+        return block
+
+    def _compute_rows(self:"LazyPTDF", s:int, lines_idxs:np.ndarray):
+        """compute the rows of lines `lines_idxs`, all of which belong to subsystem `s`"""
+
+        buses_idxs = self._buses_idxs[s]
+
+        if s not in self._lu:
+            self._lu[s] = _factorize(self._B_minus_ref[s])
+
+        for first in range(0, len(lines_idxs), _ROWS_PER_SOLVE):
+            chunk = lines_idxs[first:first + _ROWS_PER_SOLVE]
+
+            # right-hand sides y_l*(e_from - e_to), without the reference bus
+            rhs = np.zeros((len(buses_idxs), len(chunk)), dtype='d')
+            rhs[self._line_ends[chunk, 0], np.arange(len(chunk))] = self._line_admt[chunk]
+            rhs[self._line_ends[chunk, 1], np.arange(len(chunk))] = -self._line_admt[chunk]
+
+            sol = self._lu[s].solve(rhs[1:, :])
+
+            for j, l_idx in enumerate(chunk):
+                row = np.zeros(self.shape[1], dtype='d')
+                row[buses_idxs[1:]] = sol[:, j]
+                self._rows[int(l_idx)] = row
+
+
+def get_ptdf_rows(network:Network, lines_idxs:list[int], tol:float=0.0) -> sparse.csr_matrix:
+    """
+        Rows `lines_idxs` of the PTDF matrix as a CSR matrix, regardless of how network.PTDF is
+        stored, in which coefficients whose magnitudes are less than `tol` are zero.
+        The matrix is always a new object, so callers may modify it
+    """
+
+    if sparse.issparse(network.PTDF):
+        rows = network.PTDF[lines_idxs, :].tocsr()
+    else:
+        rows = sparse.csr_matrix(np.asarray(network.PTDF[lines_idxs, :]))
+
+    if tol > 0:
+        rows.data[np.abs(rows.data) < tol] = 0
+        rows.eliminate_zeros()
+
+    return rows
+
+
+def _get_sub_systems(network:Network) -> list[tuple[list, list]]:
+    """
+        get the buses and lines of each isolated subsystem. the first bus of each subsystem
+        is its reference bus for the PTDF
+    """
+
+    sub_systems = []
+
+    for sub_sys in _get_isolated_subsystems(network).values():
 
         buses = sub_sys['nodes']
 
         lines = []
 
         for end_points in sub_sys['edges']:
-            if end_points in map_f_t_buses.keys():
-                lines.append(map_f_t_buses[end_points])
+            if end_points in network.LINE_OF_F_T:
+                lines.append(network.LINE_OF_F_T[end_points])
             else:
                 try:
-                    lines.append(map_f_t_buses[(end_points[1], end_points[0])])
+                    lines.append(network.LINE_OF_F_T[end_points[1], end_points[0]])
                 except KeyError as error:
                     s = f"There is no line between buses {end_points}"
                     raise ValueError(s) from error
 
-        (Y, B, A) = _get_unordered_Y_B(network, buses=buses, lines=lines)
+        if len(lines) > 0:
+            sub_systems.append((buses, lines))
 
-        B_minus_ref = np.concatenate((B[:, 0:0], B[:, 1:]), axis=1)
+    return sub_systems
 
-        B_minus_ref = np.concatenate((B_minus_ref[0:0,:], B_minus_ref[1:,:]),
-                                     axis=0)
 
-        B_minus_ref_inv = np.linalg.inv(B_minus_ref)
+class PTDFBasis:
+    """
+    Snapshot of the network for which a PTDF matrix was built, together with that matrix and the
+    factorizations of the subsystems' reduced susceptance matrices that were computed.
 
-        #### now include the reference buses again with zero coefficients
-        # include a column with zeros
-        B_with_ref_inv = np.concatenate(
-                        (np.concatenate((B_minus_ref_inv[:, 0:0],
-                                    np.zeros((len(buses) - 1, 1))), axis=1),
-                                    B_minus_ref_inv[:, 0:]), axis=1
-        )
+    All reductions applied by `reduce_network` are Kron (Schur complement) eliminations of buses
+    of B. Therefore, the voltage angles of the buses kept are the same in the original and in the
+    reduced networks, up to a constant that depends on the reference bus. A PTDF row of a line
+    that was not changed by the reduction is then simply the restriction of its previous row to
+    the buses kept, minus the coefficient of the new reference bus. Only the rows of lines
+    created or changed by the reduction need to be solved for.
+    """
 
-        # include a row with zeros
-        B_with_ref_inv = np.concatenate(
-                        (np.concatenate((B_with_ref_inv[0:0, :],
-                                        np.zeros((1, len(buses)))), axis=0),
-                                        B_with_ref_inv[0:, :]), axis=0
-        )
+    def __init__(self:"PTDFBasis", network:Network, sub_systems:list[tuple[list, list]],
+                 ptdf:np.ndarray | None, factorizations:dict[int, SuperLU]):
+
+        self.ptdf = ptdf
+
+        self.bus_idx = {bus: b for b, bus in enumerate(network.BUS_ID)}
+
+        # index, endpoints and reactance of each line
+        self.lines = {line: (l, network.LINE_F_T[line], network.LINE_X[line])
+                                                        for l, line in enumerate(network.LINE_ID)}
+
+        # subsystem of each bus and index of the bus in the subsystem
+        self.bus_sub_sys = {bus: (s, b) for s, (buses, _) in enumerate(sub_systems)
+                                                                for b, bus in enumerate(buses)}
+
+        self.n_buses_sub_sys = [len(buses) for (buses, _) in sub_systems]
+
+        # factorizations of the subsystems' reduced susceptance matrices. they are not pickled
+        self.factorizations = factorizations
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['factorizations'] = {}
+        return state
+
+
+def _solve_injection_pairs(lu:SuperLU, n_buses:int,
+                           ends:np.ndarray, admt:np.ndarray) -> np.ndarray:
+    """
+        Voltage angles, with the first bus as reference, resulting from injections of admt[k]
+        at bus ends[k, 0] and -admt[k] at bus ends[k, 1], where `lu` is the factorization of the
+        reduced susceptance matrix of a subsystem with n_buses buses. One column per injection
+    """
+
+    angles = np.zeros((n_buses, len(admt)), dtype='d')
+
+    for first in range(0, len(admt), _ROWS_PER_SOLVE):
+        last = min(first + _ROWS_PER_SOLVE, len(admt))
+        rhs = np.zeros((n_buses, last - first), dtype='d')
+        rhs[ends[first:last, 0], np.arange(last - first)] = admt[first:last]
+        rhs[ends[first:last, 1], np.arange(last - first)] -= admt[first:last]
+        angles[1:, first:last] = lu.solve(rhs[1:, :])
+
+    return angles
+
+
+def _ptdf_sub_sys_from_basis(network:Network, basis:PTDFBasis,
+                             buses:list, lines:list) -> tuple[np.ndarray | None, SuperLU | None]:
+    """
+        PTDF of an isolated subsystem of a network obtained from the network of `basis` through
+        reductions. The first bus in `buses` is the reference.
+        The rows of lines created or changed by the reduction are obtained with the factorization
+        carried by the basis, if the subsystem had been factorized, or otherwise with a
+        factorization of the (smaller) reduced subsystem, which is then also returned.
+        Returns None if the subsystem cannot be derived from the basis, in which case the
+        PTDF must be computed from scratch
+    """
+
+    if any(bus not in basis.bus_sub_sys for bus in buses):
+        return None, None
+
+    s = basis.bus_sub_sys[buses[0]][0]
+    if any(basis.bus_sub_sys[bus][0] != s for bus in buses):
+        return None, None
+
+    ptdf_sub_sys = np.zeros((len(lines), len(buses)), dtype='d')
+
+    if len(buses) <= 1:
+        return ptdf_sub_sys, None
+
+    (Y, B, A) = _get_unordered_sparse_Y_B(network, buses=buses, lines=lines)
+
+    # rows of lines that are the same in both networks. if the previous matrix was not kept, as
+    # with the CSR storage, whose coefficients are not exact, all rows are solved for
+    kept = [(r, basis.lines[l][0]) for r, l in enumerate(lines)
+                        if l in basis.lines and basis.lines[l][1:] == (network.LINE_F_T[l],
+                                                                       network.LINE_X[l])
+                        and basis.ptdf is not None]
+    if len(kept) > 0:
+        (kept_rows, prev_rows) = zip(*kept)
+        block = basis.ptdf[np.ix_(prev_rows, [basis.bus_idx[bus] for bus in buses])]
+        block -= block[:, [0]]
+        ptdf_sub_sys[kept_rows, :] = block
+
+    # rows of lines created or modified by the reduction
+    lu = None
+    kept_rows = set(r for r, _ in kept)
+    new_rows = [r for r in range(len(lines)) if r not in kept_rows]
+    if len(new_rows) > 0:
+        admt = np.array([1/network.LINE_X[lines[r]] for r in new_rows], dtype='d')
+        if s in basis.factorizations:
+            ends = np.array([[basis.bus_sub_sys[bus][1] for bus in network.LINE_F_T[lines[r]]]
+                                                                        for r in new_rows],
+                            dtype='int64')
+            angles = _solve_injection_pairs(basis.factorizations[s], basis.n_buses_sub_sys[s],
+                                            ends, admt)[[basis.bus_sub_sys[bus][1]
+                                                                        for bus in buses], :]
+            angles -= angles[[0], :]
+        else:
+            local_buses = {bus: b for b, bus in enumerate(buses)}
+            ends = np.array([[local_buses[bus] for bus in network.LINE_F_T[lines[r]]]
+                                                                        for r in new_rows],
+                            dtype='int64')
+            lu = _factorize(B[1:, 1:].tocsc())
+            angles = _solve_injection_pairs(lu, len(buses), ends, admt)
+        ptdf_sub_sys[new_rows, :] = angles.T
+
+    # the above is only valid if the current subsystem is a Kron reduction of the previous one.
+    # check that the rows satisfy B PTDF^T = (Y A)^T, without the reference bus. to avoid a
+    # dense product, both sides are multiplied by a few random combinations of the rows
+    weights = np.random.default_rng(0).uniform(-1, 1, (len(lines), 2))
+    residual = (B[1:, 1:] @ (ptdf_sub_sys[:, 1:].T @ weights)
+                                            - (Y @ A).tocsc()[:, 1:].T @ weights)
+    if np.max(np.abs(residual)) > _BASIS_TOL * np.max(Y.diagonal()) * len(lines):
+        return None, None
+
+    return ptdf_sub_sys, lu
+
+
+def _get_n_processes(params:Params) -> int:
+    """number of processes used to compute the PTDF of the subsystems"""
+    if params.PTDF_PROCESSES > 0:
+        return params.PTDF_PROCESSES
+    if params.THREADS > 0:
+        return params.THREADS
+    return os.cpu_count() or 1
+
+
+def _get_mp_context():
+    """
+        the child processes only use numpy and scipy, so forking is safe and avoids re-importing
+        the main module, which initializes MPI. fork is not available on Windows
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+def _get_sub_network(network:Network, lines:list) -> Network:
+    """a network with only the data of `lines` needed to compute the PTDF of their subsystems"""
+    sub_network = Network()
+    sub_network.LINE_F_T = {l: network.LINE_F_T[l] for l in lines}
+    sub_network.LINE_X = {l: network.LINE_X[l] for l in lines}
+    return sub_network
+
+
+def _split_jobs(sub_systems:list[tuple[list, list]], pending:list[int],
+                n_processes:int) -> list[list[int]]:
+    """
+        assign the subsystems in `pending` to n_processes jobs with similar workloads, so that
+        each process gets a single job. the largest subsystems are assigned first, each to the
+        job with the least work so far
+    """
+    jobs = [[] for _ in range(n_processes)]
+    workload = np.zeros(n_processes, dtype='d')
+    for s in sorted(pending, key=lambda s: -len(sub_systems[s][0])*len(sub_systems[s][1])):
+        p = int(np.argmin(workload))
+        jobs[p].append(s)
+        workload[p] += len(sub_systems[s][0])*len(sub_systems[s][1])
+    return [job for job in jobs if len(job) > 0]
 
-        ptdf_sub_sys = np.matmul(np.matmul(Y, A), B_with_ref_inv)
 
-        _aux = np.zeros((len(lines), len(network.BUS_ID)), dtype='d')
+def _ptdf_sub_sys_child(engine:PTDFEngine, sub_network:Network,
+                        sub_systems:list[tuple[list, list, np.ndarray, np.ndarray]],
+                        shared_buffer_name:str | None, shape:tuple[int, int],
+                        tol:float) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+    """
+        Compute the PTDF of subsystems in a child process. Each subsystem is given by its
+        buses, its lines, and the indices of the lines and buses in the PTDF matrix.
+        If `shared_buffer_name` is given, the PTDFs are written to the shared PTDF matrix of
+        shape `shape`. Otherwise, the coordinates and values of the coefficients whose
+        magnitudes are at least `tol` are returned
+    """
+
+    (rows, cols, coeffs) = ([], [], [])
+
+    shared_buffer, ptdf = None, None
+    if shared_buffer_name is not None:
+        shared_buffer = SharedMemory(name=shared_buffer_name)
+        ptdf = np.ndarray(shape, dtype='d', buffer=shared_buffer.buf)
+
+    try:
+        for (buses, lines, lines_idxs, buses_idxs) in sub_systems:
+            if engine == PTDFEngine.SPARSE:
+                ptdf_sub_sys, _ = _ptdf_sub_sys_sparse(sub_network, buses, lines)
+            else:
+                ptdf_sub_sys = _ptdf_sub_sys_dense(sub_network, buses, lines)
+
+            if ptdf is not None:
+                ptdf[np.ix_(lines_idxs, buses_idxs)] = ptdf_sub_sys
+            else:
+                (r, c) = np.nonzero(np.abs(ptdf_sub_sys) >= tol)
+                rows.append(lines_idxs[r])
+                cols.append(buses_idxs[c])
+                coeffs.append(ptdf_sub_sys[r, c])
+    finally:
+        if shared_buffer is not None:
+            del ptdf
+            shared_buffer.close()
+
+    if shared_buffer_name is not None:
+        return None
+
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(coeffs)
+
+
+def build_ptdf(params:Params, network:Network):
+    """
+        computes the power-transfer distribution factors matrix
+        params:             an instance of Params. the method used is given by
+                            params.PTDF_ENGINE
+        network:            an instance of Network. if params.PTDF_INCREMENTAL is True and
+                            network.PTDF_BASIS is set, i.e., the network was reduced after its
+                            PTDF was last built, then the PTDF is updated from the previous one
+        if params.PTDF_CACHE is True, matrices are saved to and, for identical topologies,
+        memory-mapped from params.PTDF_CACHE_DIR. the lazy engine does not use the cache
+    """
+
+    time_0 = time()
+
+    if len(network.LINE_OF_F_T) != len(network.LINE_ID):
+        raise ValueError('there are parallel lines')
+
+    sub_systems = _get_sub_systems(network)
+
+    if params.PTDF_ENGINE == PTDFEngine.LAZY:
+        network.PTDF = LazyPTDF(network, sub_systems)
+        network.PTDF_BASIS = None
+
+        print(f"\n\nIt took {time()-time_0:,.4f} seconds to set up the lazy PTDF matrix",
+              flush=True)
+        return
+
+    if params.PTDF_CACHE:
+        fingerprint = topology_fingerprint(network, sub_systems)
+        ptdf = load_cached_ptdf(params, fingerprint)
+
+        if ptdf is not None and ptdf.shape == (len(network.LINE_ID), len(network.BUS_ID)):
+            network.PTDF = ptdf
+            network.PTDF_BASIS = (PTDFBasis(network, sub_systems,
+                                            network.PTDF if not params.PTDF_SPARSE_STORAGE
+                                                                                    else None, {})
+                                  if params.PTDF_INCREMENTAL else None)
+
+            print(f"\n\nIt took {time()-time_0:,.4f} seconds to load the PTDF matrix from the " +
+                  "cache", flush=True)
+            return
+
+    basis = network.PTDF_BASIS if params.PTDF_INCREMENTAL else None
+
+    inverse_map_buses = {bus: b for b, bus in enumerate(network.BUS_ID)}
+    inverse_map_lines = {line: l for l, line in enumerate(network.LINE_ID)}
+
+    idxs = [(np.array([inverse_map_lines[line] for line in lines], dtype='int64'),
+             np.array([inverse_map_buses[bus] for bus in buses], dtype='int64'))
+                                                                for (buses, lines) in sub_systems]
+
+    factorizations, updated = {}, {}
+
+    for s, (buses, lines) in enumerate(sub_systems):
+        (ptdf_sub_sys, lu) = (_ptdf_sub_sys_from_basis(network, basis, buses, lines)
+                                                        if basis is not None else (None, None))
+        if ptdf_sub_sys is not None:
+            (updated[s], factorizations[s]) = (ptdf_sub_sys, lu)
+
+    # subsystems whose PTDF must be computed from scratch
+    pending = [s for s in range(len(sub_systems)) if s not in updated]
+
+    n_processes = min(_get_n_processes(params), len(pending))
+
+    # coordinates and values of the coefficients of the CSR matrix
+    (rows, cols, coeffs) = ([], [], [])
+
+    shared_buffer = None
+    if n_processes > 1 and not params.PTDF_SPARSE_STORAGE:
+        # the child processes write their subsystems' PTDF directly to this buffer
+        shared_buffer = SharedMemory(create=True,
+                                     size=max(8*len(network.LINE_ID)*len(network.BUS_ID), 1))
+        network.PTDF = np.ndarray((len(network.LINE_ID), len(network.BUS_ID)), dtype='d',
+                                  buffer=shared_buffer.buf)
+        network.PTDF[:] = 0
+    elif not params.PTDF_SPARSE_STORAGE:
+        network.PTDF = np.zeros((len(network.LINE_ID), len(network.BUS_ID)),
+                                dtype='d')
+
+    def _store(s:int, ptdf_sub_sys:np.ndarray):
+        (lines_idxs, buses_idxs) = idxs[s]
+        if not params.PTDF_SPARSE_STORAGE:
+            network.PTDF[np.ix_(lines_idxs, buses_idxs)] = ptdf_sub_sys
+        else:
+            (r, c) = np.nonzero(np.abs(ptdf_sub_sys) >= params.PTDF_COEFF_TOL)
+            rows.append(lines_idxs[r])
+            cols.append(buses_idxs[c])
+            coeffs.append(ptdf_sub_sys[r, c])
+
+    for s, ptdf_sub_sys in updated.items():
+        _store(s, ptdf_sub_sys)
+    del updated
+
+    if n_processes > 1:
+        completed = False
+        try:
+            with ProcessPoolExecutor(max_workers=n_processes,
+                                     mp_context=_get_mp_context()) as executor:
+                futures = [executor.submit(_ptdf_sub_sys_child,
+                                           params.PTDF_ENGINE,
+                                           _get_sub_network(network, [l for s in job
+                                                                    for l in sub_systems[s][1]]),
+                                           [(*sub_systems[s], *idxs[s]) for s in job],
+                                           shared_buffer.name if shared_buffer is not None
+                                                                                    else None,
+                                           (len(network.LINE_ID), len(network.BUS_ID)),
+                                           params.PTDF_COEFF_TOL)
+                                    for job in _split_jobs(sub_systems, pending, n_processes)]
+                for future in futures:
+                    result = future.result()
+                    if result is not None:
+                        rows.append(result[0])
+                        cols.append(result[1])
+                        coeffs.append(result[2])
+            completed = True
+        finally:
+            if shared_buffer is not None:
+                # the view on the shared buffer must be dropped before the buffer is closed. if
+                # the matrix was completed, it is copied to memory owned by the process
+                network.PTDF = np.array(network.PTDF) if completed else None
+                try:
+                    shared_buffer.close()
+                finally:
+                    shared_buffer.unlink()
+    else:
+        for s in pending:
+            (buses, lines) = sub_systems[s]
+            if params.PTDF_ENGINE == PTDFEngine.SPARSE:
+                ptdf_sub_sys, factorizations[s] = _ptdf_sub_sys_sparse(network, buses, lines)
+            else:
+                ptdf_sub_sys = _ptdf_sub_sys_dense(network, buses, lines)
+            _store(s, ptdf_sub_sys)
 
-        lines_idxs = [inverse_map_lines[line] for line in lines]
-        buses_idxs = [inverse_map_buses[bus] for bus in buses]
+    if params.PTDF_SPARSE_STORAGE:
+        network.PTDF = sparse.csr_matrix(
+                            (np.concatenate(coeffs) if coeffs else np.zeros(0, dtype='d'),
+                             (np.concatenate(rows) if rows else np.zeros(0, dtype='int64'),
+                              np.concatenate(cols) if cols else np.zeros(0, dtype='int64'))),
+                            shape=(len(network.LINE_ID), len(network.BUS_ID)))
 
-        _aux[:, buses_idxs] = ptdf_sub_sys
+    # the thresholded coefficients of the CSR matrix cannot be used to update the PTDF of a
+    # reduced network, but the factorizations can
+    network.PTDF_BASIS = (PTDFBasis(network, sub_systems,
+                                    network.PTDF if not params.PTDF_SPARSE_STORAGE else None,
+                                    {s: lu for s, lu in factorizations.items() if lu is not None})
+                          if params.PTDF_INCREMENTAL else None)
 
-        network.PTDF[lines_idxs, :] = _aux
+    if params.PTDF_CACHE:
+        cache_ptdf(params, fingerprint, network.PTDF)
 
-    print(f"\n\nIt took {time()-time_0:,.4f} seconds to build the PTDF matrix",
-          flush=True)
+    print(f"\n\nIt took {time()-time_0:,.4f} seconds to build the PTDF matrix " +
+          f"({params.PTDF_ENGINE.name.lower()} engine", end='')
+    if basis is not None:
+        print(f", {len(sub_systems) - len(pending)} of {len(sub_systems)} subsystems updated " +
+              "from the previous PTDF", end='')
+    if n_processes > 1:
+        print(f", {len(pending)} subsystems computed by {n_processes} processes", end='')
+    print(")", flush=True)
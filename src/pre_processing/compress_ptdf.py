@@ -0,0 +1,113 @@
+from time import time
+import numpy as np
+from scipy import sparse
+
+from params import Params
+from components.thermal import Thermals
+from components.network import Network
+from pre_processing.build_ptdf import get_ptdf_rows
+
+
+def _group_collinear_rows(rows:sparse.csr_matrix, tol:float) -> list[list[tuple[int, float]]]:
+    """
+        group the rows of `rows` that are scalar multiples of each other. each group is a list of
+        (row, alpha) where the first row of the group is its representative, and
+        |rows[row] - alpha * rows[representative]| <= tol for all coefficients
+
+        the rows are normalized to unit norm, with the sign such that their projections onto a
+        random vector are positive, so that collinear rows become (nearly) equal. they are then
+        sorted by their projections onto a second random vector, and since rows whose
+        normalized coefficients differ by at most tol_u have projections that differ by at most
+        tol_u * ||g||_1, only rows within this distance in the sorted order need to be compared
+    """
+
+    rng = np.random.default_rng(0)
+    (g_sign, g_sort) = (rng.standard_normal(rows.shape[1]), rng.standard_normal(rows.shape[1]))
+
+    norms = np.sqrt(np.asarray(rows.multiply(rows).sum(axis=1)).ravel())
+    nonzero_rows = np.nonzero(norms > 0)[0]
+
+    if len(nonzero_rows) <= 1:
+        return [[(r, 1.0)] for r in nonzero_rows]
+
+    signs = np.where(rows @ g_sign >= 0, 1.0, -1.0)
+    scale = np.zeros(rows.shape[0], dtype='d')
+    scale[nonzero_rows] = signs[nonzero_rows] * norms[nonzero_rows]
+
+    # normalized rows
+    unit_rows = sparse.diags(np.divide(1, scale, out=np.zeros_like(scale), where=scale != 0)
+                                                                            ) @ rows
+    unit_rows = unit_rows.tocsr()
+
+    # a difference of at most tol_u in the normalized coefficients is a difference of at most
+    # tol in the coefficients of rows[row] - alpha * rows[representative]
+    tol_u = tol / np.max(norms)
+    key_tol = tol_u * np.sum(np.abs(g_sort))
+
+    keys = unit_rows @ g_sort
+    order = nonzero_rows[np.argsort(keys[nonzero_rows], kind='stable')]
+
+    groups = []
+    grouped = np.zeros(rows.shape[0], dtype=bool)
+
+    for (pos, r) in enumerate(order):
+        if grouped[r]:
+            continue
+        grouped[r] = True
+        group = [(int(r), 1.0)]
+
+        for other in order[pos + 1:]:
+            if keys[other] - keys[r] > key_tol:
+                break
+            if grouped[other]:
+                continue
+            diff = unit_rows[other, :] - unit_rows[r, :]
+            if diff.nnz == 0 or np.max(np.abs(diff.data)) <= tol_u:
+                grouped[other] = True
+                group.append((int(other), float(scale[other] / scale[r])))
+
+        groups.append(group)
+
+    return groups
+
+
+def compress_ptdf_rows(params:Params, thermals:Thermals, network:Network):
+    """
+        Find the possibly binding lines whose PTDF rows are, within params.PTDF_COEFF_TOL, scalar
+        multiples of the PTDF row of another possibly binding line, e.g., lines in series or
+        lines in the same corridor. Only the columns of buses to which loads or generating
+        elements are connected are compared, since the other columns do not appear in the flow
+        constraints. The flow of such a line is alpha times the flow of the other line, its
+        representative, and thus only the tightest of the scaled bounds of the lines in a group
+        needs to be enforced. The map line -> (representative, alpha) is stored in
+        network.COLLINEAR_LINES, for the lines that are not representatives
+    """
+
+    time_0 = time()
+
+    network.COLLINEAR_LINES = {}
+
+    possibly_active_bounds_idxs = [l_idx for l_idx, l in enumerate(network.LINE_ID)
+                                                                if network.ACTIVE_BOUNDS[l]]
+
+    injection_buses = (network.get_gen_buses(thermals) | network.get_load_buses() |
+                                                            network.get_renewable_gen_buses())
+    buses_with_injections_idxs = [b for b, bus in enumerate(network.BUS_ID)
+                                                                    if bus in injection_buses]
+
+    rows = get_ptdf_rows(network, possibly_active_bounds_idxs,
+                         params.PTDF_COEFF_TOL)[:, buses_with_injections_idxs].tocsr()
+
+    groups = _group_collinear_rows(rows, params.PTDF_COEFF_TOL)
+
+    for group in groups:
+        representative = network.LINE_ID[possibly_active_bounds_idxs[group[0][0]]]
+        for (r, alpha) in group[1:]:
+            network.COLLINEAR_LINES[network.LINE_ID[possibly_active_bounds_idxs[r]]] = (
+                                                                        representative, alpha)
+
+    time_end = time()
+
+    print(f"\nThe PTDF rows of the {len(possibly_active_bounds_idxs)} possibly binding lines " +
+          f"were grouped into {len(groups)} groups of collinear rows in " +
+          f"{time_end - time_0:,.4f} seconds", flush=True)
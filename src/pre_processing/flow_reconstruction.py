@@ -0,0 +1,148 @@
+import numpy as np
+from scipy import sparse
+
+from components.thermal import Thermals
+from components.network import Network
+from pre_processing.build_ptdf import _get_sub_systems, _get_unordered_sparse_Y_B, _factorize
+
+
+class FlowReconstruction:
+    """
+    Linear operator that maps the bus injections of a reduced network, together with the
+    injections of the buses of the original network that were deleted by the reduction, to the
+    voltage angles and flows of the original network.
+
+    All rules of reduce_network are Kron reductions, so the angles of the buses kept are the same
+    in the reduced and in the original networks. Once these angles are known, those of the
+    deleted buses are given by B_ee theta_e = p_e - B_ek theta_k, where B_ee and B_ek are the
+    blocks of the susceptance matrix of the original network with the rows of the deleted buses,
+    and the flows are Y A theta. The angles and flows of all periods are then obtained at once
+    with sparse products and triangular solves, and the matrices are only factorized the first
+    time they are needed.
+    """
+
+    def __init__(self:"FlowReconstruction", original_network:Network, network:Network):
+
+        #: Buses and lines of the original network.
+        self.BUS_ID: list[int] = list(original_network.BUS_ID)
+        self.LINE_ID: list[int] = list(original_network.LINE_ID)
+
+        #: Buses of the reduced network.
+        self.REDUCED_BUS_ID: list[int] = list(network.BUS_ID)
+
+        bus_idx = {bus: b for b, bus in enumerate(self.BUS_ID)}
+        reduced_bus_idx = {bus: b for b, bus in enumerate(self.REDUCED_BUS_ID)}
+
+        # in islands of the original network with no bus kept, and for buses with no lines, the
+        # angle of one bus is fixed at zero
+        grounded = [bus for bus in self.BUS_ID
+                        if len(original_network.LINES_FROM_BUS[bus]) +
+                                                len(original_network.LINES_TO_BUS[bus]) == 0]
+        for (buses, _) in _get_sub_systems(original_network):
+            if not any(bus in reduced_bus_idx for bus in buses):
+                grounded.append(buses[0])
+
+        #: Buses of the original network deleted by the reduction, whose angles are computed.
+        self.DELETED_BUS_ID: list[int] = [bus for bus in self.BUS_ID
+                                                if bus not in reduced_bus_idx and
+                                                    bus not in set(grounded)]
+
+        self._kept_idxs = np.array([bus_idx[bus] for bus in self.REDUCED_BUS_ID], dtype='int64')
+        self._deleted_idxs = np.array([bus_idx[bus] for bus in self.DELETED_BUS_ID],
+                                      dtype='int64')
+
+        (Y, B, A) = _get_unordered_sparse_Y_B(original_network, buses=self.BUS_ID,
+                                              lines=self.LINE_ID)
+
+        self._Y_A = (Y @ A).tocsr()
+        B = B.tocsr()
+        self._B_ek = B[self._deleted_idxs, :][:, self._kept_idxs].tocsr()
+        self._B_ee = B[self._deleted_idxs, :][:, self._deleted_idxs].tocsc()
+
+        # indices in REDUCED_BUS_ID of the buses of each island of the reduced network, and its
+        # reduced susceptance matrix. the first bus of each island is its reference
+        self._reduced_sub_systems = []
+        for (buses, lines) in _get_sub_systems(network):
+            if len(buses) > 1:
+                (_, B_red, _) = _get_unordered_sparse_Y_B(network, buses=buses, lines=lines)
+                self._reduced_sub_systems.append(
+                                (np.array([reduced_bus_idx[bus] for bus in buses], dtype='int64'),
+                                 B_red[1:, 1:].tocsc()))
+
+        # factorizations of B_ee and of the matrices of the islands. they are not pickled
+        self._lu = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # SuperLU objects cannot be pickled. they are recomputed if needed
+        state['_lu'] = {}
+        return state
+
+    def _solve(self:"FlowReconstruction", key, matrix:sparse.csc_matrix,
+               rhs:np.ndarray) -> np.ndarray:
+        """solve `matrix` x = `rhs`, factorizing `matrix` the first time it is needed"""
+        if key not in self._lu:
+            self._lu[key] = _factorize(matrix)
+        return self._lu[key].solve(np.ascontiguousarray(rhs))
+
+    def get_angles_and_flows(self:"FlowReconstruction",
+                             reduced_injections:np.ndarray,
+                             deleted_injections:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+            voltage angles of the buses and flows of the lines of the original network, in the
+            orders of BUS_ID and LINE_ID, given the injections of the buses of the reduced
+            network, in the order of REDUCED_BUS_ID, and those of the buses of the original
+            network in DELETED_BUS_ID. each column of the injections is a period
+        """
+
+        n_periods = reduced_injections.shape[1]
+
+        reduced_angles = np.zeros((len(self.REDUCED_BUS_ID), n_periods), dtype='d')
+        for (s, (bus_idxs, B_minus_ref)) in enumerate(self._reduced_sub_systems):
+            reduced_angles[bus_idxs[1:], :] = self._solve(s, B_minus_ref,
+                                                          reduced_injections[bus_idxs[1:], :])
+
+        angles = np.zeros((len(self.BUS_ID), n_periods), dtype='d')
+        angles[self._kept_idxs, :] = reduced_angles
+        if len(self.DELETED_BUS_ID) > 0:
+            angles[self._deleted_idxs, :] = self._solve('deleted', self._B_ee,
+                                        deleted_injections - self._B_ek @ reduced_angles)
+
+        return (angles, self._Y_A @ angles)
+
+
+def get_bus_injections(thermals:Thermals, network:Network, buses:list[int], n_periods:int,
+                       t_g:dict[tuple[int, int], float],
+                       s_load_curtailment:dict[tuple[int, int], float],
+                       s_gen_surplus:dict[tuple[int, int], float],
+                       s_renew_curtailment:dict[tuple[int, int], float]) -> np.ndarray:
+    """
+        power injections of `buses` in all periods, as in get_bus_injection_expr without the
+        flows, but computed from the values of the variables as a sparse product
+    """
+
+    bus_idx = {bus: b for b, bus in enumerate(buses)}
+    units = list(thermals.ID)
+
+    unit_coeffs = sparse.csr_matrix(
+                    ([coeff for g in units for bus, coeff in thermals.BUS_COEFF[g].items()
+                                                                        if bus in bus_idx],
+                     ([bus_idx[bus] for g in units for bus in thermals.BUS_COEFF[g]
+                                                                        if bus in bus_idx],
+                      [g_idx for g_idx, g in enumerate(units) for bus in thermals.BUS_COEFF[g]
+                                                                        if bus in bus_idx])),
+                     shape=(len(buses), len(units)))
+
+    gen = np.array([[t_g[g, t] for t in range(n_periods)] for g in units],
+                   dtype='d').reshape((len(units), n_periods))
+
+    injections = unit_coeffs @ gen - network.NET_LOAD[
+                                    [network.BUS_HEADER[bus] for bus in buses], :n_periods]
+
+    for (slacks, sign) in ((s_load_curtailment, 1), (s_gen_surplus, -1),
+                           (s_renew_curtailment, -1)):
+        for (bus, t), value in slacks.items():
+            if bus in bus_idx:
+                injections[bus_idx[bus], t] += sign*value
+
+    return injections
@@ -1,8 +1,10 @@
 import sys
 from os import path
 from time import time
+from multiprocessing.shared_memory import SharedMemory
 from mpi4py import MPI
 import numpy as np
+from scipy import sparse
 import gurobipy as grbpy
 
 if __name__ == '__main__':
@@ -10,8 +12,10 @@ if __name__ == '__main__':
 
     sys.path.append(ROOT_FOLDER + "/")
 
-from components.network import get_buses_bounds_on_injections
-from constants import Model, quicksum
+from components.network import (Network, get_buses_bounds_on_injections_arrays,
+                                _get_isolated_subsystems)
+from pre_processing.build_ptdf import get_ptdf_rows
+from constants import Model, NetworkModel, quicksum
 
 
 def _test_ptdf(m, network, power_inj, flow):
@@ -28,16 +32,19 @@ def _test_ptdf(m, network, power_inj, flow):
         m.write("infeas_angles.mps")
         raise ValueError("reduced network angle model is infeasible")
 
+    ptdf = get_ptdf_rows(network, list(range(len(network.LINE_ID))))
+
     max_d = 0
     for l_index in range(len(network.LINE_ID)):
 
         l = network.LINE_ID[l_index]
 
-        non_zeros = np.where(abs(network.PTDF[l_index, :]) > 0)[0]
+        first, last = ptdf.indptr[l_index], ptdf.indptr[l_index + 1]
 
         flow_ptdf = (
-                        sum(network.PTDF[l_index,b_index] * power_inj[network.BUS_ID[b_index]].x
-                            for b_index in non_zeros)
+                        sum(coeff * power_inj[network.BUS_ID[b_index]].x
+                            for (b_index, coeff) in zip(ptdf.indices[first:last],
+                                                        ptdf.data[first:last]))
                     )
 
         diff = flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l].x - flow_ptdf
@@ -47,21 +54,8 @@ def _test_ptdf(m, network, power_inj, flow):
     print(f"The maximum difference in flows between the B-theta and PTDF formulations is {max_d}")
 
 
-def _remove_redundant_flow_limits_angles(params, network,
-                                            thermals,
-                                                time_limit: float = 360,
-                                                    list_of_jobs: list = None,
-                                                        print_to_console: bool = True,
-                                                            run_single_period_models: bool = True):
-    """
-    Use the complete DC model to identify more redundant limits
-    """
-
-    time_0 = time()
-    last_time = time_0 + time_limit
-
-    if list_of_jobs is None:
-        list_of_jobs = [l for l in network.LINE_ID if network.ACTIVE_BOUNDS[l]]
+def _get_empty_model(params) -> grbpy.Model:
+    """empty gurobi model, without output, in which the screening models are built"""
 
     env = grbpy.Env(empty=True)
     env.setParam('OutputFlag', 0)
@@ -69,48 +63,160 @@ def _remove_redundant_flow_limits_angles(params, network,
     env.start()
     m = grbpy.Model("m", env=env)
 
-    flow = {k:
-                m.addVar(
-                            lb = np.min(network.LINE_FLOW_LB[k[-1]]),
-                            ub = np.max(network.LINE_FLOW_UB[k[-1]]),
-                            vtype='C', name = f"flow_{k}")
-            for k in [(network.LINE_F_T[l][0], network.LINE_F_T[l][1], l) for l in network.LINE_ID
-                                                                    if network.ACTIVE_BOUNDS[l]]}
-
-    theta = {k: m.addVar(lb = -10000, vtype='C', name = f"theta_bus_{k}")
-                for k in network.BUS_ID}
-
-    for bus in network.REF_BUS_ID:
-        theta[bus].lb = 0
-        theta[bus].ub = 0
-
-    for l in [l for l in network.LINE_ID if network.ACTIVE_BOUNDS[l]]:
-        ADMT = 1/network.LINE_X[l]
-        m.addConstr(flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l]
-                                    == ADMT*(theta[network.LINE_F_T[l][0]] -
-                                        theta[network.LINE_F_T[l][1]]),
-                            name=f"AC_flow_{network.LINE_F_T[l][0]}_{network.LINE_F_T[l][1]}_{l}")
-
-    for l in [l for l in network.LINE_ID if not(network.ACTIVE_BOUNDS[l])]:
-        ADMT = 1/network.LINE_X[l]
-        flow[network.LINE_F_T[l][0],network.LINE_F_T[l][1],l] = (ADMT*(theta[network.LINE_F_T[l][0]]
-                                                                - theta[network.LINE_F_T[l][1]]))
+    if params.SCREENING_WARM_START:
+        # after the objective changes, the previous optimal basis is still feasible, so the
+        # primal simplex method starts from it
+        m.setParam('Method', 0)
+        m.setParam('LPWarmStart', 1)
+
+    return m
+
+
+class _ScreeningModel:
+    """
+        LP used to screen the flow bounds. The model is built once by a subclass, and then the
+        bounds on the bus injections are set either to those over the whole scheduling horizon
+        or to those of a single period, so that the same model is used for all lines and periods
+    """
+
+    def __init__(self:"_ScreeningModel", params, network):
+
+        self.BUS_ID = list(network.BUS_ID)
+
+        #: The model, in which the subclasses add the flow variables `flow`, indexed by
+        #: (from bus, to bus, line), the injections of the buses `power_inj` and the power
+        #: balances `power_balance_constrs`.
+        self.m = _get_empty_model(params)
+
+        #: Number of simplex iterations of each LP solved.
+        self.ITERATIONS: list[int] = []
+
+        # period whose bounds are set, which is None for the whole horizon
+        self._period = -1
+
+    def optimize(self:"_ScreeningModel", objective, last_time:float):
+        """
+            minimize `objective` with the time limit given by `last_time`, and record the number
+            of simplex iterations
+        """
+
+        self.m.setObjective(objective)
+        self.m.setParam("TimeLimit", max(last_time - time(), 0))
+        self.m.optimize()
+
+        self.ITERATIONS.append(int(self.m.IterCount))
 
-    power_inj = {k: m.addVar(lb=0, ub=0, obj=0, name=f"power_inj_{k}") for k in network.BUS_ID}
+    def optimize_scenarios(self:"_ScreeningModel", objectives:list[tuple],
+                           last_time:float) -> list[float]:
+        """
+            minimize each of the `objectives`, given by a variable and its coefficient, in a
+            single multi-scenario model with one scenario per objective, with the time limit
+            given by `last_time`, and record the number of simplex iterations. returns a lower
+            bound on the optimal value of each objective, which is -inf if the time limit was
+            reached
+        """
 
-    # get the bounds on the injections at each bus
-    (min_inj, max_inj,
-            min_inj_per_period, max_inj_per_period) = get_buses_bounds_on_injections(
-                                                                params, network, thermals)
+        m = self.m
 
-    for bus in network.BUS_ID:
-        power_inj[bus].lb = min_inj[bus]
-        power_inj[bus].ub = max_inj[bus]
+        m.setObjective(grbpy.LinExpr())
+        m.NumScenarios = len(objectives)
+        for (s, (var, coeff)) in enumerate(objectives):
+            m.Params.ScenarioNumber = s
+            var.ScenNObj = coeff
 
-    power_balance_constrs = []
+        m.setParam("TimeLimit", max(last_time - time(), 0))
+        m.optimize()
 
-    for bus in network.BUS_ID:
-        power_balance_constrs.append(m.addConstr(power_inj[bus]
+        self.ITERATIONS.append(int(m.IterCount))
+
+        if m.status == 2:
+            bounds = []
+            for s in range(len(objectives)):
+                m.Params.ScenarioNumber = s
+                # the scenarios are solved by the MIP solver, whose bound is used in case its
+                # gap is not zero
+                bounds.append(m.ScenNObjBound)
+        elif m.status == 9 and (last_time - time() <= 0):
+            bounds = [-np.inf for _ in objectives]
+        else:
+            m.write("infeas_angles.lp")
+            m.write("infeas_angles.mps")
+            raise ValueError("reduce network angle model is infeasible")
+
+        m.NumScenarios = 0
+
+        return bounds
+
+    def set_period(self:"_ScreeningModel", t:int | None):
+        """
+            set the bounds on the injections of period `t`, or of the whole horizon if t is None,
+            unless they are already set
+        """
+
+        if t == self._period:
+            return
+
+        self._period = t
+
+        self._set_bounds(t)
+
+    def _set_bounds(self:"_ScreeningModel", t:int | None):
+        """set the bounds of period `t`, or of the whole horizon if t is None"""
+        raise NotImplementedError
+
+
+class _AnglesModel(_ScreeningModel):
+    """
+        DC model of the network with voltage angles and a power balance for each bus used to
+        screen the flow bounds
+    """
+
+    def __init__(self:"_AnglesModel", params, network,
+                 p_inj_lb:np.ndarray, p_inj_ub:np.ndarray):
+        """
+            `p_inj_lb` and `p_inj_ub` are the bounds on the injections of the buses, with the rows
+            in the order of network.BUS_ID and one column per period
+        """
+
+        super().__init__(params, network)
+
+        m = self.m
+
+        flow = {k:
+                    m.addVar(
+                                lb = np.min(network.LINE_FLOW_LB[k[-1]]),
+                                ub = np.max(network.LINE_FLOW_UB[k[-1]]),
+                                vtype='C', name = f"flow_{k}")
+                for k in [(network.LINE_F_T[l][0], network.LINE_F_T[l][1], l)
+                                            for l in network.LINE_ID if network.ACTIVE_BOUNDS[l]]}
+
+        theta = {k: m.addVar(lb = -10000, vtype='C', name = f"theta_bus_{k}")
+                    for k in network.BUS_ID}
+
+        for bus in network.REF_BUS_ID:
+            theta[bus].lb = 0
+            theta[bus].ub = 0
+
+        for l in [l for l in network.LINE_ID if network.ACTIVE_BOUNDS[l]]:
+            ADMT = 1/network.LINE_X[l]
+            m.addConstr(flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l]
+                                        == ADMT*(theta[network.LINE_F_T[l][0]] -
+                                            theta[network.LINE_F_T[l][1]]),
+                                name=f"AC_flow_{network.LINE_F_T[l][0]}_" +
+                                                                f"{network.LINE_F_T[l][1]}_{l}")
+
+        for l in [l for l in network.LINE_ID if not(network.ACTIVE_BOUNDS[l])]:
+            ADMT = 1/network.LINE_X[l]
+            flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l] = (
+                                                        ADMT*(theta[network.LINE_F_T[l][0]]
+                                                                - theta[network.LINE_F_T[l][1]]))
+
+        power_inj = {k: m.addVar(lb=0, ub=0, obj=0, name=f"power_inj_{k}") for k in network.BUS_ID}
+
+        power_balance_constrs = []
+
+        for bus in network.BUS_ID:
+            power_balance_constrs.append(m.addConstr(power_inj[bus]
                             - quicksum(flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l]
                                                             for l in network.LINES_FROM_BUS[bus])
                             + quicksum(flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l]
@@ -118,135 +224,474 @@ def _remove_redundant_flow_limits_angles(params, network,
                                                 == 0,
                                                 name = f"power_balance_{bus}"))
 
+        #: The flow variables or expressions, indexed by (from bus, to bus, line), the
+        #: injections of the buses and their power balances.
+        self.flow = flow
+        self.power_inj, self.power_balance_constrs = power_inj, power_balance_constrs
+
+        # bounds on the injections over the whole horizon, and bounds on the injections without
+        # the load in each period, in which the load is the right-hand side of the balances
+        self._min_inj, self._max_inj = np.min(p_inj_lb, axis=1), np.max(p_inj_ub, axis=1)
+        net_load = network.NET_LOAD[[network.BUS_HEADER[bus] for bus in network.BUS_ID],
+                                    :params.T]
+        self._net_load = net_load
+        self._min_power_inj_no_load = p_inj_lb + net_load
+        self._max_power_inj_no_load = p_inj_ub + net_load
+
+        self.set_period(None)
+
+    def _set_bounds(self:"_AnglesModel", t:int | None):
+        """set the bounds on the injections and the loads of period `t`, or of the whole horizon"""
+
+        # the attributes of all buses are set at once
+        power_inj = [self.power_inj[bus] for bus in self.BUS_ID]
+        if t is None:
+            self.m.setAttr("LB", power_inj, self._min_inj.tolist())
+            self.m.setAttr("UB", power_inj, self._max_inj.tolist())
+            self.m.setAttr("RHS", self.power_balance_constrs, [0.0]*len(self.BUS_ID))
+        else:
+            self.m.setAttr("LB", power_inj, self._min_power_inj_no_load[:, t].tolist())
+            self.m.setAttr("UB", power_inj, self._max_power_inj_no_load[:, t].tolist())
+            self.m.setAttr("RHS", self.power_balance_constrs, self._net_load[:, t].tolist())
+
+
+class _PTDFModel(_ScreeningModel):
+    """
+        DC model of the network used to screen the flow bounds in which the flows of the lines
+        with active bounds are written with the PTDF as functions of the net injections of the
+        buses, whose sum is zero in each island. There are no voltage angles and no balance for
+        each bus, so the model is much smaller than _AnglesModel for large networks
+    """
+
+    def __init__(self:"_PTDFModel", params, network,
+                 p_inj_lb:np.ndarray, p_inj_ub:np.ndarray):
+        """
+            `p_inj_lb` and `p_inj_ub` are the bounds on the injections of the buses, with the rows
+            in the order of network.BUS_ID and one column per period
+        """
+
+        super().__init__(params, network)
+
+        m = self.m
+
+        power_inj = {bus: m.addVar(lb=0, ub=0, obj=0, name=f"power_inj_{bus}")
+                                                                        for bus in network.BUS_ID}
+
+        power_balance_constrs = []
+
+        for sub_sys in _get_isolated_subsystems(network).values():
+            power_balance_constrs.append(m.addConstr(quicksum(power_inj[bus]
+                                                                for bus in sub_sys['nodes']) == 0,
+                                        name=f"power_balance_{min(sub_sys['nodes'])}"))
+
+        act_lines_idxs = [l_idx for l_idx in range(len(network.LINE_ID))
+                                                if network.ACTIVE_BOUNDS[network.LINE_ID[l_idx]]]
+
+        # all buses take part in the balances, so the sensitivities are not truncated
+        sensitivities = get_ptdf_rows(network, act_lines_idxs)
+
+        flow = {}
+
+        for (r, l_idx) in enumerate(act_lines_idxs):
+            l = network.LINE_ID[l_idx]
+            k = (network.LINE_F_T[l][0], network.LINE_F_T[l][1], l)
+            flow[k] = m.addVar(lb = np.min(network.LINE_FLOW_LB[l]),
+                               ub = np.max(network.LINE_FLOW_UB[l]),
+                               vtype='C', name = f"flow_{k}")
+
+            first, last = sensitivities.indptr[r], sensitivities.indptr[r + 1]
+            m.addConstr(flow[k] == quicksum(float(coeff) * power_inj[network.BUS_ID[b]]
+                                            for (b, coeff) in zip(sensitivities.indices[first:last],
+                                                                  sensitivities.data[first:last])),
+                        name=f"PTDF_flow_{k[0]}_{k[1]}_{l}")
+
+        #: The flow variables, indexed by (from bus, to bus, line), the net injections of the
+        #: buses and the power balances of the islands.
+        self.flow = flow
+        self.power_inj, self.power_balance_constrs = power_inj, power_balance_constrs
+
+        # bounds on the net injections over the whole horizon and in each period
+        self._min_inj, self._max_inj = np.min(p_inj_lb, axis=1), np.max(p_inj_ub, axis=1)
+        self._p_inj_lb, self._p_inj_ub = p_inj_lb, p_inj_ub
+
+        self.set_period(None)
+
+    def _set_bounds(self:"_PTDFModel", t:int | None):
+        """set the bounds on the net injections of period `t`, or of the whole horizon"""
+
+        (lb, ub) = ((self._min_inj, self._max_inj) if t is None
+                                        else (self._p_inj_lb[:, t], self._p_inj_ub[:, t]))
+
+        power_inj = [self.power_inj[bus] for bus in self.BUS_ID]
+        self.m.setAttr("LB", power_inj, lb.tolist())
+        self.m.setAttr("UB", power_inj, ub.tolist())
+
+
+def _build_screening_model(params, network, p_inj_lb:np.ndarray,
+                           p_inj_ub:np.ndarray) -> _ScreeningModel:
+    """the screening model of the formulation in params.SCREENING_MODEL"""
+
+    if params.SCREENING_MODEL == NetworkModel.PTDF:
+        return _PTDFModel(params, network, p_inj_lb, p_inj_ub)
+
+    return _AnglesModel(params, network, p_inj_lb, p_inj_ub)
+
+
+def _screen_line(params, network, model:_ScreeningModel, l:int, last_time:float) -> bool:
+    """
+        try to show that the bounds of line `l` cannot be reached with the bounds on the
+        injections over the whole horizon, and update its flags. returns False if `last_time`
+        was reached
+    """
+
+    # firstly, try to reach the bounds by considering the whole range of the power injections
+    # at the buses. if the bounds cannot be reached under this assumption, then they can
+    # certainly not be reached when the bus injections are limited to the specific
+    # injections of each period. also, in these model, use both the most restrictive
+    # lower bound and the most restrictive upper bound. if these bounds are not reached, then
+    # the ones less restrictive ones also will not be reached
+
+    model.set_period(None)
+
+    (m, flow) = (model.m, model.flow)
+
+    in_time = True
+
+    if network.ACTIVE_LB[l]:
+        model.optimize(flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l], last_time)
+
+    if not(network.ACTIVE_LB[l]) or (network.ACTIVE_LB[l] and (m.status == 2)):
+        if (not(network.ACTIVE_LB[l])
+                or (m.ObjVal > (np.max(network.LINE_FLOW_LB[l]) + 1e-6))):
+            network.ACTIVE_LB[l] = False
+            network.ACTIVE_LB_PER_PERIOD[l] = {t: False for t in range(params.T)}
+    elif m.status == 9 and (last_time - time() <= 0):
+        in_time = False
+    else:
+        m.write("infeas_angles.lp")
+        m.write("infeas_angles.mps")
+        raise ValueError("reduce network angle model is infeasible")
+
+    if network.ACTIVE_UB[l]:
+        model.optimize(-1*flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l], last_time)
+
+    if not(network.ACTIVE_UB[l]) or (network.ACTIVE_UB[l] and (m.status == 2)):
+        if (not(network.ACTIVE_UB[l])
+                or (-1*m.ObjVal < (np.min(network.LINE_FLOW_UB[l]) - 1e-6))):
+            network.ACTIVE_UB[l] = False
+            network.ACTIVE_UB_PER_PERIOD[l] = {t: False for t in range(params.T)}
+    elif m.status == 9 and (last_time - time() <= 0):
+        in_time = False
+    else:
+        m.write("infeas_angles.lp")
+        m.write("infeas_angles.mps")
+        raise ValueError("reduce network angle model is infeasible")
+
+    if not(network.ACTIVE_LB[l]) and not(network.ACTIVE_UB[l]):
+        # if neither the UB nor the LB can be reached
+        network.ACTIVE_BOUNDS[l] = False
+
+    return in_time
+
+
+def _screen_line_in_period(network, model:_ScreeningModel, l:int, t:int,
+                           last_time:float) -> bool:
+    """
+        try to show that the bounds of line `l` in period `t` cannot be reached with the bounds
+        on the injections of period `t`, and update its flags of period `t`. returns False if
+        `last_time` was reached
+    """
+
+    model.set_period(t)
+
+    (m, flow) = (model.m, model.flow)
+
+    #### try minimizing the flow, i.e., try reaching the LB
+    if network.ACTIVE_LB[l] and network.ACTIVE_LB_PER_PERIOD[l][t]:
+        model.optimize(flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l], last_time)
+
+    if ((not(network.ACTIVE_LB[l])
+            or not(network.ACTIVE_LB_PER_PERIOD[l][t]))
+                or m.status == 2):
+        if ((not(network.ACTIVE_LB[l])
+                or not(network.ACTIVE_LB_PER_PERIOD[l][t]))
+                    or m.ObjVal > (network.LINE_FLOW_LB[l][t] + 1e-6)):
+            # then the LB of line l in period t cannot be reached
+            network.ACTIVE_LB_PER_PERIOD[l][t] = False
+    elif m.status == 9 and (last_time - time() <= 0):
+        return False
+    else:
+        m.write("infeas_angles.lp")
+        m.write("infeas_angles.mps")
+        raise ValueError("reduce network angle model is infeasible")
+
+    #### now try maximizing the flow, i.e., try reaching the UB
+    if network.ACTIVE_UB[l] and network.ACTIVE_UB_PER_PERIOD[l][t]:
+        model.optimize(-1*flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l], last_time)
+
+    if ((not(network.ACTIVE_UB[l])
+            or not(network.ACTIVE_UB_PER_PERIOD[l][t]))
+                or m.status == 2):
+        if ((not(network.ACTIVE_UB[l])
+                or not(network.ACTIVE_UB_PER_PERIOD[l][t]))
+                    or -1*m.ObjVal < (network.LINE_FLOW_UB[l][t] - 1e-6)):
+            # then the UB of line l in period t cannot be reached
+            network.ACTIVE_UB_PER_PERIOD[l][t] = False
+
+    elif m.status == 9 and (last_time - time() <= 0):
+        return False
+    else:
+        m.write("infeas_angles.lp")
+        m.write("infeas_angles.mps")
+        raise ValueError("reduce network angle model is infeasible")
+
+    return True
+
+
+def _screen_jobs_of_period_in_batches(params, network, model:_ScreeningModel, jobs:list[tuple],
+                                     t:int | None, last_time:float):
+    """
+        screen the bounds of the lines of `jobs`, whose flags are already set, in period `t`, or
+        over the whole horizon if t is None, with multi-scenario models of up to
+        params.SCREENING_BATCH_SIZE objectives each. the flags are updated as in _screen_line
+        and _screen_line_in_period, except that, in a period, only the flags of that period are
+        used, since the jobs of a line in different periods might be screened together. returns,
+        for each job, the numbers of simplex iterations of the models whose first objective is
+        of that job
+    """
+
+    model.set_period(t)
+
+    # bounds to be screened, given by the job and by the sign of the flow in the objective
+    if t is None:
+        flags = [(network.ACTIVE_LB[l], network.ACTIVE_UB[l]) for (l, _, _, _) in jobs]
+    else:
+        flags = [(network.ACTIVE_LB_PER_PERIOD[l][t], network.ACTIVE_UB_PER_PERIOD[l][t])
+                                                                        for (l, _, _, _) in jobs]
+    objectives = [(j, sign) for (j, (active_lb, active_ub)) in enumerate(flags)
+                                    for (sign, active) in ((1, active_lb), (-1, active_ub))
+                                                                                    if active]
+
+    iterations = [[] for _ in jobs]
+
+    for first in range(0, len(objectives), params.SCREENING_BATCH_SIZE):
+        batch = objectives[first:first + params.SCREENING_BATCH_SIZE]
+        n_lps = len(model.ITERATIONS)
+        bounds = model.optimize_scenarios(
+                        [(model.flow[network.LINE_F_T[jobs[j][0]][0],
+                                     network.LINE_F_T[jobs[j][0]][1], jobs[j][0]], sign)
+                                                                    for (j, sign) in batch],
+                        last_time)
+        iterations[batch[0][0]].extend(model.ITERATIONS[n_lps:])
+
+        for ((j, sign), bound) in zip(batch, bounds):
+            l = jobs[j][0]
+            if sign == 1 and t is None and bound > np.max(network.LINE_FLOW_LB[l]) + 1e-6:
+                network.ACTIVE_LB[l] = False
+                network.ACTIVE_LB_PER_PERIOD[l] = {t: False for t in range(params.T)}
+            elif sign == -1 and t is None and -1*bound < np.min(network.LINE_FLOW_UB[l]) - 1e-6:
+                network.ACTIVE_UB[l] = False
+                network.ACTIVE_UB_PER_PERIOD[l] = {t: False for t in range(params.T)}
+            elif sign == 1 and t is not None and bound > network.LINE_FLOW_LB[l][t] + 1e-6:
+                network.ACTIVE_LB_PER_PERIOD[l][t] = False
+            elif (sign == -1 and t is not None
+                                        and -1*bound < network.LINE_FLOW_UB[l][t] - 1e-6):
+                network.ACTIVE_UB_PER_PERIOD[l][t] = False
+
+    for (l, _, _, _) in jobs if t is None else []:
+        if not(network.ACTIVE_LB[l]):
+            network.ACTIVE_LB_PER_PERIOD[l] = {t: False for t in range(params.T)}
+        if not(network.ACTIVE_UB[l]):
+            network.ACTIVE_UB_PER_PERIOD[l] = {t: False for t in range(params.T)}
+        if not(network.ACTIVE_LB[l]) and not(network.ACTIVE_UB[l]):
+            network.ACTIVE_BOUNDS[l] = False
+
+    return iterations
+
+
+def _screen_jobs(params, network, model:_ScreeningModel, jobs:list[tuple],
+                 last_time:float) -> list[tuple]:
+    """
+        screen the bounds of a chunk of jobs handed out by the parent process. each job is given
+        by a line, a period, or None for the bounds over the whole horizon, and the flags of the
+        lower and upper bounds of the line in that period, as known by the parent process. the
+        new flags of the jobs are returned in the same format, followed by the numbers of
+        simplex iterations of the LPs solved for each job
+    """
+
+    if params.SCREENING_BATCH_SIZE > 1:
+        return _screen_jobs_in_batches(params, network, model, jobs, last_time)
+
+    results = []
+
+    for (l, t, active_lb, active_ub) in jobs:
+        n_lps = len(model.ITERATIONS)
+        if t is None:
+            (network.ACTIVE_LB[l], network.ACTIVE_UB[l]) = (active_lb, active_ub)
+            _screen_line(params, network, model, l, last_time)
+            results.append((l, t, network.ACTIVE_LB[l], network.ACTIVE_UB[l],
+                            model.ITERATIONS[n_lps:]))
+        else:
+            (network.ACTIVE_LB[l], network.ACTIVE_UB[l]) = (active_lb, active_ub)
+            (network.ACTIVE_LB_PER_PERIOD[l][t],
+                                        network.ACTIVE_UB_PER_PERIOD[l][t]) = (active_lb, active_ub)
+            _screen_line_in_period(network, model, l, t, last_time)
+            results.append((l, t, network.ACTIVE_LB_PER_PERIOD[l][t],
+                            network.ACTIVE_UB_PER_PERIOD[l][t], model.ITERATIONS[n_lps:]))
+
+    return results
+
+
+def _screen_jobs_in_batches(params, network, model:_ScreeningModel, jobs:list[tuple],
+                            last_time:float) -> list[tuple]:
+    """
+        screen the bounds of the jobs as in _screen_jobs, with the jobs of the same period, or
+        over the whole horizon, screened together by _screen_jobs_of_period_in_batches
+    """
+
+    jobs_of_period = {}
+    for (l, t, active_lb, active_ub) in jobs:
+        if t is None:
+            (network.ACTIVE_LB[l], network.ACTIVE_UB[l]) = (active_lb, active_ub)
+        else:
+            (network.ACTIVE_LB_PER_PERIOD[l][t],
+                                        network.ACTIVE_UB_PER_PERIOD[l][t]) = (active_lb, active_ub)
+        jobs_of_period.setdefault(t, []).append((l, t, active_lb, active_ub))
+
+    results = []
+
+    for (t, jobs_t) in jobs_of_period.items():
+        iterations = _screen_jobs_of_period_in_batches(params, network, model, jobs_t, t,
+                                                       last_time)
+        for ((l, _, _, _), iterations_of_job) in zip(jobs_t, iterations):
+            if t is None:
+                results.append((l, t, network.ACTIVE_LB[l], network.ACTIVE_UB[l],
+                                iterations_of_job))
+            else:
+                results.append((l, t, network.ACTIVE_LB_PER_PERIOD[l][t],
+                                network.ACTIVE_UB_PER_PERIOD[l][t], iterations_of_job))
+
+    return results
+
+
+def _get_dominated_periods(p_inj_lb:np.ndarray,
+                           p_inj_ub:np.ndarray) -> tuple[list[int], list[np.ndarray]]:
+    """
+        the periods dominated by each period, i.e., those whose bounds on the injections of all
+        buses are within the bounds of that period, and the order in which the periods are
+        screened, in which the periods that dominate more periods come first. the flows that
+        can be reached in a period can also be reached in the periods that dominate it
+    """
+
+    dominated_periods = []
+    for t in range(p_inj_lb.shape[1]):
+        dominated = (np.all(p_inj_lb[:, [t]] <= p_inj_lb, axis=0) &
+                                                    np.all(p_inj_ub <= p_inj_ub[:, [t]], axis=0))
+        dominated[t] = False
+        dominated_periods.append(np.flatnonzero(dominated))
+
+    # the periods with the same number of dominated periods are taken from the last one
+    periods = sorted(range(p_inj_lb.shape[1] - 1, -1, -1), key=lambda t: -len(dominated_periods[t]))
+
+    return periods, dominated_periods
+
+
+def _remove_bounds_of_dominated_periods(network, jobs:list[tuple], t:int,
+                                        dominated_periods:np.ndarray) -> int:
+    """
+        the bounds of the `jobs` of period `t` found to be unreachable are also unreachable in
+        the periods dominated by `t`, as long as they are not tighter in those periods. update
+        the flags of these periods and return the number of bounds that were still active
+    """
+
+    n_removed = 0
+
+    for (l, _, active_lb, active_ub) in jobs:
+        if active_lb and not(network.ACTIVE_LB_PER_PERIOD[l][t]):
+            for s in dominated_periods.tolist():
+                if (network.ACTIVE_LB_PER_PERIOD[l][s]
+                                and network.LINE_FLOW_LB[l][s] <= network.LINE_FLOW_LB[l][t]):
+                    network.ACTIVE_LB_PER_PERIOD[l][s] = False
+                    n_removed += 1
+        if active_ub and not(network.ACTIVE_UB_PER_PERIOD[l][t]):
+            for s in dominated_periods.tolist():
+                if (network.ACTIVE_UB_PER_PERIOD[l][s]
+                                and network.LINE_FLOW_UB[l][s] >= network.LINE_FLOW_UB[l][t]):
+                    network.ACTIVE_UB_PER_PERIOD[l][s] = False
+                    n_removed += 1
+
+    return n_removed
+
+
+def _remove_redundant_flow_limits_angles(params, network,
+                                            thermals,
+                                                time_limit: float = 360,
+                                                    list_of_jobs: list = None,
+                                                        print_to_console: bool = True,
+                                                            run_single_period_models: bool = True):
+    """
+    Use the complete DC model to identify more redundant limits. returns the number of simplex
+    iterations of each LP solved
+    """
+
+    time_0 = time()
+    last_time = time_0 + time_limit
+
+    if list_of_jobs is None:
+        list_of_jobs = [l for l in network.LINE_ID if network.ACTIVE_BOUNDS[l]]
+
+    (p_inj_lb, p_inj_ub) = get_buses_bounds_on_injections_arrays(params, network, thermals)
+
+    model = _build_screening_model(params, network, p_inj_lb, p_inj_ub)
+
     total_n_jobs = params.T*len(list_of_jobs)
     next_print = 0.001
     new_unreachable_bounds = 0
     counter = 0
+    # bounds of single periods found to be unreachable by the periods that dominate them
+    dominated_bounds = 0
     if print_to_console:
         print(f"Total of {total_n_jobs} jobs to perform. " +
                 f"(Out of {params.T*len(network.LINE_ID)} jobs.)", flush=True)
 
-    # _test_ptdf(m, network, power_inj, flow)
-
-    for l in list_of_jobs:
-
-        # firstly, try to reach the bounds by considering the whole range of the power injections
-        # at the buses. if the bounds cannot be reached under this assumption, then they can
-        # certainly not be reached when the bus injections are limited to the specific
-        # injections of each period. also, in these model, use both the most restrictive
-        # lower bound and the most restrictive upper bound. if these bounds are not reached, then
-        # the ones less restrictive ones also will not be reached
-
-        if network.ACTIVE_LB[l]:
-            m.setObjective(flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l])
-            m.setParam("TimeLimit", max(last_time - time(), 0))
-            m.optimize()
-
-        if not(network.ACTIVE_LB[l]) or (network.ACTIVE_LB[l] and (m.status == 2)):
-            if (not(network.ACTIVE_LB[l])
-                    or (m.ObjVal > (np.max(network.LINE_FLOW_LB[l]) + 1e-6))):
-                network.ACTIVE_LB[l] = False
-                network.ACTIVE_LB_PER_PERIOD[l] = {t: False for t in range(params.T)}
-        elif m.status == 9 and (last_time - time() <= 0):
-            pass
-        else:
-            m.write("infeas_angles.lp")
-            m.write("infeas_angles.mps")
-            raise ValueError("reduce network angle model is infeasible")
+    # _test_ptdf(model.m, network, model.power_inj, model.flow)
 
-        if network.ACTIVE_UB[l]:
-            m.setObjective(-1*flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l])
-            m.setParam("TimeLimit", max(last_time - time(), 0))
-            m.optimize()
+    if params.SCREENING_BATCH_SIZE > 1:
+        _screen_jobs(params, network, model,
+                     [(l, None, network.ACTIVE_LB[l], network.ACTIVE_UB[l]) for l in list_of_jobs],
+                     last_time)
 
-        if not(network.ACTIVE_UB[l]) or (network.ACTIVE_UB[l] and (m.status == 2)):
-            if (not(network.ACTIVE_UB[l])
-                    or (-1*m.ObjVal < (np.min(network.LINE_FLOW_UB[l]) - 1e-6))):
-                network.ACTIVE_UB[l] = False
-                network.ACTIVE_UB_PER_PERIOD[l] = {t: False for t in range(params.T)}
-        elif m.status == 9 and (last_time - time() <= 0):
-            pass
-        else:
-            m.write("infeas_angles.lp")
-            m.write("infeas_angles.mps")
-            raise ValueError("reduce network angle model is infeasible")
+    for l in list_of_jobs:
+        if params.SCREENING_BATCH_SIZE <= 1:
+            _screen_line(params, network, model, l, last_time)
 
-        if not(network.ACTIVE_LB[l]) and not(network.ACTIVE_UB[l]):
-            # if neither the UB nor the LB can be reached
-            network.ACTIVE_BOUNDS[l] = False
+        if not(network.ACTIVE_BOUNDS[l]):
             new_unreachable_bounds += 1
             counter += params.T
 
     if not(run_single_period_models):
-        return network.ACTIVE_BOUNDS
-
-    # compute the injection bounds removing the load
-    min_power_inj_no_load = {bus: {t:
-                        (min_inj_per_period[bus][t] + network.NET_LOAD[network.BUS_HEADER[bus], t])
-                                            for t in range(params.T)} for bus in network.BUS_ID}
-    max_power_inj_no_load = {bus: {t:
-                        (max_inj_per_period[bus][t] + network.NET_LOAD[network.BUS_HEADER[bus], t])
-                                            for t in range(params.T)} for bus in network.BUS_ID}
-
-    for l in [l for l in list_of_jobs if network.ACTIVE_BOUNDS[l]]:
-        for t in [t for t in range(params.T - 1, -1, -1) if network.ACTIVE_LB_PER_PERIOD[l][t] or
-                                                                network.ACTIVE_UB_PER_PERIOD[l][t]]:
-
-            for b, bus in enumerate(network.BUS_ID):
-                power_inj[bus].lb = min_power_inj_no_load[bus][t]
-                power_inj[bus].ub = max_power_inj_no_load[bus][t]
-                power_balance_constrs[b].rhs = network.NET_LOAD[network.BUS_HEADER[bus], t]
-
-            #### try minimizing the flow, i.e., try reaching the LB
-            if network.ACTIVE_LB[l] and network.ACTIVE_LB_PER_PERIOD[l][t]:
-                m.setObjective(flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l])
-                m.setParam("TimeLimit", max(last_time - time(), 0))
-                m.optimize()
-
-            if ((not(network.ACTIVE_LB[l])
-                    or not(network.ACTIVE_LB_PER_PERIOD[l][t]))
-                        or m.status == 2):
-                if ((not(network.ACTIVE_LB[l])
-                        or not(network.ACTIVE_LB_PER_PERIOD[l][t]))
-                            or m.ObjVal > (network.LINE_FLOW_LB[l][t] + 1e-6)):
-                    # then the LB of line l in period t cannot be reached
-                    network.ACTIVE_LB_PER_PERIOD[l][t] = False
-            elif m.status == 9 and (last_time - time() <= 0):
-                break
-            else:
-                m.write("infeas_angles.lp")
-                m.write("infeas_angles.mps")
-                raise ValueError("reduce network angle model is infeasible")
-
-            #### now try maximizing the flow, i.e., try reaching the UB
-            if network.ACTIVE_UB[l] and network.ACTIVE_UB_PER_PERIOD[l][t]:
-                m.setObjective(-1*flow[network.LINE_F_T[l][0], network.LINE_F_T[l][1], l])
-                m.setParam("TimeLimit", max(last_time - time(), 0))
-                m.optimize()
-
-            if ((not(network.ACTIVE_UB[l])
-                    or not(network.ACTIVE_UB_PER_PERIOD[l][t]))
-                        or m.status == 2):
-                if ((not(network.ACTIVE_UB[l])
-                        or not(network.ACTIVE_UB_PER_PERIOD[l][t]))
-                            or -1*m.ObjVal < (network.LINE_FLOW_UB[l][t] - 1e-6)):
-                    # then the UB of line l in period t cannot be reached
-                    network.ACTIVE_UB_PER_PERIOD[l][t] = False
-
-            elif m.status == 9 and (last_time - time() <= 0):
-                break
-            else:
-                m.write("infeas_angles.lp")
-                m.write("infeas_angles.mps")
-                raise ValueError("reduce network angle model is infeasible")
+        return model.ITERATIONS
 
-            counter += 1
+    lines = [l for l in list_of_jobs if network.ACTIVE_BOUNDS[l]]
 
-        network.ACTIVE_LB[l] = any(network.ACTIVE_LB_PER_PERIOD[l].values())
-        network.ACTIVE_UB[l] = any(network.ACTIVE_UB_PER_PERIOD[l].values())
-        network.ACTIVE_BOUNDS[l] = max(network.ACTIVE_LB[l], network.ACTIVE_UB[l])
-        new_unreachable_bounds += 1
-        counter += 1
+    (periods, dominated_periods) = _get_dominated_periods(p_inj_lb, p_inj_ub)
+
+    # the lines are screened period by period, so that the bounds on the injections are set only
+    # once for each period, and so that they are the same for all objectives of a batch
+    for t in periods:
+        if time() >= last_time:
+            break
+
+        jobs = [(l, t, network.ACTIVE_LB_PER_PERIOD[l][t], network.ACTIVE_UB_PER_PERIOD[l][t])
+                    for l in lines if network.ACTIVE_LB_PER_PERIOD[l][t] or
+                                                            network.ACTIVE_UB_PER_PERIOD[l][t]]
+
+        _screen_jobs(params, network, model, jobs, last_time)
+
+        dominated_bounds += _remove_bounds_of_dominated_periods(network, jobs, t,
+                                                                dominated_periods[t])
+
+        counter += len(jobs)
 
         if (counter/total_n_jobs) >= next_print and print_to_console:
             print(f"{100*((counter/total_n_jobs)):,.4f}% of all lines done. "+
@@ -255,27 +700,167 @@ def _remove_redundant_flow_limits_angles(params, network,
                                 f". Average of {(time()-time_0)/(counter/params.T):,.4f} seconds " +
                                 f"per line for {counter} jobs "+
                                 "performed", flush=True)
-            next_print += 0.001
+            next_print = counter/total_n_jobs + 0.001
 
-    del m
+    for l in lines:
+        network.ACTIVE_LB[l] = any(network.ACTIVE_LB_PER_PERIOD[l].values())
+        network.ACTIVE_UB[l] = any(network.ACTIVE_UB_PER_PERIOD[l].values())
+        network.ACTIVE_BOUNDS[l] = max(network.ACTIVE_LB[l], network.ACTIVE_UB[l])
+        new_unreachable_bounds += 1
 
     time_end = time()
 
     if print_to_console:
         print(f"\nTotal time in _remove_redundant_flow_limits_angles is {time_end-time_0:,.4f} sec"+
-                            f" {new_unreachable_bounds} more bounds can be removed.", flush=True)
+                            f" {new_unreachable_bounds} more bounds can be removed. " +
+                            f"{dominated_bounds} bounds of single periods were found to be " +
+                            "unreachable without solving their LPs.", flush=True)
+
+    return model.ITERATIONS
+
 
+# the network and the screening model of a worker of the process pool, built once by each worker
+_POOL_WORKER = {}
 
-def _initialize_child_processes(run_single_period_models:bool = None):
+
+def _share_screening_data(params, network, thermals) -> tuple[SharedMemory, list]:
+    """
+        copy the data needed to build the screening model of `network` to a shared memory
+        buffer, so that the workers of a process pool get them without pickling the network.
+        returns the buffer and the layout of the arrays in it, given by the name, data type,
+        shape and offset of each array
+    """
+
+    (p_inj_lb, p_inj_ub) = get_buses_bounds_on_injections_arrays(params, network, thermals)
+
+    inverse_map_buses = {bus: b for b, bus in enumerate(network.BUS_ID)}
+
+    n_lines = len(network.LINE_ID)
+
+    arrays = {'BUS_ID': np.array(network.BUS_ID, dtype='int64'),
+              'REF_BUS_ID': np.array(network.REF_BUS_ID, dtype='int64'),
+              'NET_LOAD': network.NET_LOAD[[network.BUS_HEADER[bus] for bus in network.BUS_ID],
+                                           :params.T],
+              'P_INJ_LB': p_inj_lb,
+              'P_INJ_UB': p_inj_ub,
+              'LINE_ID': np.array(network.LINE_ID, dtype='int64'),
+              'LINE_F_T': np.array([[inverse_map_buses[network.LINE_F_T[l][0]],
+                                     inverse_map_buses[network.LINE_F_T[l][1]]]
+                                        for l in network.LINE_ID], dtype='int64').reshape(
+                                                                                    (n_lines, 2)),
+              'LINE_X': np.array([network.LINE_X[l] for l in network.LINE_ID], dtype='d'),
+              'LINE_FLOW_LB': np.array([network.LINE_FLOW_LB[l][:params.T]
+                                                                    for l in network.LINE_ID],
+                                       dtype='d').reshape((n_lines, params.T)),
+              'LINE_FLOW_UB': np.array([network.LINE_FLOW_UB[l][:params.T]
+                                                                    for l in network.LINE_ID],
+                                       dtype='d').reshape((n_lines, params.T)),
+              'ACTIVE_BOUNDS': np.array([network.ACTIVE_BOUNDS[l] for l in network.LINE_ID],
+                                        dtype='bool'),
+              'ACTIVE_UB': np.array([network.ACTIVE_UB[l] for l in network.LINE_ID], dtype='bool'),
+              'ACTIVE_LB': np.array([network.ACTIVE_LB[l] for l in network.LINE_ID], dtype='bool'),
+              'ACTIVE_UB_PER_PERIOD': np.array([[network.ACTIVE_UB_PER_PERIOD[l][t]
+                                                    for t in range(params.T)]
+                                                        for l in network.LINE_ID],
+                                               dtype='bool').reshape((n_lines, params.T)),
+              'ACTIVE_LB_PER_PERIOD': np.array([[network.ACTIVE_LB_PER_PERIOD[l][t]
+                                                    for t in range(params.T)]
+                                                        for l in network.LINE_ID],
+                                               dtype='bool').reshape((n_lines, params.T))}
+
+    if params.SCREENING_MODEL == NetworkModel.PTDF:
+        sensitivities = get_ptdf_rows(network, [l_idx for l_idx in range(n_lines)
+                                                if network.ACTIVE_BOUNDS[network.LINE_ID[l_idx]]])
+        arrays['PTDF_DATA'] = sensitivities.data
+        arrays['PTDF_INDICES'] = sensitivities.indices
+        arrays['PTDF_INDPTR'] = sensitivities.indptr
+
+    (layout, size) = ([], 0)
+    for (name, array) in arrays.items():
+        layout.append((name, array.dtype.str, array.shape, size))
+        # keep the offsets aligned to 8 bytes
+        size += 8*(-(-array.nbytes//8))
+
+    shared_buffer = SharedMemory(create=True, size=max(size, 1))
+    for (name, dtype, shape, offset) in layout:
+        view = np.ndarray(shape, dtype=dtype, buffer=shared_buffer.buf, offset=offset)
+        view[...] = arrays[name]
+        del view
+
+    return shared_buffer, layout
+
+
+def _initialize_pool_worker(params, shared_buffer_name:str, layout:list):
+    """
+        build the network and the screening model of a worker of the process pool from the data
+        in the shared buffer. the model is then used for all jobs of the worker
+    """
+
+    shared_buffer = SharedMemory(name=shared_buffer_name)
+    arrays = {}
+    try:
+        for (name, dtype, shape, offset) in layout:
+            view = np.ndarray(shape, dtype=dtype, buffer=shared_buffer.buf, offset=offset)
+            arrays[name] = view.copy()
+            del view
+    finally:
+        shared_buffer.close()
+
+    network = Network()
+
+    network.BUS_ID = arrays['BUS_ID'].tolist()
+    network.BUS_HEADER = {bus: b for b, bus in enumerate(network.BUS_ID)}
+    network.REF_BUS_ID = arrays['REF_BUS_ID'].tolist()
+    network.NET_LOAD = arrays['NET_LOAD']
+
+    network.LINE_ID = arrays['LINE_ID'].tolist()
+    network.LINES_FROM_BUS = {bus: [] for bus in network.BUS_ID}
+    network.LINES_TO_BUS = {bus: [] for bus in network.BUS_ID}
+
+    for (r, l) in enumerate(network.LINE_ID):
+        network.LINE_F_T[l] = (network.BUS_ID[arrays['LINE_F_T'][r, 0]],
+                               network.BUS_ID[arrays['LINE_F_T'][r, 1]])
+        network.LINES_FROM_BUS[network.LINE_F_T[l][0]].append(l)
+        network.LINES_TO_BUS[network.LINE_F_T[l][1]].append(l)
+        network.LINE_X[l] = float(arrays['LINE_X'][r])
+        network.LINE_FLOW_LB[l] = arrays['LINE_FLOW_LB'][r, :]
+        network.LINE_FLOW_UB[l] = arrays['LINE_FLOW_UB'][r, :]
+        network.ACTIVE_BOUNDS[l] = bool(arrays['ACTIVE_BOUNDS'][r])
+        network.ACTIVE_UB[l] = bool(arrays['ACTIVE_UB'][r])
+        network.ACTIVE_LB[l] = bool(arrays['ACTIVE_LB'][r])
+        network.ACTIVE_UB_PER_PERIOD[l] = {t: bool(arrays['ACTIVE_UB_PER_PERIOD'][r, t])
+                                                                    for t in range(params.T)}
+        network.ACTIVE_LB_PER_PERIOD[l] = {t: bool(arrays['ACTIVE_LB_PER_PERIOD'][r, t])
+                                                                    for t in range(params.T)}
+
+    if 'PTDF_INDPTR' in arrays:
+        # only the rows of the lines with active bounds were shared
+        row_sizes = np.zeros(len(network.LINE_ID), dtype='int64')
+        row_sizes[arrays['ACTIVE_BOUNDS']] = np.diff(arrays['PTDF_INDPTR'])
+        network.PTDF = sparse.csr_matrix((arrays['PTDF_DATA'], arrays['PTDF_INDICES'],
+                                          np.concatenate(([0], np.cumsum(row_sizes)))),
+                                         shape=(len(network.LINE_ID), len(network.BUS_ID)))
+
+    _POOL_WORKER['params'] = params
+    _POOL_WORKER['network'] = network
+    _POOL_WORKER['model'] = _build_screening_model(params, network,
+                                                   arrays['P_INJ_LB'], arrays['P_INJ_UB'])
+
+
+def _screen_jobs_in_pool_worker(jobs:list[tuple], last_time:float) -> list[tuple]:
+    """screen a chunk of jobs, as in _screen_jobs, in a worker of the process pool"""
+
+    return _screen_jobs(_POOL_WORKER['params'], _POOL_WORKER['network'], _POOL_WORKER['model'],
+                        jobs, last_time)
+
+
+def _initialize_child_processes():
     """
         child processes have been spawned and here they get their intercommunicator with their
-        parent process, their size and ranks, and also receive through broadcasting the necessary
-        data to run their tasks
+        parent process, and also receive through broadcasting the necessary data to build their
+        models
     """
     CHILD_COMM_ = MPI.Comm.Get_parent() # the intercommunicator to communicate with the parent p
-    SIZE_ = CHILD_COMM_.Get_size()       # size in the intercommunicator
-    CHILD_RANK_ = CHILD_COMM_.Get_rank() # rank of the process in the intercommunicator
-                                        # the rank goes from 0 to (SIZE - 1)
 
     params_, thermals_, network_ = 3*[None]
 
@@ -283,72 +868,47 @@ def _initialize_child_processes(run_single_period_models:bool = None):
     network_ = CHILD_COMM_.bcast(network_, root = 0)
     thermals_ = CHILD_COMM_.bcast(thermals_, root = 0)
 
-    if run_single_period_models is not None:
-        run_single_period_models = CHILD_COMM_.bcast(run_single_period_models, root = 0)
-
-    complete_list_jobs = None
-
-    complete_list_jobs = CHILD_COMM_.bcast(complete_list_jobs, root = 0)
-
-    jobs_per_proc = int(len(complete_list_jobs)/SIZE_)
-
-    if CHILD_RANK_ == (SIZE_ - 1):
-        # the process with the `last` rank gets jobs_per_proc jobs plus whatever remains
-        jobs_ = complete_list_jobs[int(CHILD_RANK_*jobs_per_proc):]
-    else:
-        jobs_ =complete_list_jobs[int(CHILD_RANK_*jobs_per_proc):int((CHILD_RANK_+1)*jobs_per_proc)]
-
     time_limit_ = 360.000
 
     time_limit_ = CHILD_COMM_.bcast(time_limit_, root = 0)
 
-    return (CHILD_COMM_, SIZE_, CHILD_RANK_,
+    return (CHILD_COMM_,
                 params_, thermals_, network_,
-                    jobs_,
-                        time_limit_, run_single_period_models)
+                    time_limit_)
+
 
-def _share_results_with_parent(CHILD_COMM_, network_):
+def _work_for_parent(CHILD_COMM_, params_, network_, model_:_ScreeningModel, last_time_:float):
     """
-        the child processes have finished their jobs and now they will send the results to the
-        parent through reduce
+        ask the parent process for a chunk of jobs, send back their results with the next request,
+        and so on until the parent has no more jobs to hand out
     """
-    aux_active_bounds = np.array([int(v) for v in network_.ACTIVE_BOUNDS.values()], dtype='int')
-    CHILD_COMM_.Reduce([aux_active_bounds, MPI.INT], None, op = MPI.MIN, root = 0)
 
-    aux_ubs = np.array([int(v) for v in network_.ACTIVE_UB.values()], dtype='int')
-    CHILD_COMM_.Reduce([aux_ubs, MPI.INT], None, op = MPI.MIN, root = 0)
+    results = []
 
-    aux_lbs = np.array([int(v) for v in network_.ACTIVE_LB.values()], dtype='int')
-    CHILD_COMM_.Reduce([aux_lbs, MPI.INT], None, op = MPI.MIN, root = 0)
+    while True:
+        CHILD_COMM_.send(results, dest = 0)
 
-    aux_actibe_ubs_per_period = np.array([[network_.ACTIVE_UB_PER_PERIOD[l][t]
-                                            for t in network_.ACTIVE_UB_PER_PERIOD[l].keys()]
-                                                for l in network_.LINE_ID],
-                                                    dtype='int')
-    CHILD_COMM_.Reduce([aux_actibe_ubs_per_period, MPI.INT], None, op = MPI.MIN, root = 0)
+        jobs = CHILD_COMM_.recv(source = 0)
+        if jobs is None:
+            break
 
-    aux_actibe_lbs_per_period = np.array([[network_.ACTIVE_LB_PER_PERIOD[l][t]
-                                            for t in network_.ACTIVE_LB_PER_PERIOD[l].keys()]
-                                                for l in network_.LINE_ID],
-                                                    dtype='int')
-    CHILD_COMM_.Reduce([aux_actibe_lbs_per_period, MPI.INT], None, op = MPI.MIN, root = 0)
+        results = _screen_jobs(params_, network_, model_, jobs, last_time_)
 
 
 if __name__ == '__main__':
     # __name__ will be `__main__` if this script is the first executed by the python process
 
-    (CHILD_COMM, SIZE, CHILD_RANK,
-                    params, thermals, network,
-                        jobs,
-                            time_limit, run_single_period_models
-                                ) =_initialize_child_processes(run_single_period_models=False)
+    (CHILD_COMM,
+        params, thermals, network,
+            time_limit) =_initialize_child_processes()
 
-    _remove_redundant_flow_limits_angles(params, network, thermals,
-                                        time_limit = time_limit,
-                                        list_of_jobs = jobs,
-                                        print_to_console = False,
-                                        run_single_period_models = run_single_period_models)
+    last_time = time() + time_limit
 
-    _share_results_with_parent(CHILD_COMM, network)
+    _work_for_parent(CHILD_COMM, params, network,
+                     _build_screening_model(params, network,
+                                            *get_buses_bounds_on_injections_arrays(params,
+                                                                                   network,
+                                                                                   thermals)),
+                     last_time)
 
     CHILD_COMM.Disconnect()
@@ -1,12 +1,49 @@
 
 import os
+import multiprocessing
 from sys import executable
 from time import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from mpi4py import MPI
 import numpy as np
 
-from components.network import get_buses_bounds_on_injections
-from pre_processing.identify_redund_flows_DC import _remove_redundant_flow_limits_angles
+from constants import MAX_FLOW, ScreeningBackend
+from components.network import get_buses_bounds_on_injections_arrays
+from pre_processing.build_ptdf import get_ptdf_rows, _get_sub_systems
+from pre_processing.build_lodf import get_contingencies, get_lodf
+from pre_processing.identify_redund_flows_DC import (_remove_redundant_flow_limits_angles,
+                                                     _get_dominated_periods,
+                                                     _remove_bounds_of_dominated_periods,
+                                                     _share_screening_data,
+                                                     _initialize_pool_worker,
+                                                     _screen_jobs_in_pool_worker)
+
+# maximum number of entries of the dense arrays used to screen contingencies at once
+_ENTRIES_PER_CHUNK = 2**22
+
+# maximum number of jobs handed out at once to a process that screens the flow bounds
+_MAX_JOBS_PER_CHUNK = 8
+
+def _update_active_bounds(network) -> int:
+    """
+        update the flags of the bounds of each line over the whole horizon from those of each
+        period, and return the number of lines whose bounds are no longer active
+    """
+
+    old_active_bounds = {l: network.ACTIVE_BOUNDS[l] for l in network.LINE_ID}
+
+    for l in network.LINE_ID:
+        network.ACTIVE_UB[l] = any(network.ACTIVE_UB_PER_PERIOD[l].values())
+
+    for l in network.LINE_ID:
+        network.ACTIVE_LB[l] = any(network.ACTIVE_LB_PER_PERIOD[l].values())
+
+    for l in network.LINE_ID:
+        network.ACTIVE_BOUNDS[l] = max(network.ACTIVE_UB[l], network.ACTIVE_LB[l])
+
+    return len([l for l in network.LINE_ID if old_active_bounds[l] != network.ACTIVE_BOUNDS[l]])
+
 
 def remove_redundant_flow_limits_without_opt(params, thermals, network):
     """
@@ -19,7 +56,100 @@ def remove_redundant_flow_limits_without_opt(params, thermals, network):
 
     time_0 = time()
 
-    new_unreachable_bounds = 0
+    if network.PTDF.shape != (len(network.LINE_ID), len(network.BUS_ID)):
+        s = ("The shape of the numpy array network.PTDF must be " +
+            f"({len(network.LINE_ID)}, {len(network.BUS_ID)}): " +
+            "the number of rows is the number "+
+                "and the number of columns equals the number of buses")
+        raise ValueError(s)
+
+    # only the rows of the possibly binding lines are needed
+    act_lines_idxs = [l_idx for l_idx in range(len(network.LINE_ID))
+                                                if network.ACTIVE_BOUNDS[network.LINE_ID[l_idx]]]
+    act_lines = [network.LINE_ID[l_idx] for l_idx in act_lines_idxs]
+
+    line_sensitivities = get_ptdf_rows(network, act_lines_idxs, params.PTDF_COEFF_TOL)
+
+    # negative and positive parts of the sensitivities
+    (neg_sensitivities, pos_sensitivities) = (line_sensitivities.minimum(0),
+                                              line_sensitivities.maximum(0))
+
+    # get the bounds on the injections at each bus, one column per period
+    (p_inj_lb, p_inj_ub) = get_buses_bounds_on_injections_arrays(params, network, thermals)
+
+    # minimum and maximum flows of each line in each period. the flow is minimized (i.e., made
+    # as negative as possible) with the injections of the buses with negative sensitivities at
+    # their upper bounds and those of the buses with positive sensitivities at their lower bounds,
+    # and maximized the other way around
+    min_flow = neg_sensitivities @ p_inj_ub + pos_sensitivities @ p_inj_lb
+    max_flow = neg_sensitivities @ p_inj_lb + pos_sensitivities @ p_inj_ub
+
+    flow_lb = np.array([network.LINE_FLOW_LB[l][:params.T] for l in act_lines],
+                       dtype='d').reshape((len(act_lines), params.T))
+    flow_ub = np.array([network.LINE_FLOW_UB[l][:params.T] for l in act_lines],
+                       dtype='d').reshape((len(act_lines), params.T))
+
+    # the lower bound cannot possibly be reached in these periods
+    for (r, t) in zip(*np.nonzero(min_flow > flow_lb + 1e-18)):
+        network.ACTIVE_LB_PER_PERIOD[act_lines[r]][int(t)] = False
+
+    # and neither can the upper bounds in these periods
+    for (r, t) in zip(*np.nonzero(max_flow < flow_ub - 1e-18)):
+        network.ACTIVE_UB_PER_PERIOD[act_lines[r]][int(t)] = False
+
+    new_unreachable_bounds = _update_active_bounds(network)
+
+    time_end = time()
+
+    print(f"\nThe total time in remove_redundant_flow_limits_without_opt is {time_end-time_0:,.4f}"
+            f" seconds.\nThis function has identified {new_unreachable_bounds} more bounds that "
+            + "can be removed.", flush=True)
+
+
+def _max_flows_with_balance(sensitivities:np.ndarray, p_inj_lb:np.ndarray,
+                            p_inj_range:np.ndarray, deficit:np.ndarray) -> np.ndarray:
+    """
+        maximum flows of the lines whose sensitivities to the injections of the buses of an island
+        are the rows of `sensitivities`, in each period, subject to the bounds on the injections
+        and to the injections adding up to zero. starting with all injections at their lower
+        bounds, `deficit` is the amount by which the injections must still be increased in each
+        period, and the injections of the buses with the largest sensitivities are increased
+        first. the columns of `p_inj_lb`, `p_inj_range` and `deficit` are the periods
+    """
+
+    order = np.argsort(-sensitivities, axis=1)
+    sorted_sensitivities = np.take_along_axis(sensitivities, order, axis=1)
+    sorted_range = p_inj_range[order, :]
+
+    # injections increased and flows added before each bus is reached
+    increase_before = np.cumsum(sorted_range, axis=1) - sorted_range
+    flow_before = (np.cumsum(sorted_sensitivities[:, :, None]*sorted_range, axis=1)
+                                                - sorted_sensitivities[:, :, None]*sorted_range)
+
+    # the last bus whose injection is increased in each period, which only covers what is left of
+    # the deficit
+    last = np.clip(np.sum(increase_before + sorted_range < deficit[None, None, :], axis=1),
+                   0, sensitivities.shape[1] - 1)
+
+    return (sensitivities @ p_inj_lb +
+            np.take_along_axis(flow_before, last[:, None, :], axis=1)[:, 0, :] +
+            np.take_along_axis(sorted_sensitivities, last, axis=1)*
+                (deficit[None, :] -
+                    np.take_along_axis(increase_before, last[:, None, :], axis=1)[:, 0, :]))
+
+
+def remove_redundant_flow_limits_with_balance(params, thermals, network):
+    """
+        try to identify more redundant flow bounds than remove_redundant_flow_limits_without_opt
+        by also taking into account that the injections of the buses of each island must add up
+        to zero in each period. maximizing the flow of a line subject only to this and to the
+        bounds on the injections is a fractional knapsack problem, which is solved by sorting the
+        buses by their sensitivities, and so is minimizing it. these problems are relaxations of
+        those solved in redundant_line_bounds, which also include the flow limits of the other
+        lines, so the bounds found to be redundant here are found without solving any model
+    """
+
+    time_0 = time()
 
     if network.PTDF.shape != (len(network.LINE_ID), len(network.BUS_ID)):
         s = ("The shape of the numpy array network.PTDF must be " +
@@ -28,67 +158,177 @@ def remove_redundant_flow_limits_without_opt(params, thermals, network):
                 "and the number of columns equals the number of buses")
         raise ValueError(s)
 
-    line_sensitivities_arr = network.PTDF[:]
-    line_sensitivities_arr[np.where(abs(network.PTDF) < params.PTDF_COEFF_TOL)] = 0
+    act_lines_idxs = [l_idx for l_idx in range(len(network.LINE_ID))
+                                                if network.ACTIVE_BOUNDS[network.LINE_ID[l_idx]]]
+    act_lines = [network.LINE_ID[l_idx] for l_idx in act_lines_idxs]
 
-    neg_coeff, pos_coeff = {}, {}
-    for l_idx in [l_idx for l_idx in range(len(network.LINE_ID))
-                                                if network.ACTIVE_BOUNDS[network.LINE_ID[l_idx]]]:
-        l = network.LINE_ID[l_idx]
+    # all buses of an island take part in its balance, so the sensitivities are not truncated
+    line_sensitivities = get_ptdf_rows(network, act_lines_idxs)
 
-        neg_coeff[l] = np.where(line_sensitivities_arr[l_idx, :] < 0)[0]
-        pos_coeff[l] = np.where(line_sensitivities_arr[l_idx, :] > 0)[0]
+    (p_inj_lb, p_inj_ub) = get_buses_bounds_on_injections_arrays(params, network, thermals)
 
-    # get the bounds on the injections at each bus
-    (_0, _1, min_inj_per_period, max_inj_per_period) = get_buses_bounds_on_injections(
-                                                                        params, network, thermals)
+    inverse_map_buses = {bus: b for b, bus in enumerate(network.BUS_ID)}
 
-    innactive_lines_per_period = {t: 0 for t in range(params.T)}
+    for (buses, _) in _get_sub_systems(network):
+        buses_idxs = np.array([inverse_map_buses[bus] for bus in buses], dtype='int64')
+        island = set(buses)
 
-    for t in range(params.T):
-        p_inj_ub = np.array([max_inj_per_period[bus][t] for bus in network.BUS_ID], dtype='d')
-        p_inj_lb = np.array([min_inj_per_period[bus][t] for bus in network.BUS_ID], dtype='d')
+        rows = [r for r, l in enumerate(act_lines) if network.LINE_F_T[l][0] in island]
 
-        for l_idx in [l_idx for l_idx in range(len(network.LINE_ID))
-                                                if network.ACTIVE_BOUNDS[network.LINE_ID[l_idx]]]:
-            l = network.LINE_ID[l_idx]
+        lb, inj_range = p_inj_lb[buses_idxs, :], p_inj_ub[buses_idxs, :] - p_inj_lb[buses_idxs, :]
+        deficit = -np.sum(lb, axis=0)
 
-            # minimize the flow in the line (i.e., try to make the flow as negative as possible)
-            objVal = np.inner(line_sensitivities_arr[l_idx, neg_coeff[l]], p_inj_ub[neg_coeff[l]])+\
-                    np.inner(line_sensitivities_arr[l_idx, pos_coeff[l]], p_inj_lb[pos_coeff[l]])
+        # in periods in which the injections cannot add up to zero, nothing is concluded
+        feasible = (deficit >= 0) & (deficit <= np.sum(inj_range, axis=0))
 
-            if objVal > (network.LINE_FLOW_LB[l][t] + 1e-18):
-                # the lower bound cannot possibly be reached in this period
-                network.ACTIVE_LB_PER_PERIOD[l][t] = False
+        lines_per_batch = max(1, _ENTRIES_PER_CHUNK // max(len(buses)*params.T, 1))
 
-            # now maximize the flow
-            objVal = (
-                    np.inner(line_sensitivities_arr[l_idx,neg_coeff[l]],p_inj_lb[neg_coeff[l]])+
-                    np.inner(line_sensitivities_arr[l_idx,pos_coeff[l]],p_inj_ub[pos_coeff[l]]))
+        for first in range(0, len(rows), lines_per_batch):
+            batch = rows[first:first + lines_per_batch]
 
-            if objVal < (network.LINE_FLOW_UB[l][t] - 1e-18):
-                innactive_lines_per_period[t] += 1 # not binding for this period
-                network.ACTIVE_UB_PER_PERIOD[l][t] = False
+            sensitivities = line_sensitivities[batch, :][:, buses_idxs].toarray()
 
-    old_active_bounds = {l: network.ACTIVE_BOUNDS[l] for l in network.LINE_ID}
+            max_flow = _max_flows_with_balance(sensitivities, lb, inj_range, deficit)
+            min_flow = -_max_flows_with_balance(-sensitivities, lb, inj_range, deficit)
 
-    for l in network.LINE_ID:
-        network.ACTIVE_UB[l] = any(network.ACTIVE_UB_PER_PERIOD[l].values())
+            flow_lb = np.array([network.LINE_FLOW_LB[act_lines[r]][:params.T] for r in batch],
+                               dtype='d').reshape((len(batch), params.T))
+            flow_ub = np.array([network.LINE_FLOW_UB[act_lines[r]][:params.T] for r in batch],
+                               dtype='d').reshape((len(batch), params.T))
 
-    for l in network.LINE_ID:
-        network.ACTIVE_LB[l] = any(network.ACTIVE_LB_PER_PERIOD[l].values())
+            for (i, t) in zip(*np.nonzero((min_flow > flow_lb + 1e-6) & feasible[None, :])):
+                network.ACTIVE_LB_PER_PERIOD[act_lines[batch[i]]][int(t)] = False
 
-    for l in network.LINE_ID:
-        network.ACTIVE_BOUNDS[l] = max(network.ACTIVE_UB[l], network.ACTIVE_LB[l])
+            for (i, t) in zip(*np.nonzero((max_flow < flow_ub - 1e-6) & feasible[None, :])):
+                network.ACTIVE_UB_PER_PERIOD[act_lines[batch[i]]][int(t)] = False
+
+    new_unreachable_bounds = _update_active_bounds(network)
 
     time_end = time()
 
-    new_unreachable_bounds = len([l for l in network.LINE_ID
-                                            if old_active_bounds[l] != network.ACTIVE_BOUNDS[l]])
+    print("\nThe total time in remove_redundant_flow_limits_with_balance is " +
+          f"{time_end-time_0:,.4f} seconds.\nThis function has identified " +
+          f"{new_unreachable_bounds} more bounds that can be removed.", flush=True)
 
-    print(f"\nThe total time in remove_redundant_flow_limits_without_opt is {time_end-time_0:,.4f}"
-            f" seconds.\nThis function has identified {new_unreachable_bounds} more bounds that "
-            + "can be removed.", flush=True)
+
+def screen_contingencies(params, thermals, network):
+    """
+        find the pairs (outaged line, monitored line) of the N-1 contingencies whose
+        post-contingency flow limits can possibly be reached, and store them in
+        network.N_1_CONSTRS. the post-contingency flow of monitored line m after the outage of
+        line k is f_m + LODF[m, k] * f_k, whose coefficients w.r.t. the power injections are
+        PTDF_m + LODF[m, k] * PTDF_k. as in remove_redundant_flow_limits_without_opt, the
+        extreme values of these flows are given by the bounds on the injections of the buses.
+        first, all pairs are screened at once with the weaker bound
+        max f_m + max (LODF[m, k] * f_k), and then the exact bounds of the pairs that survive
+        are computed
+    """
+
+    time_0 = time()
+
+    network.N_1_CONSTRS = {}
+
+    outages = get_contingencies(network)
+
+    monitored = [l for l in network.LINE_ID
+                    if (np.min(network.LINE_FLOW_UB[l]) < MAX_FLOW/params.POWER_BASE or
+                        np.max(network.LINE_FLOW_LB[l]) > -MAX_FLOW/params.POWER_BASE)]
+
+    inverse_map_lines = {line: l for l, line in enumerate(network.LINE_ID)}
+    inverse_map_buses = {bus: b for b, bus in enumerate(network.BUS_ID)}
+
+    lines_idxs = sorted(set(inverse_map_lines[l] for l in outages + monitored))
+    row_of = {network.LINE_ID[l_idx]: r for r, l_idx in enumerate(lines_idxs)}
+
+    ptdf_rows = get_ptdf_rows(network, lines_idxs, params.PTDF_COEFF_TOL)
+    ptdf_cols = ptdf_rows.tocsc()
+    # get the bounds on the injections at each bus
+    (p_inj_lb, p_inj_ub) = get_buses_bounds_on_injections_arrays(params, network, thermals)
+
+    # flows with all injections at their upper and at their lower bounds. the maximum flow is
+    # reached with the injections at their lower bounds, except at buses with positive
+    # coefficients, and the minimum flow with the injections at their upper bounds, except at
+    # buses with positive coefficients
+    (flow_at_ub, flow_at_lb) = (ptdf_rows @ p_inj_ub, ptdf_rows @ p_inj_lb)
+    range_contribution = ptdf_rows.maximum(0) @ (p_inj_ub - p_inj_lb)
+
+    # maximum and minimum pre-contingency flows of each line in each period
+    max_flow = flow_at_lb + range_contribution
+    min_flow = flow_at_ub - range_contribution
+
+    monitored_rows = np.array([row_of[l] for l in monitored], dtype='int64')
+    flow_ub = np.array([network.LINE_FLOW_UB[l] for l in monitored], dtype='d')
+    flow_lb = np.array([network.LINE_FLOW_LB[l] for l in monitored], dtype='d')
+
+    # number of outages screened at once, such that the arrays of the weaker bounds have at most
+    # _ENTRIES_PER_CHUNK entries
+    outages_per_chunk = max(1, _ENTRIES_PER_CHUNK // max(len(monitored)*params.T, 1))
+
+    n_bridges, n_pairs_screened = 0, 0
+
+    for first in range(0, len(outages), outages_per_chunk):
+        chunk = outages[first:first + outages_per_chunk]
+
+        outage_rows = np.array([row_of[l] for l in chunk], dtype='int64')
+
+        (lodf, bridges) = get_lodf(ptdf_cols, monitored_rows, outage_rows,
+                                   np.array([inverse_map_buses[network.LINE_F_T[l][0]]
+                                                                for l in chunk], dtype='int64'),
+                                   np.array([inverse_map_buses[network.LINE_F_T[l][1]]
+                                                                for l in chunk], dtype='int64'))
+        n_bridges += int(np.sum(bridges))
+
+        # post-contingency flows that differ from the pre-contingency ones by less than the
+        # tolerance of the PTDF coefficients are covered by the pre-contingency limits
+        lodf[np.abs(lodf) < params.PTDF_COEFF_TOL] = 0
+        lodf[monitored_rows[:, None] == outage_rows[None, :]] = 0
+
+        (m_idxs, k_idxs) = np.nonzero(lodf)
+        n_pairs_screened += len(m_idxs)
+        coeffs = lodf[m_idxs, k_idxs]
+
+        # the weaker bounds
+        max_post_flow = (max_flow[monitored_rows[m_idxs], :] +
+                         np.where(coeffs[:, None] > 0,
+                                  coeffs[:, None]*max_flow[outage_rows[k_idxs], :],
+                                  coeffs[:, None]*min_flow[outage_rows[k_idxs], :]))
+        min_post_flow = (min_flow[monitored_rows[m_idxs], :] +
+                         np.where(coeffs[:, None] > 0,
+                                  coeffs[:, None]*min_flow[outage_rows[k_idxs], :],
+                                  coeffs[:, None]*max_flow[outage_rows[k_idxs], :]))
+
+        survivors = np.nonzero(np.any(max_post_flow >= flow_ub[m_idxs, :] - 1e-18, axis=1) |
+                               np.any(min_post_flow <= flow_lb[m_idxs, :] + 1e-18, axis=1))[0]
+
+        # the exact bounds of the surviving pairs, a few at a time
+        pairs_per_batch = max(1, _ENTRIES_PER_CHUNK // max(len(network.BUS_ID), 1))
+        for first_pair in range(0, len(survivors), pairs_per_batch):
+            pairs = survivors[first_pair:first_pair + pairs_per_batch]
+
+            post_ptdf = (ptdf_rows[monitored_rows[m_idxs[pairs]], :].toarray() +
+                         coeffs[pairs, None]*ptdf_rows[outage_rows[k_idxs[pairs]], :].toarray())
+            range_contribution = np.maximum(post_ptdf, 0) @ (p_inj_ub - p_inj_lb)
+
+            ub_reachable = (flow_at_lb[monitored_rows[m_idxs[pairs]], :] +
+                            coeffs[pairs, None]*flow_at_lb[outage_rows[k_idxs[pairs]], :] +
+                            range_contribution >= flow_ub[m_idxs[pairs], :] - 1e-18)
+            lb_reachable = (flow_at_ub[monitored_rows[m_idxs[pairs]], :] +
+                            coeffs[pairs, None]*flow_at_ub[outage_rows[k_idxs[pairs]], :] -
+                            range_contribution <= flow_lb[m_idxs[pairs], :] + 1e-18)
+
+            for i in np.nonzero(ub_reachable.any(axis=1) | lb_reachable.any(axis=1))[0]:
+                pair = pairs[i]
+                network.N_1_CONSTRS[chunk[k_idxs[pair]], monitored[m_idxs[pair]]] = {
+                                                'LODF': float(coeffs[pair]),
+                                                'UB': ub_reachable[i],
+                                                'LB': lb_reachable[i]}
+
+    time_end = time()
+
+    print(f"\nThe total time in screen_contingencies is {time_end-time_0:,.4f} seconds.\n" +
+          f"Out of {len(outages)} contingencies ({n_bridges} of which split the network and were " +
+          f"ignored) and {len(monitored)} monitored lines, {n_pairs_screened} pairs were " +
+          f"screened and {len(network.N_1_CONSTRS)} might be binding.", flush=True)
 
 
 def _create_list_of_jobs(params, network) -> list:
@@ -102,82 +342,256 @@ def _create_list_of_jobs(params, network) -> list:
                                 len(network.LINES_FROM_BUS[network.LINE_F_T[l][1]]
                                             + network.LINES_TO_BUS[network.LINE_F_T[l][1]]))
                                                 for l in possibly_binding_lines}
-    complete_list_jobs = len(possibly_binding_lines)*[-1e12]
-
-    lines_per_process = int(len(complete_list_jobs)/params.MAX_PROCESS_REDUCE_NETWORK)
-
-    i, p, count_all = 0, 0, 0
-    for nc in range(1,max(n for l in possibly_binding_lines for n in end_points_n_connecs[l])+1,1):
-        for l in [l for l in possibly_binding_lines if nc in end_points_n_connecs[l]]:
-            if l not in complete_list_jobs:
-                count_all += 1
-                if count_all > lines_per_process*params.MAX_PROCESS_REDUCE_NETWORK:
-                    complete_list_jobs[count_all - 1] = l
-                else:
-                    complete_list_jobs[i + p*lines_per_process] = l
-                    p += 1
-                    if p == params.MAX_PROCESS_REDUCE_NETWORK:
-                        p = 0
-                        i += 1
+    complete_list_jobs = sorted(possibly_binding_lines, key=lambda l: min(end_points_n_connecs[l]))
+
+    if params.SCREENING_WARM_START:
+        return _order_lines_by_bfs(network, complete_list_jobs)
+
     return complete_list_jobs
 
-def _get_back_flags(params, network, CHILD_COMM):
-    """
-        get back from the spawn workers the flags indicating whether the line bounds can be binding
-        and then update the flags
-    """
-    aux_active_bounds = np.array([int(v)
-                                  for v in network.ACTIVE_BOUNDS.values()],
-                                  dtype='int')
-    CHILD_COMM.Reduce(None, [aux_active_bounds, MPI.INT],
-                      op=MPI.MIN, root=MPI.ROOT)
-
-    aux_ubs = np.array([int(v) for v in network.ACTIVE_UB.values()],
-                       dtype='int')
-    CHILD_COMM.Reduce(None, [aux_ubs, MPI.INT], op=MPI.MIN, root=MPI.ROOT)
-
-    aux_lbs = np.array([int(v) for v in network.ACTIVE_LB.values()],
-                       dtype='int')
-    CHILD_COMM.Reduce(None, [aux_lbs, MPI.INT], op=MPI.MIN, root=MPI.ROOT)
-
-    aux_actibe_ubs_per_period = np.zeros((len(network.LINE_ID), params.T),
-                                         dtype='int')
-    CHILD_COMM.Reduce(None, [aux_actibe_ubs_per_period, MPI.INT],
-                      op=MPI.MIN, root=MPI.ROOT)
-
-    aux_actibe_lbs_per_period = np.zeros((len(network.LINE_ID), params.T),
-                                         dtype='int')
-    CHILD_COMM.Reduce(None, [aux_actibe_lbs_per_period, MPI.INT],
-                      op=MPI.MIN, root=MPI.ROOT)
-
-    # convert the results back to bool. note that bool(1) = True, and bool(0) = False
-    # similarly, int(True) = 1
-    i = 0
-    for l in network.ACTIVE_BOUNDS.keys():
-        network.ACTIVE_BOUNDS[l] = bool(aux_active_bounds[i])
-        i += 1
-
-    i = 0
-    for l in network.ACTIVE_UB.keys():
-        network.ACTIVE_UB[l] = bool(aux_ubs[i])
-        i += 1
-
-    i = 0
-    for l in network.ACTIVE_LB.keys():
-        network.ACTIVE_LB[l] = bool(aux_lbs[i])
-        i += 1
-
-    i = 0
-    for l in network.ACTIVE_UB_PER_PERIOD.keys():
-        for t in range(params.T):
-            network.ACTIVE_UB_PER_PERIOD[l][t] = bool(aux_actibe_ubs_per_period[i][t])
-        i += 1
-
-    i = 0
-    for l in network.ACTIVE_LB_PER_PERIOD.keys():
-        for t in range(params.T):
-            network.ACTIVE_LB_PER_PERIOD[l][t] = bool(aux_actibe_lbs_per_period[i][t])
-        i += 1
+
+def _order_lines_by_bfs(network, lines:list) -> list:
+    """
+        order `lines` by breadth-first searches over the network, so that consecutive lines are
+        close to each other in the network. each search starts from the first line in `lines`
+        not yet reached and visits the whole island of that line
+    """
+
+    selected = set(lines)
+    (ordered, reached, visited_buses) = ([], set(), set())
+
+    for first in lines:
+        if first in reached:
+            continue
+
+        reached.add(first)
+        ordered.append(first)
+
+        buses = deque(bus for bus in network.LINE_F_T[first] if bus not in visited_buses)
+        visited_buses.update(buses)
+
+        while buses:
+            bus = buses.popleft()
+            for l in network.LINES_FROM_BUS[bus] + network.LINES_TO_BUS[bus]:
+                if l in selected and l not in reached:
+                    reached.add(l)
+                    ordered.append(l)
+                for other_bus in network.LINE_F_T[l]:
+                    if other_bus not in visited_buses:
+                        visited_buses.add(other_bus)
+                        buses.append(other_bus)
+
+    return ordered
+
+
+class _JobQueue:
+    """
+        Jobs of the screening of the flow bounds with optimization models, handed out to the
+        workers in small chunks as they become idle. A job is a line and a period, which is None
+        for the models with the bounds on the injections over the whole horizon. Once the job of
+        a line over the whole horizon is done, the jobs of the periods in which its bounds are
+        still active are added, if the single-period models are to be run. The jobs of single
+        periods are handed out period by period, so that the workers seldom have to change the
+        bounds on the injections of their models, and the periods that dominate more periods
+        come first, so that the bounds they find to be unreachable are removed from the periods
+        they dominate without solving their LPs. The results are stored in the network as they
+        arrive, so those of the jobs done before the time limit are kept even if the other jobs
+        are not done
+    """
+
+    def __init__(self:"_JobQueue", params, thermals, network, list_of_jobs:list,
+                 run_single_period_models:bool, n_workers:int, last_time:float):
+        self._params, self._network = params, network
+        self._run_single_period_models = run_single_period_models
+        self._n_workers = n_workers
+        #: Time after which no more jobs are handed out.
+        self.LAST_TIME = last_time
+        self._pending = deque((l, None) for l in list_of_jobs)
+        # jobs of single periods, by period
+        self._pending_per_period = [deque() for _ in range(params.T)]
+        # lines whose jobs of single periods were added
+        self._lines_per_period = []
+        # order in which the periods are handed out, and the periods dominated by each period
+        (p_inj_lb, p_inj_ub) = get_buses_bounds_on_injections_arrays(params, network, thermals)
+        (self._periods, self._dominated_periods) = _get_dominated_periods(p_inj_lb, p_inj_ub)
+        # number of bounds of single periods found to be unreachable by the periods that
+        # dominate them
+        self._dominated_bounds = 0
+        #: Number of simplex iterations of each LP solved by the workers.
+        self.ITERATIONS: list[int] = []
+
+    def next_chunk(self:"_JobQueue") -> list[tuple]:
+        """
+            the next chunk of jobs, with the flags of the bounds of each line in each period, or
+            an empty list if there are no jobs left or if the time limit has been reached. the
+            chunks get smaller as the queue empties, so that the workers finish at similar times
+        """
+
+        if time() >= self.LAST_TIME:
+            return []
+
+        network = self._network
+
+        n_pending = len(self._pending) + sum(len(jobs) for jobs in self._pending_per_period)
+        size = max(1, min(_MAX_JOBS_PER_CHUNK, n_pending//(2*self._n_workers)))
+
+        chunk = []
+        # the jobs of single periods whose bounds were removed by the periods that dominate
+        # them are dropped, which might empty the period first taken
+        while not chunk:
+            # the jobs over the whole horizon come first, and then those of the first period,
+            # in the order of dominance, with jobs left
+            pending = self._pending
+            for t in self._periods:
+                if pending:
+                    break
+                pending = self._pending_per_period[t]
+
+            if not pending:
+                break
+
+            while pending and len(chunk) < size:
+                (l, t) = pending.popleft()
+                if t is None:
+                    chunk.append((l, t, network.ACTIVE_LB[l], network.ACTIVE_UB[l]))
+                elif network.ACTIVE_LB_PER_PERIOD[l][t] or network.ACTIVE_UB_PER_PERIOD[l][t]:
+                    chunk.append((l, t,
+                                  network.ACTIVE_LB[l] and network.ACTIVE_LB_PER_PERIOD[l][t],
+                                  network.ACTIVE_UB[l] and network.ACTIVE_UB_PER_PERIOD[l][t]))
+
+        return chunk
+
+    def add_results(self:"_JobQueue", results:list[tuple]):
+        """store the results of a chunk of jobs in the network and add the resulting jobs"""
+
+        network = self._network
+
+        for (l, t, active_lb, active_ub, iterations) in results:
+            self.ITERATIONS.extend(iterations)
+            if t is None:
+                if not active_lb:
+                    network.ACTIVE_LB[l] = False
+                    network.ACTIVE_LB_PER_PERIOD[l] = {t: False for t in range(self._params.T)}
+                if not active_ub:
+                    network.ACTIVE_UB[l] = False
+                    network.ACTIVE_UB_PER_PERIOD[l] = {t: False for t in range(self._params.T)}
+                if not active_lb and not active_ub:
+                    network.ACTIVE_BOUNDS[l] = False
+                elif self._run_single_period_models:
+                    self._lines_per_period.append(l)
+                    for t in range(self._params.T):
+                        if (network.ACTIVE_LB_PER_PERIOD[l][t] or
+                                                            network.ACTIVE_UB_PER_PERIOD[l][t]):
+                            self._pending_per_period[t].append((l, t))
+            else:
+                job = (l, t, network.ACTIVE_LB_PER_PERIOD[l][t],
+                                                            network.ACTIVE_UB_PER_PERIOD[l][t])
+                network.ACTIVE_LB_PER_PERIOD[l][t] = (network.ACTIVE_LB_PER_PERIOD[l][t] and
+                                                                                    active_lb)
+                network.ACTIVE_UB_PER_PERIOD[l][t] = (network.ACTIVE_UB_PER_PERIOD[l][t] and
+                                                                                    active_ub)
+                # the bounds found to be unreachable are also unreachable in the periods
+                # dominated by t, whose jobs are then dropped when they are handed out
+                self._dominated_bounds += _remove_bounds_of_dominated_periods(
+                                                network, [job], t, self._dominated_periods[t])
+
+    def finish(self:"_JobQueue"):
+        """update the flags over the whole horizon of the lines screened in single periods"""
+
+        network = self._network
+
+        for l in self._lines_per_period:
+            network.ACTIVE_LB[l] = any(network.ACTIVE_LB_PER_PERIOD[l].values())
+            network.ACTIVE_UB[l] = any(network.ACTIVE_UB_PER_PERIOD[l].values())
+            network.ACTIVE_BOUNDS[l] = max(network.ACTIVE_LB[l], network.ACTIVE_UB[l])
+
+        if self._run_single_period_models:
+            print(f"{self._dominated_bounds} bounds of single periods were found to be " +
+                  "unreachable without solving their LPs.", flush=True)
+
+
+def _distribute_jobs_to_children(queue:_JobQueue, CHILD_COMM):
+    """
+        hand out the jobs of `queue` to the spawned child processes whenever they ask for more,
+        with their requests carrying the results of their previous chunks, and stop them once
+        there are no jobs left and no child can add new ones
+    """
+
+    status = MPI.Status()
+
+    n_children = CHILD_COMM.Get_remote_size()
+    (busy, idle, stopped) = (set(), [], 0)
+
+    while stopped < n_children:
+        results = CHILD_COMM.recv(source = MPI.ANY_SOURCE, status = status)
+        busy.discard(status.Get_source())
+        idle.append(status.Get_source())
+
+        queue.add_results(results)
+
+        while idle:
+            chunk = queue.next_chunk()
+            if chunk:
+                child = idle.pop()
+                CHILD_COMM.send(chunk, dest = child)
+                busy.add(child)
+            elif not busy:
+                for child in idle:
+                    CHILD_COMM.send(None, dest = child)
+                stopped += len(idle)
+                idle = []
+            else:
+                # the results of the busy children might add new jobs
+                break
+
+    queue.finish()
+
+
+def _get_screening_mp_context():
+    """
+        the workers of the screening pool build gurobi models, but each worker creates its own
+        gurobi environment after the fork, and the parent process has none while the pool runs.
+        so forking is safe, and it avoids re-importing the main module, which initializes MPI.
+        fork is not available on Windows
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+def _screen_in_process_pool(params, thermals, network, queue:_JobQueue):
+    """
+        screen the bounds of the lines with the jobs of `queue` in a local process pool. the
+        data of the network are shared with the workers through shared memory, each worker
+        builds its model once, and a new chunk of jobs is submitted whenever one is done
+    """
+
+    (shared_buffer, layout) = _share_screening_data(params, network, thermals)
+
+    try:
+        with ProcessPoolExecutor(max_workers=params.MAX_PROCESS_REDUCE_NETWORK,
+                                 mp_context=_get_screening_mp_context(),
+                                 initializer=_initialize_pool_worker,
+                                 initargs=(params, shared_buffer.name, layout)) as executor:
+            running = set()
+            while True:
+                while len(running) < params.MAX_PROCESS_REDUCE_NETWORK:
+                    chunk = queue.next_chunk()
+                    if not chunk:
+                        break
+                    running.add(executor.submit(_screen_jobs_in_pool_worker, chunk,
+                                                queue.LAST_TIME))
+                if not running:
+                    break
+                (done, running) = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    queue.add_results(future.result())
+    finally:
+        shared_buffer.close()
+        shared_buffer.unlink()
+
+    queue.finish()
+
 
 def redundant_line_bounds(params, thermals, network,
                           time_limit: float=360,
@@ -197,7 +611,20 @@ def redundant_line_bounds(params, thermals, network,
 
     t_0 = time()
 
-    if params.MAX_PROCESS_REDUCE_NETWORK > 1:
+    # number of simplex iterations of each LP solved
+    iterations = []
+
+    if (params.MAX_PROCESS_REDUCE_NETWORK > 1 and
+                                    params.SCREENING_BACKEND == ScreeningBackend.PROCESS_POOL):
+        queue = _JobQueue(params, thermals, network, complete_list_jobs, run_single_period_models,
+                          params.MAX_PROCESS_REDUCE_NETWORK, time() + time_limit)
+        _screen_in_process_pool(params, thermals, network, queue)
+        iterations = queue.ITERATIONS
+
+    elif params.MAX_PROCESS_REDUCE_NETWORK > 1:
+        queue = _JobQueue(params, thermals, network, complete_list_jobs, run_single_period_models,
+                          params.MAX_PROCESS_REDUCE_NETWORK, time() + time_limit)
+
         # spawn at most params.MAX_PROCESS_REDUCE_NETWORK child processes
 
         parent_dir: str = os.path.abspath(
@@ -211,22 +638,21 @@ def redundant_line_bounds(params, thermals, network,
         CHILD_COMM.bcast(params, root = MPI.ROOT)
         CHILD_COMM.bcast(network, root = MPI.ROOT)
         CHILD_COMM.bcast(thermals, root = MPI.ROOT)
-        CHILD_COMM.bcast(run_single_period_models, root = MPI.ROOT)
-        CHILD_COMM.bcast(complete_list_jobs, root = MPI.ROOT)
         CHILD_COMM.bcast(time_limit, root = MPI.ROOT)
 
-        # get back the results
-        _get_back_flags(params, network, CHILD_COMM)
+        # hand out the jobs and get back the results as they are done
+        _distribute_jobs_to_children(queue, CHILD_COMM)
+        iterations = queue.ITERATIONS
 
         CHILD_COMM.Disconnect()
 
     else:
-        _remove_redundant_flow_limits_angles(params, network, thermals,
-                                             time_limit=time_limit,
-                                             list_of_jobs=complete_list_jobs,
-                                             print_to_console=True,
-                                             run_single_period_models=
-                                              run_single_period_models)
+        iterations = _remove_redundant_flow_limits_angles(params, network, thermals,
+                                                          time_limit=time_limit,
+                                                          list_of_jobs=complete_list_jobs,
+                                                          print_to_console=True,
+                                                          run_single_period_models=
+                                                            run_single_period_models)
 
     # final number of redundant transmission line bounds
     f_redund_b = len([l for l in network.LINE_ID
@@ -235,4 +661,6 @@ def redundant_line_bounds(params, thermals, network,
     print("\n\n")
     print(f"It took {time()-t_0:,.4f} sec to execute identify_redund_flows_DC")
     print(f"{f_redund_b-i_redund_b} more redundant line bounds have" +
-          " been identifed\n\n", flush=True)
+          " been identifed", flush=True)
+    print(f"{len(iterations)} LPs were solved with a total of {sum(iterations)} simplex " +
+          f"iterations (at most {max(iterations, default=0)} in a single LP)\n\n", flush=True)
@@ -0,0 +1,112 @@
+import os
+import hashlib
+from glob import glob
+import numpy as np
+from scipy import sparse
+
+from params import Params
+from components.network import Network
+
+
+def topology_fingerprint(network:Network, sub_systems:list[tuple[list, list]]) -> str:
+    """
+        Hash of everything the PTDF matrix depends on: the buses and the lines, in the order
+        of network.BUS_ID and network.LINE_ID (which are also the order of the columns and
+        rows of the matrix), the lines' endpoints and reactances, and the reference bus of
+        each isolated subsystem
+    """
+
+    fingerprint = hashlib.sha256()
+    fingerprint.update(np.array(network.BUS_ID, dtype='int64').tobytes())
+    fingerprint.update(np.array(network.LINE_ID, dtype='int64').tobytes())
+    fingerprint.update(np.array([network.LINE_F_T[l] for l in network.LINE_ID],
+                                dtype='int64').tobytes())
+    fingerprint.update(np.array([network.LINE_X[l] for l in network.LINE_ID],
+                                dtype='d').tobytes())
+    fingerprint.update(np.array([buses[0] for (buses, _) in sub_systems],
+                                dtype='int64').tobytes())
+
+    return fingerprint.hexdigest()
+
+
+def _cache_file(params:Params, fingerprint:str) -> str:
+    """
+        path of the cache file of the PTDF matrix with the given fingerprint. CSR matrices
+        depend on the threshold applied to the coefficients, which is then part of the name
+    """
+    if params.PTDF_SPARSE_STORAGE:
+        return (params.PTDF_CACHE_DIR + params.PS + "_" + fingerprint +
+                f"_csr_{params.PTDF_COEFF_TOL:g}.npz")
+    return params.PTDF_CACHE_DIR + params.PS + "_" + fingerprint + ".npy"
+
+
+def load_cached_ptdf(params:Params, fingerprint:str) -> np.ndarray | sparse.csr_matrix | None:
+    """
+        Memory-map the PTDF matrix with the given fingerprint from the cache directory, or
+        return None if it is not in the cache. The array returned is read-only.
+        CSR matrices cannot be memory-mapped and are read into memory
+    """
+
+    file_name = _cache_file(params, fingerprint)
+
+    try:
+        if params.PTDF_SPARSE_STORAGE:
+            ptdf = sparse.load_npz(file_name).tocsr()
+        else:
+            ptdf = np.load(file_name, mmap_mode='r')
+    except (FileNotFoundError, ValueError, OSError):
+        return None
+
+    # the modification time is used to keep track of the least recently used matrices
+    os.utime(file_name)
+
+    return ptdf
+
+
+def cache_ptdf(params:Params, fingerprint:str, ptdf:np.ndarray | sparse.csr_matrix):
+    """
+        Save the PTDF matrix to the cache directory, and then remove the least recently used
+        matrices until the size of the cache directory is within params.PTDF_CACHE_MAX_SIZE_MB
+    """
+
+    max_size = params.PTDF_CACHE_MAX_SIZE_MB * 1024**2
+
+    n_bytes = (ptdf.data.nbytes + ptdf.indices.nbytes + ptdf.indptr.nbytes
+                                            if sparse.issparse(ptdf) else ptdf.nbytes)
+
+    if n_bytes > max_size:
+        return
+
+    os.makedirs(params.PTDF_CACHE_DIR, exist_ok=True)
+
+    file_name = _cache_file(params, fingerprint)
+
+    # write to a temporary file first so that other runs never see an incomplete matrix
+    extension = file_name[file_name.rindex("."):]
+    temp_file_name = file_name[:-len(extension)] + f".{os.getpid()}.tmp" + extension
+    if sparse.issparse(ptdf):
+        sparse.save_npz(temp_file_name, ptdf, compressed=False)
+    else:
+        np.save(temp_file_name, ptdf)
+    os.replace(temp_file_name, file_name)
+
+    cached_files = []
+    for f in glob(params.PTDF_CACHE_DIR + "*.np[yz]"):
+        if ".tmp." not in f:
+            try:
+                cached_files.append((os.path.getmtime(f), os.path.getsize(f), f))
+            except OSError:
+                continue
+
+    total_size = sum(size for (_, size, _) in cached_files)
+
+    for (_, size, f) in sorted(cached_files):
+        if total_size <= max_size:
+            break
+        if os.path.normpath(f) == os.path.normpath(file_name):
+            continue
+        try:
+            os.remove(f)
+        except OSError:
+            continue
+        total_size -= size
@@ -1,9 +1,18 @@
 from time import time
-from copy import deepcopy
+from heapq import heapify, heappush, heappop
 import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
 
 from components.network import add_new_parallel_line
-from constants import MAX_FLOW
+from constants import MAX_FLOW, NetworkModel, EliminationOrdering
+
+# nonzeros of the network constraints of each period due to a transmission line: two in the power
+# balances of its endpoints and, in the B-theta model, three in the definition of its flow. in the
+# PTDF model, lines only appear through the rows of the possibly binding ones, which do not change
+# when buses are eliminated
+_NONZEROS_PER_LINE = {NetworkModel.B_THETA: 5, NetworkModel.FLUXES: 2, NetworkModel.PTDF: 0}
 
 
 def _remove_many_connect_buses(params, network, thermals, bus_to_del:int):
@@ -53,19 +62,15 @@ def _remove_many_connect_buses(params, network, thermals, bus_to_del:int):
 
     B_ext_impact = -1*np.matmul(B_front_ext, B_ext_ext_inv)
 
-    for b_idx, bus in enumerate(buses_connected):
-        _reassign_injections(thermals, network, bus_to_del, bus, B_ext_impact[b_idx][0])
+    _reassign_injections(thermals, network, [(bus_to_del, bus, B_ext_impact[b_idx][0])
+                                                for b_idx, bus in enumerate(buses_connected)])
 
     for connec in new_connections:
         # in case there is already a line between buses_of_new_connection
         existing_paral_line = None
 
         # check if there is already a line between buses in buses_of_new_connection
-        lines_btw_buses = [l for l in network.LINE_ID if network.LINE_F_T[l] == connec]
-        if len(lines_btw_buses) > 0:
-            if len(lines_btw_buses) != 1:
-                raise ValueError("More than one line between buses")
-            existing_paral_line = lines_btw_buses[0]
+        existing_paral_line = network.LINE_OF_F_T.get(connec)
 
         if existing_paral_line is None:
             network.LINES_FROM_BUS[connec[0]].append(max(network.LINE_ID) + 1)
@@ -89,6 +94,309 @@ def _remove_many_connect_buses(params, network, thermals, bus_to_del:int):
     update_load_and_network(network, thermals, [bus_to_del])
 
 
+def _get_many_connect_buses_to_remove(network, cand_buses:list) -> list:
+    """
+        get the buses in cand_buses that would be deleted, in this order, by calling
+        _remove_many_connect_buses for each of them. whether a bus is deleted only depends on the
+        topology of the network at that point, which is tracked here with the sets of neighbours
+        of the buses: deleting a bus connects all of its neighbours to each other
+    """
+
+    neighbours = {bus: set(network.BUS_NEIGHBOURS[bus]) for bus in network.BUS_ID}
+
+    buses_to_del = []
+
+    for bus in cand_buses:
+        buses_connected = neighbours[bus]
+
+        if len(buses_connected) == 0:
+            continue
+
+        if len(buses_connected) > 5:
+            buses_connected_sorted = sorted(buses_connected)
+            n_new_connections = len(buses_connected)*(len(buses_connected) - 1)//2
+            par_lines = sum(1 for b_idx_1, bus_1 in enumerate(buses_connected_sorted)
+                                for bus_2 in buses_connected_sorted[b_idx_1+1:]
+                                    if bus_2 in neighbours[bus_1])
+            if n_new_connections - par_lines > 1:
+                continue
+
+        for bus_2 in buses_connected:
+            neighbours[bus_2].discard(bus)
+            neighbours[bus_2].update(buses_connected - {bus_2})
+        neighbours[bus] = set()
+
+        buses_to_del.append(bus)
+
+    return buses_to_del
+
+
+def _get_min_fill_buses_to_remove(params, network, thermals, cand_buses:set) -> list:
+    """
+        get the buses in `cand_buses` to be deleted, in order, by taking from a priority queue the
+        bus whose elimination least increases (or most decreases) the number of nonzeros of the
+        network model, with ties broken by the number of new equivalent lines (fill) and then by the
+        number of connections. the priorities of the buses whose neighbourhoods change are
+        updated after each elimination. buses are no longer deleted once every candidate left
+        would increase the number of nonzeros
+
+        the change in the number of nonzeros of eliminating bus b connected to d buses is
+        predicted as follows. d lines are removed and the fill is added. in the B-theta and
+        fluxes models, each injection at b (generating units, loads, renewable generation) is
+        then split among the d neighbours. in the PTDF model, the coefficients of the injections
+        in the rows of the possibly binding lines are simply added up, but each neighbour that
+        had no injections now has a column in these rows, while the column of b is removed
+    """
+
+    neighbours = {bus: set(network.BUS_NEIGHBOURS[bus]) for bus in network.BUS_ID}
+
+    injection_terms = {bus: 0 for bus in network.BUS_ID}
+    for g in thermals.UNIT_NAME.keys():
+        for bus in thermals.BUS[g]:
+            injection_terms[bus] += 1
+    for bus in network.get_load_buses() | network.get_renewable_gen_buses():
+        injection_terms[bus] += 1
+
+    nnz_per_line = _NONZEROS_PER_LINE[params.NETWORK_MODEL]
+    if params.NETWORK_MODEL == NetworkModel.PTDF:
+        (nnz_per_injection_term, nnz_per_injection_bus) = (
+                                    0, len([l for l in network.LINE_ID
+                                                                if network.ACTIVE_BOUNDS[l]]))
+    else:
+        (nnz_per_injection_term, nnz_per_injection_bus) = (1, 0)
+
+    def _is_candidate(bus):
+        return (bus in cand_buses and
+                                1 <= len(neighbours[bus]) <= params.MAX_NUMBER_OF_CONNECTIONS)
+
+    def _priority(bus):
+        buses_connected = sorted(neighbours[bus])
+        fill = sum(1 for b_idx_1, bus_1 in enumerate(buses_connected)
+                        for bus_2 in buses_connected[b_idx_1+1:]
+                            if bus_2 not in neighbours[bus_1])
+
+        new_injection_buses = 0
+        if injection_terms[bus] > 0:
+            new_injection_buses = (sum(1 for bus_2 in buses_connected
+                                                    if injection_terms[bus_2] == 0) - 1)
+
+        change = (nnz_per_line * (fill - len(buses_connected)) +
+                  nnz_per_injection_term * injection_terms[bus] * (len(buses_connected) - 1) +
+                  nnz_per_injection_bus * new_injection_buses)
+
+        return (change, fill, len(buses_connected))
+
+    priority = {bus: _priority(bus) for bus in cand_buses if _is_candidate(bus)}
+    queue = [(p, bus) for (bus, p) in priority.items()]
+    heapify(queue)
+
+    buses_to_del = []
+
+    while len(queue) > 0:
+        (p, bus) = heappop(queue)
+
+        if priority.get(bus) != p:
+            # outdated entry
+            continue
+
+        if p[0] > 0:
+            break
+
+        buses_connected = neighbours[bus]
+
+        for bus_2 in buses_connected:
+            neighbours[bus_2].discard(bus)
+            neighbours[bus_2].update(buses_connected - {bus_2})
+            injection_terms[bus_2] += injection_terms[bus]
+        neighbours[bus] = set()
+
+        del priority[bus]
+        buses_to_del.append(bus)
+
+        # the fill of a bus depends on the connections between its neighbours
+        for bus_2 in buses_connected | {bus_3 for bus_2 in buses_connected
+                                                            for bus_3 in neighbours[bus_2]}:
+            if _is_candidate(bus_2):
+                p_2 = _priority(bus_2)
+                if priority.get(bus_2) != p_2:
+                    priority[bus_2] = p_2
+                    heappush(queue, (p_2, bus_2))
+            else:
+                priority.pop(bus_2, None)
+
+    return buses_to_del
+
+
+def _remove_many_connect_buses_at_once(params, network, thermals, buses_to_del:list):
+    """
+        delete all buses in buses_to_del at once. this is the same as calling
+        _remove_many_connect_buses for each of them, but the equivalent network of the remaining
+        (frontier) buses is computed with a single Schur complement of the susceptance matrix
+        (Kron reduction), B_FF - B_FS * inv(B_SS) * B_SF, where S is the set of buses deleted and
+        F the set of buses connected to them. B_SS is block diagonal, with one block for each
+        connected component of S, and thus the components are reduced one at a time. the
+        equivalent lines are then created, or merged with existing ones, in a single pass
+    """
+
+    if len(buses_to_del) == 0:
+        return
+
+    set_buses_to_del = set(buses_to_del)
+
+    lines_connected_to_buses = sorted({l for bus in buses_to_del
+                                       for l in network.LINES_FROM_BUS[bus] +
+                                                                network.LINES_TO_BUS[bus]})
+
+    frontier = sorted({bus for l in lines_connected_to_buses
+                            for bus in network.LINE_F_T[l]} - set_buses_to_del)
+
+    all_buses = sorted(buses_to_del) + frontier
+    n_ext = len(buses_to_del)
+    bus_idx = {bus: b for b, bus in enumerate(all_buses)}
+
+    A = sparse.csr_matrix(
+                (np.concatenate((np.ones(len(lines_connected_to_buses)),
+                                 -np.ones(len(lines_connected_to_buses)))),
+                 (np.tile(np.arange(len(lines_connected_to_buses)), 2),
+                  np.array([bus_idx[network.LINE_F_T[l][1]] for l in lines_connected_to_buses] +
+                           [bus_idx[network.LINE_F_T[l][0]] for l in lines_connected_to_buses]))),
+                shape=(len(lines_connected_to_buses), len(all_buses)))
+    Y = sparse.diags(np.array([1/network.LINE_X[l] for l in lines_connected_to_buses], dtype='d'))
+    B = (A.T @ Y @ A).tocsr()
+
+    B_ext_ext = B[:n_ext, :][:, :n_ext].tocsc()
+    B_ext_front = B[:n_ext, :][:, n_ext:].tocsr()
+
+    # buses whose injections are reassigned
+    thermals_of_bus = {}
+    for g in thermals.UNIT_NAME.keys():
+        for bus in thermals.BUS[g]:
+            if bus in set_buses_to_del:
+                thermals_of_bus.setdefault(bus, []).append(g)
+
+    # susceptances of the equivalent lines between frontier buses. since there are no lines
+    # between frontier buses in B, the off-diagonal elements of the Schur complement are
+    # -B_FS * inv(B_SS) * B_SF, the negatives of the susceptances
+    new_connections = {}
+
+    (n_components, component) = connected_components(B_ext_ext, directed=False)
+    ext_idxs_of_component = [[] for _ in range(n_components)]
+    for (b, c) in enumerate(component):
+        ext_idxs_of_component[c].append(b)
+
+    for ext_idxs in ext_idxs_of_component:
+        front_idxs = np.unique(B_ext_front[ext_idxs, :].indices)
+
+        B_S_F = B_ext_front[ext_idxs, :][:, front_idxs].toarray()
+
+        # inv(B_SS) * B_SF
+        W = splu(B_ext_ext[ext_idxs, :][:, ext_idxs].tocsc()).solve(B_S_F)
+
+        # the impact of the injections of the deleted buses on the frontier buses,
+        # -B_FS * inv(B_SS), which is the transpose of -inv(B_SS) * B_SF
+        B_ext_impact = -W.T
+
+        fill = B_S_F.T @ W
+
+        ext_buses = [all_buses[b] for b in ext_idxs]
+        front_buses = [all_buses[n_ext + b] for b in front_idxs]
+
+        for (f_idx_1, bus_1) in enumerate(front_buses):
+            for f_idx_2 in range(f_idx_1 + 1, len(front_buses)):
+                if fill[f_idx_1, f_idx_2] != 0:
+                    connec = (bus_1, front_buses[f_idx_2])
+                    new_connections[connec] = (new_connections.get(connec, 0) +
+                                                                    fill[f_idx_1, f_idx_2])
+
+        # reassign the injections
+        ext_rows = [network.BUS_HEADER[bus] for bus in ext_buses]
+        front_rows = [network.BUS_HEADER[bus] for bus in front_buses]
+        network.NET_LOAD[front_rows, :] += B_ext_impact @ network.NET_LOAD[ext_rows, :]
+
+        if network.REDUCTION_PLAN is not None:
+            for (e_idx, bus) in enumerate(ext_buses):
+                for (f_idx, new_bus) in enumerate(front_buses):
+                    network.REDUCTION_PLAN.reassign(bus, new_bus, B_ext_impact[f_idx, e_idx])
+
+        for (e_idx, bus) in enumerate(ext_buses):
+            for g in thermals_of_bus.get(bus, []):
+                for (f_idx, new_bus) in enumerate(front_buses):
+                    bus_coeff = B_ext_impact[f_idx, e_idx]
+                    if new_bus not in thermals.BUS[g]:
+                        thermals.BUS[g].append(new_bus)
+                        thermals.BUS_COEFF[g][new_bus] = bus_coeff * thermals.BUS_COEFF[g][bus]
+                    else:
+                        thermals.BUS_COEFF[g][new_bus] += bus_coeff * thermals.BUS_COEFF[g][bus]
+
+    next_line_id = max(network.LINE_ID) + 1
+
+    for (connec, susceptance) in new_connections.items():
+        reactance = 1/susceptance
+
+        if connec in network.LINE_OF_F_T:
+            # the equivalent line is in parallel to an existing line
+            l = network.LINE_OF_F_T[connec]
+
+            if network.REDUCTION_PLAN is not None:
+                network.REDUCTION_PLAN.parallel_line(
+                                    l, network.LINE_X[l],
+                                    network.REDUCTION_PLAN.constant_terms(
+                                                                MAX_FLOW/params.POWER_BASE),
+                                    set(), reactance)
+
+            (_, network.LINE_X[l],
+             _1, _2, _3, _4,
+             network.LINE_FLOW_UB[l],
+             network.LINE_FLOW_LB[l],
+                    _5, _6) = add_new_parallel_line(
+                                0, reactance, 0, 0,
+                                np.array(params.T*[MAX_FLOW/params.POWER_BASE]),
+                                -1*np.array(params.T*[MAX_FLOW/params.POWER_BASE]),
+                                np.array(params.T*[MAX_FLOW/params.POWER_BASE]),
+                                -1*np.array(params.T*[MAX_FLOW/params.POWER_BASE]),
+                                0,
+                                network.LINE_X[l], 0, 0,
+                                network.LINE_FLOW_UB[l], network.LINE_FLOW_LB[l],
+                                network.LINE_FLOW_UB[l], network.LINE_FLOW_LB[l]
+            )
+
+            network.ACTIVE_UB[l] = network.ACTIVE_BOUNDS[l]
+            network.ACTIVE_LB[l] = network.ACTIVE_BOUNDS[l]
+            network.ACTIVE_UB_PER_PERIOD[l] = {t: network.ACTIVE_BOUNDS[l]
+                                               for t in range(params.T)}
+            network.ACTIVE_LB_PER_PERIOD[l] = {t: network.ACTIVE_BOUNDS[l]
+                                               for t in range(params.T)}
+        else:
+            l = next_line_id
+            next_line_id += 1
+
+            network.LINE_ID.append(l)
+            network.LINE_F_T[l] = connec
+            network.index_line(l)
+            if network.REDUCTION_PLAN is not None:
+                network.REDUCTION_PLAN.new_line(l, network.REDUCTION_PLAN.constant_terms(
+                                                                MAX_FLOW/params.POWER_BASE), set())
+            network.LINE_FLOW_UB[l] = np.array(params.T*[MAX_FLOW/params.POWER_BASE])
+            network.LINE_FLOW_LB[l] = -1*np.array(params.T*[MAX_FLOW/params.POWER_BASE])
+            network.LINE_X[l] = reactance
+
+            network.LINES_FROM_BUS[connec[0]].append(l)
+            network.LINES_TO_BUS[connec[1]].append(l)
+
+            network.ACTIVE_BOUNDS[l] = False
+            network.ACTIVE_UB[l], network.ACTIVE_LB[l] = False, False
+            network.ACTIVE_UB_PER_PERIOD[l] = {t: False for t in range(params.T)}
+            network.ACTIVE_LB_PER_PERIOD[l] = {t: False for t in range(params.T)}
+
+    _del_lines(network, lines_connected_to_buses)
+
+    for bus in buses_to_del:
+        del network.LINES_FROM_BUS[bus]
+        del network.LINES_TO_BUS[bus]
+
+    update_load_and_network(network, thermals, buses_to_del)
+
+
 def _del_lines(network, list_of_lines:list):
     """
         list_of_lines is a list of lines to be deleted from network
@@ -102,6 +410,8 @@ def _del_lines(network, list_of_lines:list):
                                             (l in network.LINES_TO_BUS[network.LINE_F_T[l][1]]):
             network.LINES_TO_BUS[network.LINE_F_T[l][1]].remove(l)
 
+        network.unindex_line(l)
+
         del network.LINE_ID[network.LINE_ID.index(l)]
         del network.LINE_F_T[l]
         del network.LINE_FLOW_UB[l]
@@ -112,28 +422,56 @@ def _del_lines(network, list_of_lines:list):
         del network.ACTIVE_LB[l]
         del network.ACTIVE_UB_PER_PERIOD[l]
         del network.ACTIVE_LB_PER_PERIOD[l]
+        network.CONTINGENCIES.pop(l, None)
 
+        if network.REDUCTION_PLAN is not None:
+            network.REDUCTION_PLAN.del_line(l)
 
-def _reassign_injections(thermals, network,
-                         bus:int, new_bus:int, bus_coeff:float
-):
+
+def _reassign_injections(thermals, network, reassignments:list[tuple[int, int, float]]):
     """
     if a bus 'bus' is removed from the grid but there are either active or passive power injections
-    to it, then these injections need to be reassigned to a new bus 'new_bus'
+    to it, then these injections need to be reassigned to a new bus 'new_bus'.
+    reassignments is a list of (bus, new_bus, bus_coeff), which are applied at once: the net loads
+    of the new buses are updated with a sparse aggregation matrix, whose rows are the new buses and
+    whose columns are the buses removed. a new bus cannot also be removed in the same call
     """
-    #### Remove old bus and add elements to the new bus
-    if np.max(np.abs(network.NET_LOAD[network.BUS_HEADER[bus], :]) > 0):
-        network.NET_LOAD[network.BUS_HEADER[new_bus], :] = np.add(
-                                            network.NET_LOAD[network.BUS_HEADER[new_bus], :],
-                                            bus_coeff*network.NET_LOAD[network.BUS_HEADER[bus], :])
-
-    thermal_units = [g for g in thermals.UNIT_NAME.keys() if bus in thermals.BUS[g]]
-    for g in thermal_units:
-        if new_bus not in thermals.BUS[g]:
-            thermals.BUS[g].append(new_bus)
-            thermals.BUS_COEFF[g].update({new_bus: bus_coeff * thermals.BUS_COEFF[g][bus]})
-        else:
-            thermals.BUS_COEFF[g][new_bus] += bus_coeff * thermals.BUS_COEFF[g][bus]
+
+    if len(reassignments) == 0:
+        return
+
+    #### Add the net loads of the old buses to the new buses
+    new_rows = sorted({network.BUS_HEADER[new_bus] for (_, new_bus, _) in reassignments})
+    old_rows = sorted({network.BUS_HEADER[bus] for (bus, _, _) in reassignments})
+    pos_new_row = {row: r for r, row in enumerate(new_rows)}
+    pos_old_row = {row: r for r, row in enumerate(old_rows)}
+
+    aggregation = sparse.csr_matrix(
+                        ([bus_coeff for (_, _, bus_coeff) in reassignments],
+                         ([pos_new_row[network.BUS_HEADER[new_bus]]
+                                                        for (_, new_bus, _) in reassignments],
+                          [pos_old_row[network.BUS_HEADER[bus]] for (bus, _, _) in reassignments])),
+                        shape=(len(new_rows), len(old_rows)))
+
+    network.NET_LOAD[new_rows, :] += aggregation @ network.NET_LOAD[old_rows, :]
+
+    if network.REDUCTION_PLAN is not None:
+        for (bus, new_bus, bus_coeff) in reassignments:
+            network.REDUCTION_PLAN.reassign(bus, new_bus, bus_coeff)
+
+    #### Add the old buses' coefficients of the thermal units to the new buses
+    reassignments_of_bus = {}
+    for (bus, new_bus, bus_coeff) in reassignments:
+        reassignments_of_bus.setdefault(bus, []).append((new_bus, bus_coeff))
+
+    for g in thermals.UNIT_NAME.keys():
+        for bus in [bus for bus in thermals.BUS[g] if bus in reassignments_of_bus]:
+            for (new_bus, bus_coeff) in reassignments_of_bus[bus]:
+                if new_bus not in thermals.BUS[g]:
+                    thermals.BUS[g].append(new_bus)
+                    thermals.BUS_COEFF[g].update({new_bus: bus_coeff*thermals.BUS_COEFF[g][bus]})
+                else:
+                    thermals.BUS_COEFF[g][new_bus] += bus_coeff*thermals.BUS_COEFF[g][bus]
 
 
 def update_load_and_network(network, thermals, buses_to_delete:list):
@@ -148,21 +486,23 @@ def update_load_and_network(network, thermals, buses_to_delete:list):
     coefficients for the reassignments have already been computed
     """
 
-    # get the indices of buses to be deleted
-    idxs_buses_to_del = {network.BUS_ID.index(bus) for bus in buses_to_delete}
+    if network.REDUCTION_PLAN is not None:
+        network.REDUCTION_PLAN.delete_buses(buses_to_delete)
 
-    # The buses to be kept are
-    idxs_of_buses_to_keep = [b for b in range(len(network.BUS_ID))
-                                        if b not in idxs_buses_to_del
-    ]
+    # rows of network.NET_LOAD, in the order of network.BUS_ID, of the buses to be kept
+    keep = np.ones(len(network.BUS_ID), dtype='bool')
+    keep[[network.BUS_HEADER[bus] for bus in buses_to_delete]] = False
 
-    idxs_of_buses_to_keep.sort()
     # Update the load
-    network.NET_LOAD = deepcopy(network.NET_LOAD[idxs_of_buses_to_keep, :])
+    network.NET_LOAD = network.NET_LOAD[keep, :]
+
+    network.BUS_ID[:] = [bus for (bus, keep_bus) in zip(network.BUS_ID, keep) if keep_bus]
 
     for bus in buses_to_delete:
         del network.BUS_NAME[bus]
-        network.BUS_ID.remove(bus)
+        network.BUS_AREA.pop(bus, None)
+        for bus_2 in network.BUS_NEIGHBOURS.pop(bus):
+            network.BUS_NEIGHBOURS[bus_2].discard(bus)
 
     for bus in buses_to_delete:
         if bus in network.REF_BUS_ID:
@@ -174,10 +514,9 @@ def update_load_and_network(network, thermals, buses_to_delete:list):
                     network.REF_BUS_ID.append(bus_2)
                     break
 
-    for bus in buses_to_delete:
-        thermal_units = [u for u in thermals.UNIT_NAME.keys()
-                         if bus in thermals.BUS[u]]
-        for g in thermal_units:
+    buses_to_delete_set = set(buses_to_delete)
+    for g in thermals.UNIT_NAME.keys():
+        for bus in [bus for bus in thermals.BUS[g] if bus in buses_to_delete_set]:
             thermals.BUS[g].remove(bus)
             del thermals.BUS_COEFF[g][bus]
 
@@ -196,6 +535,10 @@ def _del_end_of_line_buses(network, buses_no_load_no_gen,
     ]:
         buses_to_delete.append(bus)
 
+        if network.REDUCTION_PLAN is not None:
+            network.REDUCTION_PLAN.zero_injection(bus, network.LINES_FROM_BUS[bus] +
+                                                                    network.LINES_TO_BUS[bus])
+
         for l in (network.LINES_FROM_BUS[bus] + network.LINES_TO_BUS[bus]):
             if not network.LINE_F_T[l][0] == bus:
                 # Remove the line from the other bus connected to 'bus'
@@ -247,6 +590,13 @@ def _del_mid_point_buses(params, network, buses_no_load_no_gen,
             # Add the new line. Note that this new line adopts the key l from the last deleted line
             buses_of_new_connection.sort()
 
+            # bounds of the new line and limits of the old lines that they represent
+            terms_of_old_lines, limits_of_old_lines = [], set()
+
+            if network.REDUCTION_PLAN is not None:
+                network.REDUCTION_PLAN.zero_injection(bus, network.LINES_FROM_BUS[bus] +
+                                                                    network.LINES_TO_BUS[bus])
+
             for l in (network.LINES_FROM_BUS[bus] + network.LINES_TO_BUS[bus]):
                 if (not(network.LINE_F_T[l][0] == bus) and
                                             not(network.LINE_F_T[l][0] in buses_of_new_connection)):
@@ -264,9 +614,15 @@ def _del_mid_point_buses(params, network, buses_no_load_no_gen,
                         network.LINE_F_T[l][1] == buses_of_new_connection[1]):
                     cap_ub = np.min((cap_ub, network.LINE_FLOW_UB[l]), axis=0)
                     cap_lb = np.max((cap_lb, network.LINE_FLOW_LB[l]), axis=0)
+                    direction = 1
                 else:
                     cap_ub = np.min((cap_ub, -1*network.LINE_FLOW_LB[l]), axis=0)
                     cap_lb = np.max((cap_lb, -1*network.LINE_FLOW_UB[l]), axis=0)
+                    direction = -1
+
+                if network.REDUCTION_PLAN is not None:
+                    terms_of_old_lines += network.REDUCTION_PLAN.line_terms(l, direction)
+                    limits_of_old_lines |= network.REDUCTION_PLAN.LIMITS_OF_LINE[l]
 
                 reactance += network.LINE_X[l]
 
@@ -279,11 +635,13 @@ def _del_mid_point_buses(params, network, buses_no_load_no_gen,
                 network.REF_BUS_ID[index_del_bus] = buses_of_new_connection[0]
 
             # Check if connection already exists
-            found = False
-            for l2 in [l2 for l2 in network.LINES_FROM_BUS[buses_of_new_connection[0]]
-                                        if network.LINE_F_T[l2][1] == buses_of_new_connection[1]]:
+            l2 = network.LINE_OF_F_T.get((buses_of_new_connection[0], buses_of_new_connection[1]))
+            if l2 is not None:
                 # Then the line already exists
-                found = True
+                if network.REDUCTION_PLAN is not None:
+                    network.REDUCTION_PLAN.parallel_line(l2, network.LINE_X[l2],
+                                                         terms_of_old_lines, limits_of_old_lines,
+                                                         reactance)
 
                 (_, network.LINE_X[l2], _1, _2,
                     _3, _4,
@@ -306,12 +664,14 @@ def _del_mid_point_buses(params, network, buses_no_load_no_gen,
                 network.ACTIVE_LB_PER_PERIOD[l2] = {t: max(active_bounds_of_old_lines,
                                                             network.ACTIVE_LB_PER_PERIOD[l2][t])
                                                                         for t in range(params.T)}
-                break
 
-            if not found:
+            else:
                 # a line between the two end nodes was not found. create one
                 network.LINE_ID.append(l)
                 network.LINE_F_T[l] = (buses_of_new_connection[0], buses_of_new_connection[1])
+                network.index_line(l)
+                if network.REDUCTION_PLAN is not None:
+                    network.REDUCTION_PLAN.new_line(l, terms_of_old_lines, limits_of_old_lines)
                 network.LINE_FLOW_UB[l], network.LINE_FLOW_LB[l] = cap_ub, cap_lb
                 network.LINE_X[l] = reactance
                 network.LINES_FROM_BUS[buses_of_new_connection[0]].append(l)
@@ -329,44 +689,57 @@ def _del_mid_point_buses(params, network, buses_no_load_no_gen,
             del network.LINES_TO_BUS[bus]
 
 
-def _remove_n_connections_buses(params, network, thermals):
+def _remove_n_connections_buses(params, network, thermals, buses_to_check:set):
     """
-        delete buses with no active power injections connected exactly to three lines
+        delete buses in `buses_to_check` with no active power injections connected exactly to
+        three lines
     """
 
-    buses_cannot_be_del = set()
-    for l in [l for l in network.LINE_ID if network.ACTIVE_BOUNDS[l]]:
-        buses_cannot_be_del.add(network.LINE_F_T[l][0])
-        buses_cannot_be_del.add(network.LINE_F_T[l][1])
+    # buses connected to possibly binding lines cannot be deleted
+    buses_cannot_be_del = {bus for bus in buses_to_check
+                                if any(network.ACTIVE_BOUNDS[l] for l in
+                                        network.LINES_FROM_BUS[bus] + network.LINES_TO_BUS[bus])}
+    buses_cannot_be_del |= network.LOCKED_BUSES
 
     def _get_cand_buses(network):
         """
-            get buses with injections that can be deleted
+            get buses with injections that can be deleted, in increasing order of their number of
+            connections
         """
 
-        cand_buses = []
-
         n_connections_of_buses = {bus: len(network.LINES_FROM_BUS[bus]
                                            + network.LINES_TO_BUS[bus])
-                                        for bus in set(network.BUS_ID)
-                                            - buses_cannot_be_del
+                                        for bus in buses_to_check - buses_cannot_be_del
         }
 
-        for nc in range(0, params.MAX_NUMBER_OF_CONNECTIONS + 1, 1):
-            for bus in [bus for bus in set(network.BUS_ID) - buses_cannot_be_del
-                                        if (n_connections_of_buses[bus] == nc)
-                ]:
-                cand_buses.append(bus)
-
-        return cand_buses
+        return sorted([bus for bus, nc in n_connections_of_buses.items()
+                                                    if nc <= params.MAX_NUMBER_OF_CONNECTIONS],
+                      key=lambda bus: n_connections_of_buses[bus])
 
     total_cand_buses =  0
     total_removal = 0
 
+    if params.ELIMINATION_ORDERING == EliminationOrdering.MIN_FILL:
+        buses_to_del = _get_min_fill_buses_to_remove(params, network, thermals,
+                                                     buses_to_check - buses_cannot_be_del)
+        if params.BATCH_KRON_REDUCTION:
+            _remove_many_connect_buses_at_once(params, network, thermals, buses_to_del)
+        else:
+            for bus in buses_to_del:
+                _remove_many_connect_buses(params, network, thermals, bus)
+        return
+
     ini = time()
     cand_buses = _get_cand_buses(network)
     total_cand_buses += time() - ini
 
+    if params.BATCH_KRON_REDUCTION:
+        ini = time()
+        _remove_many_connect_buses_at_once(params, network, thermals,
+                                           _get_many_connect_buses_to_remove(network, cand_buses))
+        total_removal += time() - ini
+        return
+
     while len(cand_buses) > 0:
 
         lines_connected_to_bus = (network.LINES_FROM_BUS[cand_buses[0]]
@@ -396,10 +769,7 @@ def _remove_n_connections_buses(params, network, thermals):
 
             for connec in new_connections:
                 # check if there is already a line between buses in buses_of_new_connection
-                lines_btw_buses = [l for l in network.LINE_ID
-                                if network.LINE_F_T[l] == (connec[0],connec[1])
-                ]
-                if len(lines_btw_buses) > 0:
+                if (connec[0], connec[1]) in network.LINE_OF_F_T:
                     par_lines += 1
 
             if len(new_connections) - par_lines <= 1:
@@ -416,19 +786,59 @@ def _remove_n_connections_buses(params, network, thermals):
         cand_buses = cand_buses[1:]
 
 
+def _get_buses_to_check(network, buses_to_check:set) -> set:
+    """
+        the buses in `buses_to_check` and the buses touched since network.TOUCHED_BUSES was last
+        cleared that have not been deleted
+    """
+    return {bus for bus in buses_to_check | network.TOUCHED_BUSES if bus in network.LINES_FROM_BUS}
+
+
+def _get_buses_without_injections(network, thermals, buses:set) -> set:
+    """
+        the buses in `buses` with no controllable generation and no net load in all periods
+    """
+
+    buses = list(buses - network.get_gen_buses(thermals) - network.LOCKED_BUSES)
+
+    if len(buses) == 0:
+        return set()
+
+    no_net_load = np.all(network.NET_LOAD[[network.BUS_HEADER[bus] for bus in buses], :] == 0,
+                                                                                        axis=1)
+
+    return {bus for bus, no_load in zip(buses, no_net_load) if no_load}
+
+
+def _set_rule_of_plan(network, rule:int):
+    """
+        if the reduction is being recorded, the buses deleted from now on are deleted by the rule
+        of index `rule` in reduction_plan.RULES
+    """
+    if network.REDUCTION_PLAN is not None:
+        network.REDUCTION_PLAN.RULE = rule
+
+
 def reduce_network(params, thermals, network):
     """
         try to remove unnecessary lines and buses
+
+        the buses are checked against the removal rules in passes. all buses are checked in the
+        first pass, but afterwards only the buses whose lines were changed in the previous pass
+        (and, for the removal of buses with many connections, their neighbours) are checked
+        again, since the removal rules only depend on the lines and injections of a bus and
+        of its neighbours. the reduction stops once a pass changes nothing
     """
 
     ini_time = time()
 
     ini_buses, ini_lines = len(network.BUS_ID), len(network.LINE_ID)
 
-    MAX_IT = 20
-
     it = 0
 
+    buses_to_check = set(network.BUS_ID)
+    network.TOUCHED_BUSES.clear()
+
     buses_rm_1, lines_rm_1 = 0, 0
     buses_rm_2, lines_rm_2 = 0, 0
     buses_rm_3, lines_rm_3 = 0, 0
@@ -439,21 +849,17 @@ def reduce_network(params, thermals, network):
     total_time_mid_point_w_inj = 0
     total_time_many_connec = 0
 
-    while it < MAX_IT:
-        # this loop is only used to make sure that the updated network will
-        # be checked in each of the functions
+    while len(buses_to_check) > 0:
 
         initial_number_of_buses = len(network.BUS_ID)
         initial_number_of_lines = len(network.LINE_ID)
 
         ini_n_inj = time()
 
+        _set_rule_of_plan(network, 0)
+
         # Set of candidate buses to be deleted
-        buses_no_load_no_gen = (set(network.BUS_ID)
-                                - network.get_gen_buses(thermals)
-                                - network.get_renewable_gen_buses()
-                                - network.get_load_buses()
-        )
+        buses_no_load_no_gen = _get_buses_without_injections(network, thermals, buses_to_check)
 
         # collect here the buses removed from the network
         buses_to_delete = []
@@ -482,9 +888,11 @@ def reduce_network(params, thermals, network):
 
         ini_b, ini_l = len(network.BUS_ID), len(network.LINE_ID)
 
+        _set_rule_of_plan(network, 1)
+
         if params.MAX_NUMBER_OF_CONNECTIONS >= 1:
-            _remove_end_of_line_buses_with_injections(params, thermals,
-                                                      network)
+            _remove_end_of_line_buses_with_injections(params, thermals, network,
+                                                      _get_buses_to_check(network, buses_to_check))
 
         buses_rm_2 += ini_b - len(network.BUS_ID)
         lines_rm_2 += ini_l - len(network.LINE_ID)
@@ -495,8 +903,11 @@ def reduce_network(params, thermals, network):
 
         ini_b, ini_l = len(network.BUS_ID), len(network.LINE_ID)
 
+        _set_rule_of_plan(network, 2)
+
         if params.MAX_NUMBER_OF_CONNECTIONS >= 2:
-            _remove_mid_point_buses_with_injs(params, thermals, network)
+            _remove_mid_point_buses_with_injs(params, thermals, network,
+                                              _get_buses_to_check(network, buses_to_check))
 
         buses_rm_3 += ini_b - len(network.BUS_ID)
         lines_rm_3 += ini_l - len(network.LINE_ID)
@@ -506,8 +917,16 @@ def reduce_network(params, thermals, network):
         ini_rm_m_c = time()
 
         ini_b, ini_l = len(network.BUS_ID), len(network.LINE_ID)
+
+        _set_rule_of_plan(network, 3)
+
         if params.MAX_NUMBER_OF_CONNECTIONS >= 1:
-            _remove_n_connections_buses(params, network, thermals)
+            buses_to_check = _get_buses_to_check(network, buses_to_check)
+            # the removal of a bus with many connections also depends on the lines between its
+            # neighbours
+            _remove_n_connections_buses(params, network, thermals,
+                                        buses_to_check | {bus_2 for bus in buses_to_check
+                                                        for bus_2 in network.BUS_NEIGHBOURS[bus]})
 
         buses_rm_4 += ini_b - len(network.BUS_ID)
         lines_rm_4 += ini_l - len(network.LINE_ID)
@@ -516,9 +935,14 @@ def reduce_network(params, thermals, network):
 
         it += 1
 
-        if initial_number_of_buses == len(network.BUS_ID):
+        if (initial_number_of_buses == len(network.BUS_ID) and
+                initial_number_of_lines == len(network.LINE_ID)):
             break
 
+        # in the next pass, check only the buses touched in this pass
+        buses_to_check = _get_buses_to_check(network, set())
+        network.TOUCHED_BUSES.clear()
+
     end_buses, end_lines = len(network.BUS_ID), len(network.LINE_ID)
 
     print(f'\n\n\n{ini_buses - end_buses} buses and {ini_lines - end_lines} lines were removed' +
@@ -540,6 +964,8 @@ def del_end_of_line_buses_and_reassign_injection(network, thermals, buses_to_be_
         Delete these buses and move their power injections to the neighbouring bus
     """
 
+    reassignments = []
+
     for bus in buses_to_be_rm:
 
         # The elements connected to the bus to be deleted must be
@@ -560,15 +986,19 @@ def del_end_of_line_buses_and_reassign_injection(network, thermals, buses_to_be_
         del network.LINES_FROM_BUS[bus]
         del network.LINES_TO_BUS[bus]
 
-        _reassign_injections(thermals, network, bus, new_bus, 1.00)
+        reassignments.append((bus, new_bus, 1.00))
+
+    _reassign_injections(thermals, network, reassignments)
 
 
-def _remove_end_of_line_buses_with_injections(params, thermals, network):
+def _remove_end_of_line_buses_with_injections(params, thermals, network, buses_to_check:set):
     """Even buses with power injection (either positive or negative) can be removed from the
     network without any damage to the representation as long as the maximum injection is at
-    most equal to the capacity of the line connecting such bus to the rest of the network"""
+    most equal to the capacity of the line connecting such bus to the rest of the network.
+    Only the buses in `buses_to_check` and, after each round of removals, the buses to which
+    the injections were reassigned are considered"""
 
-    buses_cannot_be_del = set(network.REF_BUS_ID)
+    buses_cannot_be_del = set(network.REF_BUS_ID) | network.LOCKED_BUSES
 
     def _add_artificial_sec_constr(params, network, bus, l):
         """
@@ -608,25 +1038,26 @@ def _remove_end_of_line_buses_with_injections(params, thermals, network):
                             {g: thermals.BUS_COEFF[g][bus]
                             for g in network.SEC_CONSTRS[t][constr_id]['participants']['thermals']}
 
-    def _get_buses_to_be_rm(params, network, thermals):
+    def _get_buses_to_be_rm(params, network, thermals, cand_buses):
         """
         get a list of the buses to be removed
         """
 
         # get the subset of buses connected to the system through a single line
-        single_line_buses = {bus for bus in set(network.BUS_ID) - buses_cannot_be_del
-                            if len(network.LINES_FROM_BUS[bus] + network.LINES_TO_BUS[bus]) <= 1}
+        single_line_buses = {bus for bus in cand_buses - buses_cannot_be_del
+                            if bus in network.LINES_FROM_BUS and
+                            len(network.LINES_FROM_BUS[bus] + network.LINES_TO_BUS[bus]) <= 1}
 
         # Get the minimum and maximum loads of each bus during the scheduling horizon
-        min_load = {bus: np.min(network.NET_LOAD[b, :]) for b, bus in enumerate(network.BUS_ID)
-                                                                    if bus in single_line_buses}
-        max_load = {bus: np.max(network.NET_LOAD[b, :]) for b, bus in enumerate(network.BUS_ID)
-                                                                    if bus in single_line_buses}
+        min_load = {bus: np.min(network.NET_LOAD[network.BUS_HEADER[bus], :])
+                                                                    for bus in single_line_buses}
+        max_load = {bus: np.max(network.NET_LOAD[network.BUS_HEADER[bus], :])
+                                                                    for bus in single_line_buses}
 
         # Remember that net loads are positive in network.NET_LOAD if they are power withdraws,
         # while NET_LOAD is negative if the net result is a power injection (generation).
 
-        max_gen_of_bus = {bus: 0 for bus in network.BUS_ID}
+        max_gen_of_bus = {bus: 0 for bus in single_line_buses}
 
         buses_to_be_rm = []     # buses to be deleted
 
@@ -641,6 +1072,9 @@ def _remove_end_of_line_buses_with_injections(params, thermals, network):
                 max_gen_of_bus[bus] += thermals.BUS_COEFF[g][bus]*thermals.MAX_P[g]
 
             for l in lines_connected:
+                if network.REDUCTION_PLAN is not None:
+                    network.REDUCTION_PLAN.end_of_line_bus(network, bus, l)
+
                 if (
                     not(network.ACTIVE_BOUNDS[l])
                         or
@@ -668,17 +1102,21 @@ def _remove_end_of_line_buses_with_injections(params, thermals, network):
 
         return buses_to_be_rm
 
-    buses_to_be_rm = _get_buses_to_be_rm(params, network, thermals)
+    buses_to_be_rm = _get_buses_to_be_rm(params, network, thermals, buses_to_check)
 
     while len(buses_to_be_rm) > 0:
 
+        # only the buses that receive the injections might become end-of-line buses
+        buses_to_check = {bus_2 for bus in buses_to_be_rm
+                                    for bus_2 in network.BUS_NEIGHBOURS[bus]} - set(buses_to_be_rm)
+
         del_end_of_line_buses_and_reassign_injection(network, thermals,
                                                      buses_to_be_rm
         )
 
         update_load_and_network(network, thermals, buses_to_be_rm)
 
-        buses_to_be_rm = _get_buses_to_be_rm(params, network, thermals)
+        buses_to_be_rm = _get_buses_to_be_rm(params, network, thermals, buses_to_check)
 
 
 def _remove_mid_bus_with_inj(params, network, thermals,
@@ -732,13 +1170,12 @@ def _remove_mid_bus_with_inj(params, network, thermals,
     existing_paral_line = None # in case there is already a line between buses_of_new_connection
 
     # check if there is already a line between buses in buses_of_new_connection
-    lines_btw_buses = [l for l in network.LINE_ID
-                if network.LINE_F_T[l] == (buses_of_new_connection[0], buses_of_new_connection[1])
-                or network.LINE_F_T[l] == (buses_of_new_connection[1], buses_of_new_connection[0])]
-    if len(lines_btw_buses) > 0:
-        if len(lines_btw_buses) > 1:
-            raise ValueError("More than one line between buses")
-        existing_paral_line = lines_btw_buses[0]
+    if (buses_of_new_connection[0], buses_of_new_connection[1]) in network.LINE_OF_F_T:
+        existing_paral_line = network.LINE_OF_F_T[buses_of_new_connection[0],
+                                                  buses_of_new_connection[1]]
+    elif (buses_of_new_connection[1], buses_of_new_connection[0]) in network.LINE_OF_F_T:
+        existing_paral_line = network.LINE_OF_F_T[buses_of_new_connection[1],
+                                                  buses_of_new_connection[0]]
 
     line_1 = [l for l in network.LINES_FROM_BUS[bus] + network.LINES_TO_BUS[bus]
                                             if buses_of_new_connection[0] in network.LINE_F_T[l]][0]
@@ -772,6 +1209,23 @@ def _remove_mid_bus_with_inj(params, network, thermals,
     pf =-(1/network.LINE_X[line_id_to_keep])/((1/network.LINE_X[line_1])+(1/network.LINE_X[line_2]))
     coeffs_new_buses = {buses_of_new_connection[0]: -pf, buses_of_new_connection[1]: (1 + pf)}
 
+    if network.REDUCTION_PLAN is not None:
+        # the bounds are shifted by the coefficient of the injections of bus (if any) times them
+        if network.ACTIVE_BOUNDS[line_id_to_keep]:
+            network.REDUCTION_PLAN.shift_bounds(
+                            line_id_to_keep, line_id_to_keep,
+                            1 if buses_of_new_connection[0] == network.LINE_F_T[line_id_to_keep][0]
+                                                                                        else -1,
+                            bus, -coeffs_new_buses[buses_of_new_connection[0]])
+        else:
+            network.REDUCTION_PLAN.shift_bounds(
+                            line_id_to_keep, line_id_to_del,
+                            1 if buses_of_new_connection[1] == network.LINE_F_T[line_id_to_del][1]
+                                                                                        else -1,
+                            bus, coeffs_new_buses[buses_of_new_connection[1]])
+        for (new_bus, bus_coeff) in coeffs_new_buses.items():
+            network.REDUCTION_PLAN.reassign(bus, new_bus, bus_coeff)
+
     addition_to_cap = 0
 
     if np.max(np.abs(network.NET_LOAD[network.BUS_HEADER[bus], :])) != 0:
@@ -880,7 +1334,9 @@ def _remove_mid_bus_with_inj(params, network, thermals,
         # there was no active flow for these two lines
         raise ValueError("This function is meant for buses connected to a single active line")
 
+    network.unindex_line(line_id_to_keep)
     network.LINE_F_T[line_id_to_keep] = (buses_of_new_connection[0], buses_of_new_connection[1])
+    network.index_line(line_id_to_keep)
     network.LINE_X[line_id_to_keep] = network.LINE_X[line_1] + network.LINE_X[line_2]
     network.LINES_FROM_BUS[buses_of_new_connection[0]].append(line_id_to_keep)
     network.LINES_TO_BUS[buses_of_new_connection[1]].append(line_id_to_keep)
@@ -889,6 +1345,13 @@ def _remove_mid_bus_with_inj(params, network, thermals,
                                                     network.ACTIVE_BOUNDS[line_id_to_del])
 
     if existing_paral_line is not None:
+        if network.REDUCTION_PLAN is not None:
+            network.REDUCTION_PLAN.parallel_line(
+                            line_id_to_keep, network.LINE_X[line_id_to_keep],
+                            network.REDUCTION_PLAN.line_terms(existing_paral_line, 1),
+                            network.REDUCTION_PLAN.LIMITS_OF_LINE[existing_paral_line],
+                            network.LINE_X[existing_paral_line])
+
         (_, network.LINE_X[line_id_to_keep], _1, _2, _3, _4,
                             network.LINE_FLOW_UB[line_id_to_keep],
                             network.LINE_FLOW_LB[line_id_to_keep],
@@ -932,22 +1395,24 @@ def _remove_mid_bus_with_inj(params, network, thermals,
         _del_lines(network, [existing_paral_line])
 
 
-def _remove_mid_point_buses_with_injs(params, thermals, network):
+def _remove_mid_point_buses_with_injs(params, thermals, network, buses_to_check:set):
     """
     Buses with injections connected to the network by two lines can be removed
     by reformulating the power flow in the lines connected to the bus being
-    removed. Thus, one bus and one line are removed
+    removed. Thus, one bus and one line are removed. Only the buses in `buses_to_check`
+    and, after each round of removals, the endpoints of the new lines are considered
     """
 
-    def _get_cand_buses(network, buses_cannot_be_del):
+    def _get_cand_buses(network, buses_cannot_be_del, buses_to_check):
         """get mid-point buses with injections that can be deleted"""
 
         # the bus must be connected to two lines
         # exactly one of the lines connected to the bus can be binding
         # if a bus is removed, none of its immediate neighbouring buses
         # can be removed
-        return [bus for bus in set(network.BUS_ID) - buses_cannot_be_del
-                if len(network.LINES_FROM_BUS[bus] + network.LINES_TO_BUS[bus]) == 2
+        return [bus for bus in buses_to_check - buses_cannot_be_del
+                if bus in network.LINES_FROM_BUS
+                and len(network.LINES_FROM_BUS[bus] + network.LINES_TO_BUS[bus]) == 2
                     and (len([l for l in network.LINES_FROM_BUS[bus] +
                         network.LINES_TO_BUS[bus] if network.ACTIVE_BOUNDS[l]]) == 1)
         ]
@@ -956,9 +1421,9 @@ def _remove_mid_point_buses_with_injs(params, thermals, network):
 
     gen_buses = network.get_gen_buses(thermals)
 
-    buses_cannot_be_del = set(network.REF_BUS_ID) | gen_buses
+    buses_cannot_be_del = set(network.REF_BUS_ID) | gen_buses | network.LOCKED_BUSES
 
-    candidate_buses = _get_cand_buses(network, buses_cannot_be_del)
+    candidate_buses = _get_cand_buses(network, buses_cannot_be_del, buses_to_check)
 
     it = 0
 
@@ -966,13 +1431,20 @@ def _remove_mid_point_buses_with_injs(params, thermals, network):
 
         buses_deleted = []
 
+        # the buses at the ends of the new lines
+        buses_to_check = set()
+
         for bus in candidate_buses:
+            buses_connected = set(network.BUS_NEIGHBOURS[bus])
             _remove_mid_bus_with_inj(params, network, thermals,
                                      buses_deleted, bus
             )
+            if len(buses_deleted) > 0 and buses_deleted[-1] == bus:
+                buses_to_check |= buses_connected
 
         update_load_and_network(network, thermals, buses_deleted)
 
-        candidate_buses = _get_cand_buses(network, buses_cannot_be_del)
+        candidate_buses = _get_cand_buses(network, buses_cannot_be_del,
+                                          buses_to_check - set(buses_deleted))
 
         it += 1
@@ -0,0 +1,237 @@
+from time import time
+from copy import copy
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+from params import Params
+from components.thermal import Thermals
+from components.network import Network
+from pre_processing.build_ptdf import _get_mp_context
+from pre_processing.reduce_network import reduce_network
+
+# attributes of the network with the data of each line that the reduction might change
+_LINE_ATTRS = ('LINE_F_T', 'LINE_X', 'LINE_FLOW_UB', 'LINE_FLOW_LB',
+               'ACTIVE_BOUNDS', 'ACTIVE_UB', 'ACTIVE_LB',
+               'ACTIVE_UB_PER_PERIOD', 'ACTIVE_LB_PER_PERIOD')
+
+
+def _get_regions(params:Params, network:Network) -> list[list[int]]:
+    """
+        partition the buses of the network into regions. if the buses belong to more than one area,
+        then the areas are the regions. otherwise, the buses are ordered with the reverse
+        Cuthill-McKee ordering of the network's graph, which keeps buses close in the network
+        close in the ordering, and the ordering is split into params.REDUCTION_REGIONS regions
+        with similar numbers of buses
+    """
+
+    buses_of_area = {}
+    for bus in network.BUS_ID:
+        buses_of_area.setdefault(network.BUS_AREA.get(bus), []).append(bus)
+
+    if len(buses_of_area) > 1:
+        return list(buses_of_area.values())
+
+    rows = [network.BUS_HEADER[network.LINE_F_T[l][0]] for l in network.LINE_ID]
+    cols = [network.BUS_HEADER[network.LINE_F_T[l][1]] for l in network.LINE_ID]
+    adjacency = sparse.csr_matrix((np.ones(2*len(rows), dtype='d'), (rows + cols, cols + rows)),
+                                  shape=(len(network.BUS_ID), len(network.BUS_ID)))
+
+    ordering = reverse_cuthill_mckee(adjacency, symmetric_mode=True)
+
+    return [[network.BUS_ID[b] for b in sorted(region)]
+                    for region in np.array_split(ordering, params.REDUCTION_REGIONS)
+                        if len(region) > 0]
+
+
+def _get_region(thermals:Thermals, network:Network, buses:set,
+                locked_buses:set) -> tuple[Thermals, Network]:
+    """
+        the thermal units and the network of the region formed by `buses` and the lines between
+        them. the buses in `locked_buses` cannot be deleted by the reduction of the region
+    """
+
+    region = Network()
+
+    region.BUS_ID = [bus for bus in network.BUS_ID if bus in buses]
+    region.BUS_NAME = {bus: network.BUS_NAME[bus] for bus in region.BUS_ID}
+    region.BUS_AREA = {bus: network.BUS_AREA[bus] for bus in region.BUS_ID
+                                                                    if bus in network.BUS_AREA}
+    region.BUS_HEADER = {bus: b for (b, bus) in enumerate(region.BUS_ID)}
+    region.REF_BUS_ID = [bus for bus in network.REF_BUS_ID if bus in buses]
+    region.NET_LOAD = network.NET_LOAD[[network.BUS_HEADER[bus] for bus in region.BUS_ID], :]
+    region.LOCKED_BUSES = set(locked_buses)
+
+    region.LINE_ID = [l for l in network.LINE_ID
+                        if network.LINE_F_T[l][0] in buses and network.LINE_F_T[l][1] in buses]
+
+    region.LINE_F_T = {l: network.LINE_F_T[l] for l in region.LINE_ID}
+    region.LINE_X = {l: network.LINE_X[l] for l in region.LINE_ID}
+    region.LINE_FLOW_UB = {l: np.array(network.LINE_FLOW_UB[l]) for l in region.LINE_ID}
+    region.LINE_FLOW_LB = {l: np.array(network.LINE_FLOW_LB[l]) for l in region.LINE_ID}
+    region.ACTIVE_BOUNDS = {l: network.ACTIVE_BOUNDS[l] for l in region.LINE_ID}
+    region.ACTIVE_UB = {l: network.ACTIVE_UB[l] for l in region.LINE_ID}
+    region.ACTIVE_LB = {l: network.ACTIVE_LB[l] for l in region.LINE_ID}
+    region.ACTIVE_UB_PER_PERIOD = {l: copy(network.ACTIVE_UB_PER_PERIOD[l])
+                                                                    for l in region.LINE_ID}
+    region.ACTIVE_LB_PER_PERIOD = {l: copy(network.ACTIVE_LB_PER_PERIOD[l])
+                                                                    for l in region.LINE_ID}
+
+    region.LINES_FROM_BUS = {bus: [] for bus in region.BUS_ID}
+    region.LINES_TO_BUS = {bus: [] for bus in region.BUS_ID}
+    region.BUS_NEIGHBOURS = {bus: set() for bus in region.BUS_ID}
+    for l in region.LINE_ID:
+        region.LINES_FROM_BUS[region.LINE_F_T[l][0]].append(l)
+        region.LINES_TO_BUS[region.LINE_F_T[l][1]].append(l)
+        region.index_line(l)
+    region.TOUCHED_BUSES.clear()
+
+    # only the buses of the thermal units in the region are changed by its reduction
+    region_thermals = copy(thermals)
+    region_thermals.BUS = {g: [bus for bus in thermals.BUS[g] if bus in buses]
+                                                                for g in thermals.UNIT_NAME.keys()}
+    region_thermals.BUS_COEFF = {g: {bus: coeff for bus, coeff in thermals.BUS_COEFF[g].items()
+                                                                                if bus in buses}
+                                                                for g in thermals.UNIT_NAME.keys()}
+
+    return region_thermals, region
+
+
+def _reduce_region(params:Params, thermals:Thermals,
+                   network:Network) -> tuple[Thermals, Network]:
+    """reduce the network of a region, possibly in a child process"""
+
+    reduce_network(params, thermals, network)
+
+    return thermals, network
+
+
+def _merge_regions(thermals:Thermals, network:Network, region_of_bus:dict[int, int],
+                   regions:list[tuple[Thermals, Network]]):
+    """
+        replace the buses and lines of each region in `network` with those of its reduced network.
+        `region_of_bus` is the region of each bus of `network`. the lines between regions are not
+        changed. the lines created by the reduction of the regions get new IDs, since different
+        regions might have used the same IDs, even the IDs of lines of other regions
+    """
+
+    next_line_id = max(network.LINE_ID) + 1
+
+    line_data = {attr: {} for attr in _LINE_ATTRS}
+
+    # lines of each region before its reduction
+    lines_of_region = [set() for _ in regions]
+
+    for l in network.LINE_ID:
+        (r_from, r_to) = (region_of_bus[network.LINE_F_T[l][0]],
+                          region_of_bus[network.LINE_F_T[l][1]])
+        if r_from == r_to:
+            lines_of_region[r_from].add(l)
+        else:
+            # lines between regions
+            for attr in _LINE_ATTRS:
+                line_data[attr][l] = getattr(network, attr)[l]
+
+    new_lines = []
+    for (r, (_, region)) in enumerate(regions):
+        for l in region.LINE_ID:
+            if l in lines_of_region[r]:
+                l_new = l
+            else:
+                l_new = next_line_id
+                new_lines.append(l_new)
+                next_line_id += 1
+            for attr in _LINE_ATTRS:
+                line_data[attr][l_new] = getattr(region, attr)[l]
+
+        for t, constrs in region.SEC_CONSTRS.items():
+            network.SEC_CONSTRS.setdefault(t, {}).update(constrs)
+
+    line_id = [l for l in network.LINE_ID if l in line_data['LINE_F_T']] + new_lines
+
+    kept_buses = {bus for (_, region) in regions for bus in region.BUS_ID}
+    bus_id = [bus for bus in network.BUS_ID if bus in kept_buses]
+
+    net_load = np.zeros((len(bus_id), network.NET_LOAD.shape[1]), dtype='d')
+    for (b, bus) in enumerate(bus_id):
+        region = regions[region_of_bus[bus]][1]
+        net_load[b, :] = region.NET_LOAD[region.BUS_HEADER[bus], :]
+
+    network.NET_LOAD = net_load
+    network.BUS_ID[:] = bus_id
+    network.BUS_HEADER = {bus: b for (b, bus) in enumerate(bus_id)}
+    network.BUS_NAME = {bus: network.BUS_NAME[bus] for bus in bus_id}
+    network.BUS_AREA = {bus: network.BUS_AREA[bus] for bus in bus_id if bus in network.BUS_AREA}
+    network.REF_BUS_ID = [bus for (_, region) in regions for bus in region.REF_BUS_ID]
+
+    network.LINE_ID[:] = line_id
+    for attr in _LINE_ATTRS:
+        setattr(network, attr, line_data[attr])
+    network.CONTINGENCIES = {l: contingency for l, contingency in network.CONTINGENCIES.items()
+                                                                if l in line_data['LINE_F_T']}
+
+    network.LINES_FROM_BUS = {bus: [] for bus in bus_id}
+    network.LINES_TO_BUS = {bus: [] for bus in bus_id}
+    network.LINE_OF_F_T = {}
+    network.BUS_NEIGHBOURS = {bus: set() for bus in bus_id}
+    for l in line_id:
+        network.LINES_FROM_BUS[network.LINE_F_T[l][0]].append(l)
+        network.LINES_TO_BUS[network.LINE_F_T[l][1]].append(l)
+        network.index_line(l)
+    network.TOUCHED_BUSES.clear()
+
+    for g in thermals.UNIT_NAME.keys():
+        thermals.BUS[g] = [bus for (region_thermals, _) in regions
+                                                        for bus in region_thermals.BUS[g]]
+        thermals.BUS_COEFF[g] = {bus: coeff for (region_thermals, _) in regions
+                                            for bus, coeff in region_thermals.BUS_COEFF[g].items()}
+
+
+def reduce_network_by_regions(params:Params, thermals:Thermals, network:Network):
+    """
+        Reduce the network region by region, with the regions reduced in parallel by up to
+        params.MAX_PROCESS_REDUCE_NETWORK processes. The reduction of a region does not depend on
+        the other regions as long as its buses connected to other regions are not deleted, so
+        these buses are locked while the regions are reduced. The reduced regions are then merged
+        into `network`, which is reduced once more, without the locks, so that the buses at the
+        boundaries between regions can also be deleted
+    """
+
+    ini_time = time()
+
+    ini_buses, ini_lines = len(network.BUS_ID), len(network.LINE_ID)
+
+    regions = _get_regions(params, network)
+
+    region_of_bus = {bus: r for r, buses in enumerate(regions) for bus in buses}
+
+    # buses connected to buses of other regions
+    boundary_buses = {bus for l in network.LINE_ID for bus in network.LINE_F_T[l]
+                        if region_of_bus[network.LINE_F_T[l][0]] !=
+                                                        region_of_bus[network.LINE_F_T[l][1]]}
+
+    jobs = [_get_region(thermals, network, set(buses),
+                        (boundary_buses | network.LOCKED_BUSES) & set(buses))
+                                                                            for buses in regions]
+
+    n_processes = min(params.MAX_PROCESS_REDUCE_NETWORK, len(jobs))
+
+    if n_processes > 1:
+        with ProcessPoolExecutor(max_workers=n_processes,
+                                 mp_context=_get_mp_context()) as executor:
+            futures = [executor.submit(_reduce_region, params, region_thermals, region)
+                                                            for (region_thermals, region) in jobs]
+            reduced_regions = [future.result() for future in futures]
+    else:
+        reduced_regions = [_reduce_region(params, region_thermals, region)
+                                                            for (region_thermals, region) in jobs]
+
+    _merge_regions(thermals, network, region_of_bus, reduced_regions)
+
+    print(f"\n\n\n{ini_buses - len(network.BUS_ID)} buses and " +
+          f"{ini_lines - len(network.LINE_ID)} lines were removed from {len(regions)} regions " +
+          f"with {len(boundary_buses)} boundary buses by {max(n_processes, 1)} processes in " +
+          f"{time() - ini_time:.2f} seconds", flush=True)
+
+    reduce_network(params, thermals, network)
@@ -0,0 +1,495 @@
+import os
+import hashlib
+import numpy as np
+from scipy import sparse
+
+from params import Params
+from constants import MAX_FLOW
+from components.thermal import Thermals
+from components.network import Network
+
+# rules of reduce_network by which the buses are deleted, in the order in which they are applied
+RULES = ('no injection', 'end of line with injections', 'mid-point with injections',
+         'many connections')
+
+
+def network_fingerprint(params:Params, thermals:Thermals, network:Network) -> str:
+    """
+        Hash of the data of the network that do not change from one case to another, and on
+        which a reduction plan depends: the buses, the lines, their endpoints and reactances,
+        and the buses of the controllable generating units
+    """
+
+    fingerprint = hashlib.sha256()
+    fingerprint.update(np.array([params.T], dtype='int64').tobytes())
+    fingerprint.update(np.array(network.BUS_ID, dtype='int64').tobytes())
+    fingerprint.update(np.array(network.LINE_ID, dtype='int64').tobytes())
+    fingerprint.update(np.array([network.LINE_F_T[l] for l in network.LINE_ID],
+                                dtype='int64').tobytes())
+    fingerprint.update(np.array([network.LINE_X[l] for l in network.LINE_ID],
+                                dtype='d').tobytes())
+    fingerprint.update(np.array([(g, bus) for g in sorted(thermals.UNIT_NAME.keys())
+                                 for bus in sorted(thermals.BUS[g])], dtype='int64').tobytes())
+
+    return fingerprint.hexdigest()
+
+
+class ReductionPlan:
+    """
+        Record of a call to reduce_network, which keeps it up to date while it is assigned to
+        `Network.REDUCTION_PLAN`. The plan is relative to the network as it was before the call,
+        its base network. The net loads of a bus of the reduced network are a linear combination
+        of those of the buses of the base network, and so are the injections of the generating
+        units. The bounds of the lines of the reduced network are given as terms, each of which
+        is a multiple of the bounds of a line of the base network plus a constant and a linear
+        combination of the base net loads. The upper bound of a line is the minimum of its terms,
+        and the lower bound the maximum. The plan also records the lines of the base network
+        whose limits it assumes not to be binding, and the buses it deletes without reassigning
+        their injections, which must have no net load
+    """
+
+    def __init__(self, params:Params, thermals:Thermals, network:Network):
+
+        #: Hash of the data of the base network that do not change from one case to another.
+        self.FINGERPRINT: str = network_fingerprint(params, thermals, network)
+
+        self.BASE_BUS_ID: list[int] = list(network.BUS_ID)      #: Buses of the base network.
+        self.BASE_LINE_ID: list[int] = list(network.LINE_ID)    #: Lines of the base network.
+
+        #: Coefficients of the base buses, given by their indices in `BASE_BUS_ID`, in the
+        #: injections of each bus.
+        self.INJECTION_MAP: dict[int, dict[int, float]] = {bus: {b: 1.0}
+                                                        for b, bus in enumerate(network.BUS_ID)}
+
+        #: Base lines whose limits are represented by the bounds of each line.
+        self.LIMITS_OF_LINE: dict[int, set[int]] = {l: {l} for l in network.LINE_ID}
+
+        #: Terms of the bounds of each line. A term is a tuple (base line, multiplier, coefficients
+        #: of the base buses, constant of the upper bound, constant of the lower bound). The base
+        #: line is None if the term does not depend on the bounds of a base line. If the multiplier
+        #: is negative, its product with the lower bound of the base line is part of the upper
+        #: bound, and vice versa.
+        self.BOUND_TERMS: dict[int, list[tuple]] = {l: [(l, 1.0, {}, 0.0, 0.0)]
+                                                                        for l in network.LINE_ID}
+
+        #: Base lines whose limits are not represented by the bounds of any line, but either by
+        #: artificial security constraints or because their flows are zero.
+        self.KEPT_LIMITS: set[int] = set()
+
+        #: Coefficients of the base buses in the injections of the buses deleted with no
+        #: injections, which must be zero.
+        self.ZERO_INJECTIONS: list[dict[int, float]] = []
+
+        #: Possible artificial security constraints limiting the injections of the end-of-line
+        #: buses deleted whose lines have possibly binding limits.
+        self.ARTIFICIAL_CONSTRS: list[dict] = []
+
+        #: Buses deleted, in order, and the index in `RULES` of the rule by which they were
+        #: deleted.
+        self.STEPS: list[tuple[int, int]] = []
+
+        #: Index in `RULES` of the rule being applied.
+        self.RULE: int = 0
+
+    @staticmethod
+    def constant_terms(cap:float) -> list[tuple]:
+        """the terms of the bounds of a line whose capacity is `cap` in both directions"""
+        return [(None, 0.0, {}, cap, -cap)]
+
+    def line_terms(self, l:int, scale:float) -> list[tuple]:
+        """
+            the terms of the bounds of `l` multiplied by `scale`. if `scale` is -1, these are the
+            terms of the bounds in the reverse direction of the flow
+        """
+        return [(base_line, scale*multiplier, {b: scale*coeff for b, coeff in offsets.items()},
+                 scale*(const_ub if scale > 0 else const_lb),
+                 scale*(const_lb if scale > 0 else const_ub))
+                            for (base_line, multiplier, offsets, const_ub, const_lb)
+                                                                    in self.BOUND_TERMS[l]]
+
+    def reassign(self, bus:int, new_bus:int, bus_coeff:float):
+        """the injections of `bus` times `bus_coeff` are added to those of `new_bus`"""
+        row = self.INJECTION_MAP[new_bus]
+        for b, coeff in self.INJECTION_MAP[bus].items():
+            row[b] = row.get(b, 0) + bus_coeff*coeff
+
+    def zero_injection(self, bus:int, lines:list[int]):
+        """`bus`, with no injections, is deleted together with `lines`"""
+        self.ZERO_INJECTIONS.append(dict(self.INJECTION_MAP[bus]))
+        if len(lines) == 1:
+            # the flow of the single line of the bus is zero
+            self.KEPT_LIMITS.update(self.LIMITS_OF_LINE[lines[0]])
+
+    def delete_buses(self, buses:list[int]):
+        """`buses` are deleted from the network"""
+        for bus in buses:
+            self.STEPS.append((bus, self.RULE))
+            del self.INJECTION_MAP[bus]
+
+    def new_line(self, l:int, terms:list[tuple], limits:set[int]):
+        """`l` is created with bounds given by `terms`, which represent the limits `limits`"""
+        self.BOUND_TERMS[l] = terms
+        self.LIMITS_OF_LINE[l] = set(limits)
+
+    def del_line(self, l:int):
+        """`l` is deleted from the network"""
+        del self.BOUND_TERMS[l]
+        del self.LIMITS_OF_LINE[l]
+
+    def parallel_line(self, l:int, reactance:float, terms:list[tuple], limits:set[int],
+                      reactance_2:float):
+        """
+            `l`, of reactance `reactance`, is merged with a parallel line of reactance
+            `reactance_2` whose bounds are given by `terms`. as in add_new_parallel_line, the
+            bounds of each line are scaled by the ratio of the magnitudes of the admittances
+        """
+        mag_admt_eq = abs(1/reactance + 1/reactance_2)
+        self.BOUND_TERMS[l] = (self.line_terms(l, mag_admt_eq*abs(reactance)) +
+                               [(base_line, mag_admt_eq*abs(reactance_2)*multiplier,
+                                 {b: mag_admt_eq*abs(reactance_2)*coeff
+                                                                for b, coeff in offsets.items()},
+                                 mag_admt_eq*abs(reactance_2)*const_ub,
+                                 mag_admt_eq*abs(reactance_2)*const_lb)
+                                    for (base_line, multiplier, offsets, const_ub, const_lb)
+                                                                                    in terms])
+        self.LIMITS_OF_LINE[l] = self.LIMITS_OF_LINE[l] | limits
+
+    def shift_bounds(self, l:int, l_2:int, direction:int, bus:int, bus_coeff:float):
+        """
+            the bounds of `l` become those of `l_2`, in the reverse direction if `direction` is
+            -1, plus `bus_coeff` times the injections of `bus`
+        """
+        terms = self.line_terms(l_2, direction)
+        for (_, _, offsets, _, _) in terms:
+            for b, coeff in self.INJECTION_MAP[bus].items():
+                offsets[b] = offsets.get(b, 0) + bus_coeff*coeff
+        self.BOUND_TERMS[l] = terms
+        self.LIMITS_OF_LINE[l] = set(self.LIMITS_OF_LINE[l_2])
+
+    def end_of_line_bus(self, network:Network, bus:int, l:int):
+        """
+            `bus` is deleted and its injections are reassigned to the other endpoint of `l`. if
+            the limits of `l` are possibly binding, an artificial security constraint might be
+            needed, which is recorded together with its bounds
+        """
+
+        if not network.ACTIVE_BOUNDS[l]:
+            return
+
+        self.KEPT_LIMITS.update(self.LIMITS_OF_LINE[l])
+
+        # the bounds on the injections of bus are those on the flow of l leaving it
+        self.ARTIFICIAL_CONSTRS.append({
+                    'bus': bus, 'line': l,
+                    'injections': dict(self.INJECTION_MAP[bus]),
+                    'terms': self.line_terms(l, 1 if bus == network.LINE_F_T[l][0] else -1)})
+
+
+def _sparse_rows(rows:list[dict[int, float]], n_cols:int) -> sparse.csr_matrix:
+    """a CSR matrix whose rows are given as dictionaries of column to coefficient"""
+    return sparse.csr_matrix(
+                (np.array([coeff for row in rows for coeff in row.values()], dtype='d'),
+                 np.array([b for row in rows for b in row.keys()], dtype='int64'),
+                 np.cumsum([0] + [len(row) for row in rows], dtype='int64')),
+                 shape=(len(rows), n_cols))
+
+
+def _get_terms_arrays(plan:ReductionPlan, terms_of_bounds:list[list[tuple]]) -> dict:
+    """the arrays of the terms of the bounds in `terms_of_bounds`"""
+
+    line_idx = {l: i for i, l in enumerate(plan.BASE_LINE_ID)}
+    terms = [term for terms in terms_of_bounds for term in terms]
+
+    return {
+        'n_terms': np.array([len(terms) for terms in terms_of_bounds], dtype='int64'),
+        'base_line_idx': np.array([-1 if base_line is None else line_idx[base_line]
+                                            for (base_line, _, _, _, _) in terms], dtype='int64'),
+        'multiplier': np.array([term[1] for term in terms], dtype='d'),
+        'offsets': _sparse_rows([term[2] for term in terms], len(plan.BASE_BUS_ID)),
+        'const_ub': np.array([term[3] for term in terms], dtype='d'),
+        'const_lb': np.array([term[4] for term in terms], dtype='d'),
+    }
+
+
+def _evaluate_terms(plan:dict, prefix:str, flow_ub:np.ndarray, flow_lb:np.ndarray,
+                    net_load:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+        the upper and lower bounds whose terms are the arrays of `plan` starting with `prefix`,
+        given the bounds `flow_ub` and `flow_lb` of the base lines and the base net loads
+    """
+
+    n_periods = net_load.shape[1]
+    n_terms = plan[prefix + 'n_terms']
+
+    if len(n_terms) == 0:
+        return (np.zeros((0, n_periods)), np.zeros((0, n_periods)))
+
+    base_line_idxs = plan[prefix + 'base_line_idx']
+    multiplier = plan[prefix + 'multiplier'][:, np.newaxis]
+    rows = np.maximum(base_line_idxs, 0)
+    has_base_line = (base_line_idxs >= 0)[:, np.newaxis]
+
+    ub = np.zeros((len(base_line_idxs), n_periods))
+    lb = np.zeros((len(base_line_idxs), n_periods))
+    if flow_ub.shape[0] > 0:
+        ub = np.where(has_base_line, np.where(multiplier > 0, multiplier*flow_ub[rows, :],
+                                                              multiplier*flow_lb[rows, :]), 0)
+        lb = np.where(has_base_line, np.where(multiplier > 0, multiplier*flow_lb[rows, :],
+                                                              multiplier*flow_ub[rows, :]), 0)
+
+    offsets = plan[prefix + 'offsets'] @ net_load
+    ub += plan[prefix + 'const_ub'][:, np.newaxis] + offsets
+    lb += plan[prefix + 'const_lb'][:, np.newaxis] + offsets
+
+    starts = np.cumsum(n_terms) - n_terms
+
+    return (np.minimum.reduceat(ub, starts, axis=0), np.maximum.reduceat(lb, starts, axis=0))
+
+
+def get_plan_arrays(plan:ReductionPlan, network:Network) -> dict:
+    """
+        The arrays of `plan`, now that its base network has been reduced to `network`. The
+        loads and the bounds that depend on them are given by sparse matrices of coefficients of
+        the net loads of the base network
+    """
+
+    line_idx = {l: i for i, l in enumerate(plan.BASE_LINE_ID)}
+
+    # limits of the base lines that are still represented in the reduced network
+    kept_limits = plan.KEPT_LIMITS.union(*(plan.LIMITS_OF_LINE[l] for l in network.LINE_ID
+                                                                    if network.ACTIVE_BOUNDS[l]))
+
+    arrays = {
+        'fingerprint': np.array(plan.FINGERPRINT),
+        'steps': np.array(plan.STEPS, dtype='int64').reshape((-1, 2)),
+        'bus_id': np.array(network.BUS_ID, dtype='int64'),
+        'ref_bus_id': np.array(network.REF_BUS_ID, dtype='int64'),
+        'line_id': np.array(network.LINE_ID, dtype='int64'),
+        'line_f_t': np.array([network.LINE_F_T[l] for l in network.LINE_ID],
+                             dtype='int64').reshape((-1, 2)),
+        'line_x': np.array([network.LINE_X[l] for l in network.LINE_ID], dtype='d'),
+        'active_bounds': np.array([network.ACTIVE_BOUNDS[l] for l in network.LINE_ID],
+                                  dtype='bool'),
+        'redundant_lines': np.array([l for l in plan.BASE_LINE_ID if l not in kept_limits],
+                                    dtype='int64'),
+        'constrs_bus_line': np.array([(c['bus'], c['line']) for c in plan.ARTIFICIAL_CONSTRS],
+                                     dtype='int64').reshape((-1, 2)),
+        'injection_map': _sparse_rows([plan.INJECTION_MAP[bus] for bus in network.BUS_ID],
+                                      len(plan.BASE_BUS_ID)),
+        'zero_injections': _sparse_rows(plan.ZERO_INJECTIONS, len(plan.BASE_BUS_ID)),
+        'constrs_injections': _sparse_rows([c['injections'] for c in plan.ARTIFICIAL_CONSTRS],
+                                           len(plan.BASE_BUS_ID)),
+        'limits_of_line': _sparse_rows([{line_idx[l_2]: 1.0 for l_2 in plan.LIMITS_OF_LINE[l]}
+                                            for l in network.LINE_ID], len(plan.BASE_LINE_ID)),
+    }
+
+    for (name, array) in _get_terms_arrays(plan, [plan.BOUND_TERMS[l]
+                                                        for l in network.LINE_ID]).items():
+        arrays['line_term_' + name] = array
+    for (name, array) in _get_terms_arrays(plan, [c['terms']
+                                                    for c in plan.ARTIFICIAL_CONSTRS]).items():
+        arrays['constrs_term_' + name] = array
+
+    return arrays
+
+
+def save_reduction_plan(file_name:str, stages:list[dict]):
+    """
+        Save the plans `stages`, obtained with get_plan_arrays, of the successive reductions of a
+        network to `file_name`, a compressed npz file
+    """
+
+    arrays = {}
+    for (k, stage) in enumerate(stages):
+        for (name, array) in stage.items():
+            if sparse.issparse(array):
+                arrays[f"{k}_{name}_data"] = array.data
+                arrays[f"{k}_{name}_indices"] = array.indices
+                arrays[f"{k}_{name}_indptr"] = array.indptr
+                arrays[f"{k}_{name}_shape"] = np.array(array.shape, dtype='int64')
+            else:
+                arrays[f"{k}_{name}"] = array
+
+    if os.path.dirname(file_name) != '':
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+
+    with open(file_name, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+
+    print(f"\n\nThe reduction plan was saved to {file_name}:", flush=True)
+    for (k, stage) in enumerate(stages):
+        print(f"Stage {k}:\t{len(stage['steps'])} buses deleted and " +
+              f"{len(stage['redundant_lines'])} line limits assumed not to be binding", flush=True)
+
+
+def load_reduction_plan(file_name:str) -> list[dict]:
+    """
+        Load the plans of the successive reductions of a network saved with save_reduction_plan.
+        The sparse matrices are rebuilt as CSR matrices
+    """
+
+    with np.load(file_name, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+
+    stages = []
+    for (key, array) in arrays.items():
+        (k, name) = key.split('_', 1)
+        while len(stages) <= int(k):
+            stages.append({})
+        stages[int(k)][name] = array
+
+    for stage in stages:
+        for name in [name[:-len('_data')] for name in list(stage) if name.endswith('_data')]:
+            stage[name] = sparse.csr_matrix((stage.pop(name + '_data'),
+                                             stage.pop(name + '_indices'),
+                                             stage.pop(name + '_indptr')),
+                                            shape=tuple(stage.pop(name + '_shape')))
+
+    return stages
+
+
+def replay_reduction_plan(params:Params, plan:dict, thermals:Thermals, network:Network) -> bool:
+    """
+        Reduce `network` by applying `plan`, the arrays of a plan recorded for a network of the
+        same system, instead of analysing it again. The net loads and the injections of the
+        generating units are mapped to the reduced network with the sparse matrix of the plan,
+        and the bounds that depend on the net loads are recomputed
+
+        The plan is only replayed if the limits of all lines that it assumes not to be binding
+        are also not binding in `network`, if the buses it deletes without reassigning their
+        injections have no net load. Otherwise, `network` and `thermals` are not changed and
+        False is returned
+    """
+
+    if str(plan['fingerprint']) != network_fingerprint(params, thermals, network):
+        print("\n\nThe reduction plan was not recorded for this network", flush=True)
+        return False
+
+    active_redundant_lines = [l for l in plan['redundant_lines'] if network.ACTIVE_BOUNDS[l]]
+    if len(active_redundant_lines) > 0:
+        print(f"\n\nThe reduction plan is not valid: the limits of {len(active_redundant_lines)}" +
+              " lines assumed not to be binding might be binding", flush=True)
+        return False
+
+    net_load = np.array(network.NET_LOAD, dtype='d')
+
+    if np.any(plan['zero_injections'] @ net_load != 0):
+        print("\n\nThe reduction plan is not valid: buses deleted for having no injections " +
+              "have nonzero net loads", flush=True)
+        return False
+
+    base_bus_id = list(network.BUS_ID)
+    base_line_id = list(network.LINE_ID)
+    base_flow_ub = np.array([network.LINE_FLOW_UB[l] for l in base_line_id],
+                            dtype='d').reshape((-1, params.T))
+    base_flow_lb = np.array([network.LINE_FLOW_LB[l] for l in base_line_id],
+                            dtype='d').reshape((-1, params.T))
+
+    # flags of the base lines, in the order of the columns of plan['limits_of_line']
+    active_ub = np.array([[network.ACTIVE_UB_PER_PERIOD[l][t] for t in range(params.T)]
+                            for l in base_line_id], dtype='bool').reshape((-1, params.T))
+    active_lb = np.array([[network.ACTIVE_LB_PER_PERIOD[l][t] for t in range(params.T)]
+                            for l in base_line_id], dtype='bool').reshape((-1, params.T))
+    # a line is possibly binding in a period if any of the limits it represents is
+    active_per_period = (plan['limits_of_line'] @ (active_ub | active_lb).astype('d')) > 0
+
+    (flow_ub, flow_lb) = _evaluate_terms(plan, 'line_term_', base_flow_ub, base_flow_lb,
+                                         net_load)
+    (constrs_ub, constrs_lb) = _evaluate_terms(plan, 'constrs_term_', base_flow_ub, base_flow_lb,
+                                               net_load)
+    constrs_net_load = plan['constrs_injections'] @ net_load
+
+    # coefficients of the generating units in the injections of the base buses
+    units = list(thermals.UNIT_NAME.keys())
+    bus_idx = {bus: b for b, bus in enumerate(base_bus_id)}
+    unit_coeffs = _sparse_rows([{bus_idx[bus]: coeff
+                                            for bus, coeff in thermals.BUS_COEFF[g].items()}
+                                                    for g in units], len(base_bus_id)).T
+
+    # coefficients of the generating units in the injections of the buses of the reduced network
+    # and in those of the buses limited by the artificial security constraints
+    constrs_unit_coeffs = (plan['constrs_injections'] @ unit_coeffs).tocsr()
+    unit_coeffs = (plan['injection_map'] @ unit_coeffs).tocsc()
+    unit_coeffs.eliminate_zeros()
+    constrs_unit_coeffs.eliminate_zeros()
+
+    bus_id = [int(bus) for bus in plan['bus_id']]
+    line_id = [int(l) for l in plan['line_id']]
+
+    network.NET_LOAD = plan['injection_map'] @ net_load
+    network.BUS_ID = bus_id
+    network.BUS_NAME = {bus: network.BUS_NAME[bus] for bus in bus_id}
+    network.BUS_AREA = {bus: network.BUS_AREA[bus] for bus in bus_id if bus in network.BUS_AREA}
+    network.BUS_HEADER = {bus: b for (b, bus) in enumerate(bus_id)}
+    network.REF_BUS_ID = [int(bus) for bus in plan['ref_bus_id']]
+
+    network.LINE_ID = line_id
+    network.LINE_F_T = {l: (int(f), int(t)) for l, (f, t) in zip(line_id, plan['line_f_t'])}
+    network.LINE_X = {l: float(x) for l, x in zip(line_id, plan['line_x'])}
+    network.LINE_FLOW_UB = {l: flow_ub[l_idx, :] for l_idx, l in enumerate(line_id)}
+    network.LINE_FLOW_LB = {l: flow_lb[l_idx, :] for l_idx, l in enumerate(line_id)}
+    network.LINES_FROM_BUS = {bus: [] for bus in bus_id}
+    network.LINES_TO_BUS = {bus: [] for bus in bus_id}
+    network.LINE_OF_F_T = {}
+    network.BUS_NEIGHBOURS = {bus: set() for bus in bus_id}
+    for l in line_id:
+        network.LINES_FROM_BUS[network.LINE_F_T[l][0]].append(l)
+        network.LINES_TO_BUS[network.LINE_F_T[l][1]].append(l)
+        network.index_line(l)
+    network.TOUCHED_BUSES.clear()
+
+    for (l_idx, l) in enumerate(line_id):
+        if plan['limits_of_line'].indptr[l_idx + 1] > plan['limits_of_line'].indptr[l_idx]:
+            active = plan['active_bounds'][l_idx] & active_per_period[l_idx, :]
+        else:
+            active = np.array(params.T*[plan['active_bounds'][l_idx]], dtype='bool')
+        network.ACTIVE_BOUNDS[l] = bool(np.any(active))
+        network.ACTIVE_UB[l] = network.ACTIVE_LB[l] = network.ACTIVE_BOUNDS[l]
+        network.ACTIVE_UB_PER_PERIOD[l] = {t: bool(active[t]) for t in range(params.T)}
+        network.ACTIVE_LB_PER_PERIOD[l] = {t: bool(active[t]) for t in range(params.T)}
+    for l in set(base_line_id) - set(line_id):
+        for attr in (network.ACTIVE_BOUNDS, network.ACTIVE_UB, network.ACTIVE_LB,
+                     network.ACTIVE_UB_PER_PERIOD, network.ACTIVE_LB_PER_PERIOD):
+            del attr[l]
+        network.CONTINGENCIES.pop(l, None)
+
+    for (g_idx, g) in enumerate(units):
+        column = unit_coeffs[:, [g_idx]]
+        thermals.BUS[g] = [bus_id[b] for b in column.indices]
+        thermals.BUS_COEFF[g] = {bus_id[b]: float(coeff)
+                                            for b, coeff in zip(column.indices, column.data)}
+
+    threshold_line_limit = MAX_FLOW / params.POWER_BASE
+
+    for (c_idx, (bus, l)) in enumerate(plan['constrs_bus_line']):
+        row = constrs_unit_coeffs[[c_idx], :]
+        participants_factors = {units[g_idx]: float(coeff)
+                                                for g_idx, coeff in zip(row.indices, row.data)}
+        max_gen = sum(coeff*thermals.MAX_P[g] for g, coeff in participants_factors.items())
+        cap = min(np.min(constrs_ub[c_idx, :]), -1*np.max(constrs_lb[c_idx, :]))
+
+        # as in the reduction, the constraint is only needed if the line is limited and the
+        # largest net load or generation of the bus might exceed its limits
+        if ((np.min(constrs_ub[c_idx, :]) >= threshold_line_limit and
+                np.max(constrs_lb[c_idx, :]) <= -threshold_line_limit) or
+                (abs(np.max(constrs_net_load[c_idx, :])) <= cap and
+                    abs(-1*np.min(constrs_net_load[c_idx, :]) + max_gen) <= cap)):
+            continue
+
+        constr_id = str(bus) + '_' + str(l)
+        for t in range(params.T):
+            network.SEC_CONSTRS.setdefault(t, {})[constr_id] = {
+                            'name': 'art_bus_' + str(bus)+ '_' + str(t),
+                            'net load': constrs_net_load[c_idx, t],
+                            'participants': {'thermals': list(participants_factors.keys())},
+                            'participants_factors': {'thermals': participants_factors},
+                            'LB': constrs_lb[c_idx, t],
+                            'UB': constrs_ub[c_idx, t]}
+
+    network.PTDF = []
+    network.COLLINEAR_LINES = {}
+
+    print(f"\n\nThe reduction plan was replayed: {len(base_bus_id) - len(bus_id)} buses " +
+          f"and {len(base_line_id) - len(line_id)} lines were removed", flush=True)
+
+    return True
@@ -4,7 +4,8 @@ from numbers import Real
 from csv import reader
 
 from params import _str2bool, _str2real, _str2enum
-from constants import (NetworkModel, NetworkSlacks)
+from constants import (NetworkModel, NetworkSlacks, PTDFEngine, EliminationOrdering,
+                       ScreeningBackend)
 
 def _treat_args(W_RANK:int, W_SIZE:int) -> dict:
     """
@@ -43,13 +44,32 @@ def _treat_args(W_RANK:int, W_SIZE:int) -> dict:
         PTDF_COEFF_TOL: Real = -1e-4
         MAX_NUMBER_OF_CONNECTIONS: int = 10000
         MAX_PROCESS_REDUCE_NETWORK: int = -1
+        SCREENING_BACKEND: ScreeningBackend = ScreeningBackend.MPI
+        SCREENING_WARM_START: bool = False
+        SCREENING_BATCH_SIZE: int = -1
+        SCREENING_MODEL: NetworkModel = NetworkModel.B_THETA
+        REDUCTION_REGIONS: int = -1
+        BATCH_KRON_REDUCTION: bool = True
+        ELIMINATION_ORDERING: EliminationOrdering = EliminationOrdering.CONNECTIONS
         NETWORK_MODEL: NetworkModel = NetworkModel.B_THETA
         NETWORK_SLACKS: NetworkSlacks = NetworkSlacks.BUS_SLACKS
+        PTDF_ENGINE: PTDFEngine = PTDFEngine.SPARSE
+        PTDF_INCREMENTAL: bool = True
+        PTDF_SPARSE_STORAGE: bool = False
+        PTDF_PROCESSES: int = 1000
+        PTDF_COMPRESSION: bool = False
+        PTDF_CACHE: bool = False
+        PTDF_CACHE_DIR: str = 'nan'
+        PTDF_CACHE_MAX_SIZE_MB: Real = -4096
+        REDUCTION_PLAN_FILE: str = 'nan'
+        RESOLVE_FULL_NETWORK: bool = False
+        N_1_SECURITY: bool = False
 
 
     _dummy_params = DummyParams()
 
-    _enums = (NetworkModel, NetworkSlacks)
+    _enums = (NetworkModel, NetworkSlacks, PTDFEngine, EliminationOrdering,
+              ScreeningBackend)
 
     CLI = argparse.ArgumentParser(
                     prog = 'ward_UC',
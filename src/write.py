@@ -5,6 +5,8 @@ from tabulate import tabulate
 import numpy as np
 
 from model.add_network import get_bus_injection_expr
+from pre_processing.build_ptdf import get_ptdf_rows
+from pre_processing.flow_reconstruction import get_bus_injections
 
 from constants import NetworkModel, NetworkSlacks
 
@@ -14,10 +16,13 @@ def check_flows_full_network(params,
                              t_g,
                              s_load_curtailment,
                              s_gen_surplus,
-                             s_renew_curtailment
+                             s_renew_curtailment,
+                             reduced_thermals=None,
+                             reduced_network=None
 ) -> None:
     """Take the generations from the reduced network and check the flows that result from them in
-    the full, original network
+    the full, original network. If the reduced network has a `FLOW_RECONSTRUCTION`, the flows and
+    voltage angles of all periods are obtained at once from the injections of the reduced network
     """
 
     print("\n\nFlows in the full, original network\n\n", flush=True)
@@ -27,9 +32,45 @@ def check_flows_full_network(params,
     s_gen_surplus_x = {k: v.x for k, v in s_gen_surplus.items()}
     s_renew_curtailment_x = {k: v.x for k, v in s_renew_curtailment.items()}
 
+    branch_flow = {}
+
+    if reduced_network is not None and reduced_network.FLOW_RECONSTRUCTION is not None:
+        flow_reconstruction = reduced_network.FLOW_RECONSTRUCTION
+
+        reduced_injections = get_bus_injections(reduced_thermals, reduced_network,
+                                                flow_reconstruction.REDUCED_BUS_ID, params.T,
+                                                t_g_x,
+                                                s_load_curtailment_x,
+                                                s_gen_surplus_x,
+                                                s_renew_curtailment_x
+        )
+        deleted_injections = get_bus_injections(thermals, network,
+                                                flow_reconstruction.DELETED_BUS_ID, params.T,
+                                                t_g_x, {}, {}, {}
+        )
+
+        (angles, flows) = flow_reconstruction.get_angles_and_flows(reduced_injections,
+                                                                   deleted_injections)
+
+        branch_flow = {(network.LINE_F_T[l][0], network.LINE_F_T[l][1], l, t): flows[l_idx, t]
+                        for l_idx, l in enumerate(flow_reconstruction.LINE_ID)
+                            for t in range(params.T)}
+
+        f = open(params.OUT_DIR + '/angles - full network - '+
+                        params.PS + ' - case ' + params.CASE + '.csv', 'w',
+                        encoding='utf-8'
+        )
+        f.write('sep=;\n')
+        f.write('bus;period;x (rad)\n')
+        for b, bus in enumerate(flow_reconstruction.BUS_ID):
+            for t in range(params.T):
+                f.write(f"{bus};{t};{angles[b, t]}\n")
+        f.close()
+        del f
+
     write_branch_flows(params,
                         network, thermals,
-                        {},
+                        branch_flow,
                         t_g_x,
                         s_load_curtailment_x,
                         s_gen_surplus_x,
@@ -344,33 +385,18 @@ def write_branch_flows(params,
                                                 include_flows = False
         )
 
-        buses_with_injections_idxs = np.array(
-                            [b for b, bus in enumerate(network.BUS_ID)
-                                if [abs(bus_injections[bus, t].getValue()) != 0
-                                                    for t in range(params.T)]],
-                                                        dtype = 'int64'
-        )
+        injections = np.array([[bus_injections[bus, t].getValue() for t in range(params.T)]
+                                                        for bus in network.BUS_ID], dtype='d')
 
-        sub_PTDF_act_lines = network.PTDF[:]
-        sub_PTDF_act_lines[np.where(abs(sub_PTDF_act_lines)<ptdf_threshold)] =0
+        # flows of all lines in all periods, computed from the non-zeros of the PTDF
+        all_flows = get_ptdf_rows(network, list(range(len(network.LINE_ID))),
+                                  ptdf_threshold) @ injections
 
-        for l in network.LINE_ID:
+        for l_idx, l in enumerate(network.LINE_ID):
 
             (f_bus, t_bus) = (network.LINE_F_T[l][0], network.LINE_F_T[l][1])
 
-            l_idx = network.LINE_ID.index(l)
-            non_zeros = np.intersect1d(
-                            np.where(abs(sub_PTDF_act_lines[l_idx,:]) > 0)[0],
-                                                    buses_with_injections_idxs
-            )
-            buses_of_interest = [network.BUS_ID[b] for b in non_zeros]
-
-            flows = np.inner(
-                            np.array([[bus_injections[bus, t].getValue()
-                                       for bus in buses_of_interest]
-                                       for t in range(params.T)]),
-                                       sub_PTDF_act_lines[l_idx, non_zeros]
-            )
+            flows = all_flows[l_idx, :]
             for t in range(params.T):
                 flow = flows[t]
                 if ((flow <= (network.LINE_FLOW_LB[l][t] + 1e-3))